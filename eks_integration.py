@@ -4,6 +4,7 @@ AWS EKS інтеграція
 Обгортка для kubectl + AWS CLI для діагностики EKS кластерів
 """
 
+import asyncio
 import subprocess
 import json
 import os
@@ -11,7 +12,11 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
 
+from config.settings import settings
+from k8s.events import compact_events, fetch_events, format_event_summary
+from k8s.kubectl_wrapper import create_kubectl_wrapper
 from utils.logger import logger
+from utils.process import process_runner
 
 
 @dataclass
@@ -60,6 +65,9 @@ class EKSManager:
         if aws_profile:
             self.aws_cmd_base.extend(["--profile", aws_profile])
         self.aws_cmd_base.extend(["--region", region])
+        
+        # get / describe / logs: kubectl subprocess або Kubernetes API (K8S_BACKEND)
+        self.kubectl = create_kubectl_wrapper()
     
     def _run_aws_command(
         self,
@@ -85,7 +93,7 @@ class EKSManager:
                 full_command,
                 capture_output=capture_output,
                 text=True,
-                timeout=60
+                timeout=settings.K8S_TIMEOUT
             )
             
             return {
@@ -112,6 +120,23 @@ class EKSManager:
                 "command": ' '.join(full_command)
             }
     
+    async def _arun_aws_command(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        slot_timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Виконання AWS CLI команди без блокування event loop
+        
+        Спільний з kubectl ліміт паралельних процесів, deadline K8S_TIMEOUT
+        (timeout / slot_timeout - як у ProcessRunner.run), процес вбивається
+        при скасуванні задачі
+        """
+        full_command = self.aws_cmd_base + command
+        logger.info(f"Виконання AWS команди (async): {' '.join(full_command)}")
+        return await process_runner.run(full_command, timeout, slot_timeout)
+    
     def _run_kubectl_command(
         self,
         command: List[str],
@@ -139,7 +164,7 @@ class EKSManager:
                 full_command,
                 capture_output=True,
                 text=True,
-                timeout=60
+                timeout=settings.K8S_TIMEOUT
             )
             
             return {
@@ -158,23 +183,50 @@ class EKSManager:
                 "command": ' '.join(full_command)
             }
     
-    def get_cluster_info(self) -> Optional[EKSClusterInfo]:
-        """Отримати інформацію про EKS кластер"""
+    async def _arun_kubectl_command(
+        self,
+        command: List[str],
+        namespace: Optional[str] = None,
+        timeout: Optional[float] = None,
+        slot_timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Виконання kubectl команди без блокування event loop"""
+        full_command = ["kubectl"] + command
+        
+        if namespace:
+            full_command.extend(["-n", namespace])
         
-        command = [
+        logger.info(f"Виконання kubectl (async): {' '.join(full_command)}")
+        return await process_runner.run(full_command, timeout, slot_timeout)
+    
+    def _cluster_command(self) -> List[str]:
+        return [
             "describe-cluster",
             "--name", self.cluster_name,
             "--output", "json"
         ]
+    
+    def get_cluster_info(self) -> Optional[EKSClusterInfo]:
+        """Отримати інформацію про EKS кластер"""
         
-        result = self._run_aws_command(command)
+        return self._cluster_info_result(self._run_aws_command(self._cluster_command()))
+    
+    async def aget_cluster_info(self) -> Optional[EKSClusterInfo]:
+        """get_cluster_info без блокування event loop"""
         
+        return self._cluster_info_result(await self._arun_aws_command(self._cluster_command()))
+    
+    def _cluster_info_result(self, result: Dict[str, Any]) -> Optional[EKSClusterInfo]:
         if not result["success"]:
             logger.error(f"Не вдалося отримати інформацію про кластер: {result.get('stderr')}")
             return None
         
+        return self._parse_cluster_info(result["stdout"])
+    
+    def _parse_cluster_info(self, stdout: str) -> Optional[EKSClusterInfo]:
+        """EKSClusterInfo з JSON describe-cluster"""
         try:
-            data = json.loads(result["stdout"])
+            data = json.loads(stdout)
             cluster = data["cluster"]
             
             return EKSClusterInfo(
@@ -192,17 +244,25 @@ class EKSManager:
             logger.error(f"Помилка парсингу cluster info: {e}")
             return None
     
-    def list_node_groups(self) -> List[str]:
-        """Список node groups в кластері"""
-        
-        command = [
+    def _list_nodegroups_command(self) -> List[str]:
+        return [
             "list-nodegroups",
             "--cluster-name", self.cluster_name,
             "--output", "json"
         ]
+    
+    def list_node_groups(self) -> List[str]:
+        """Список node groups в кластері"""
         
-        result = self._run_aws_command(command)
+        return self._node_groups_result(self._run_aws_command(self._list_nodegroups_command()))
+    
+    async def alist_node_groups(self) -> List[str]:
+        """list_node_groups без блокування event loop"""
         
+        return self._node_groups_result(await self._arun_aws_command(self._list_nodegroups_command()))
+    
+    @staticmethod
+    def _node_groups_result(result: Dict[str, Any]) -> List[str]:
         if not result["success"]:
             return []
         
@@ -212,23 +272,38 @@ class EKSManager:
         except:
             return []
     
-    def get_nodegroup_info(self, nodegroup_name: str) -> Optional[EKSNodeGroup]:
-        """Детальна інформація про node group"""
-        
-        command = [
+    def _nodegroup_command(self, nodegroup_name: str) -> List[str]:
+        return [
             "describe-nodegroup",
             "--cluster-name", self.cluster_name,
             "--nodegroup-name", nodegroup_name,
             "--output", "json"
         ]
+    
+    def get_nodegroup_info(self, nodegroup_name: str) -> Optional[EKSNodeGroup]:
+        """Детальна інформація про node group"""
+        
+        result = self._run_aws_command(self._nodegroup_command(nodegroup_name))
+        
+        if not result["success"]:
+            return None
+        
+        return self._parse_nodegroup_info(result["stdout"])
+    
+    async def aget_nodegroup_info(self, nodegroup_name: str) -> Optional[EKSNodeGroup]:
+        """get_nodegroup_info без блокування event loop"""
         
-        result = self._run_aws_command(command)
+        result = await self._arun_aws_command(self._nodegroup_command(nodegroup_name))
         
         if not result["success"]:
             return None
         
+        return self._parse_nodegroup_info(result["stdout"])
+    
+    def _parse_nodegroup_info(self, stdout: str) -> Optional[EKSNodeGroup]:
+        """EKSNodeGroup з JSON describe-nodegroup"""
         try:
-            data = json.loads(result["stdout"])
+            data = json.loads(stdout)
             ng = data["nodegroup"]
             
             return EKSNodeGroup(
@@ -251,13 +326,18 @@ class EKSManager:
     def update_kubeconfig(self) -> bool:
         """Оновити kubeconfig для доступу до EKS кластеру"""
         
-        command = [
-            "update-kubeconfig",
-            "--name", self.cluster_name
-        ]
-        
-        result = self._run_aws_command(command)
+        return self._update_kubeconfig_result(
+            self._run_aws_command(["update-kubeconfig", "--name", self.cluster_name])
+        )
+    
+    async def aupdate_kubeconfig(self) -> bool:
+        """update_kubeconfig без блокування event loop"""
         
+        return self._update_kubeconfig_result(
+            await self._arun_aws_command(["update-kubeconfig", "--name", self.cluster_name])
+        )
+    
+    def _update_kubeconfig_result(self, result: Dict[str, Any]) -> bool:
         if result["success"]:
             logger.info(f"Kubeconfig оновлено для кластеру {self.cluster_name}")
             return True
@@ -300,29 +380,28 @@ class EKSManager:
     ) -> List[Dict]:
         """Отримати список pods"""
         
-        command = ["get", "pods", "-o", "json"]
-        
-        if label_selector:
-            command.extend(["-l", label_selector])
-        
-        result = self._run_kubectl_command(command, namespace)
-        
-        if not result["success"]:
-            return []
+        data = self.kubectl.get("pods", namespace=namespace, label_selector=label_selector)
+        return data.get("items", [])
+    
+    async def aget_pods(
+        self,
+        namespace: str = "default",
+        label_selector: Optional[str] = None
+    ) -> List[Dict]:
+        """Отримати список pods (async)"""
         
-        try:
-            data = json.loads(result["stdout"])
-            return data.get("items", [])
-        except:
-            return []
+        data = await self.kubectl.aget("pods", namespace=namespace, label_selector=label_selector)
+        return data.get("items", [])
     
     def describe_pod(self, pod_name: str, namespace: str = "default") -> str:
         """Детальний опис pod"""
         
-        command = ["describe", "pod", pod_name]
-        result = self._run_kubectl_command(command, namespace)
+        return self.kubectl.describe("pod", pod_name, namespace)
+    
+    async def adescribe_pod(self, pod_name: str, namespace: str = "default") -> str:
+        """Детальний опис pod (async)"""
         
-        return result.get("stdout", "")
+        return await self.kubectl.adescribe("pod", pod_name, namespace)
     
     def get_pod_logs(
         self,
@@ -330,37 +409,79 @@ class EKSManager:
         namespace: str = "default",
         container: Optional[str] = None,
         previous: bool = False,
-        tail: int = 100
+        tail: int = 100,
+        summarize: bool = False
     ) -> str:
-        """Отримати логи pod"""
-        
-        command = ["logs", pod_name, f"--tail={tail}"]
-        
-        if container:
-            command.extend(["-c", container])
+        """Отримати логи pod (summarize - шаблони логів замість сирих рядків)"""
+        
+        return self.kubectl.logs(
+            pod_name,
+            namespace,
+            container=container,
+            previous=previous,
+            tail=tail,
+            summarize=summarize
+        )
+    
+    async def aget_pod_logs(
+        self,
+        pod_name: str,
+        namespace: str = "default",
+        container: Optional[str] = None,
+        previous: bool = False,
+        tail: int = 100,
+        summarize: bool = False
+    ) -> str:
+        """Отримати логи pod (async)"""
+        
+        return await self.kubectl.alogs(
+            pod_name,
+            namespace,
+            container=container,
+            previous=previous,
+            tail=tail,
+            summarize=summarize
+        )
+    
+    def get_events(
+        self,
+        namespace: str = "default",
+        field_selector: Optional[str] = None,
+        compact: bool = False
+    ) -> str:
+        """Отримати Kubernetes events (compact - згруповані за об'єктом/reason/шаблоном)"""
         
-        if previous:
-            command.append("--previous")
+        if compact:
+            return format_event_summary(fetch_events(self.kubectl, namespace, field_selector))
         
-        result = self._run_kubectl_command(command, namespace)
+        result = self._run_kubectl_command(self._events_command(field_selector), namespace)
         
         return result.get("stdout", "")
     
-    def get_events(
+    async def aget_events(
         self,
         namespace: str = "default",
-        field_selector: Optional[str] = None
+        field_selector: Optional[str] = None,
+        compact: bool = False
     ) -> str:
-        """Отримати Kubernetes events"""
+        """Отримати Kubernetes events (async)"""
         
+        if compact:
+            data = await self.kubectl.aget("events", namespace=namespace, field_selector=field_selector)
+            return format_event_summary(compact_events(data.get("items", [])))
+        
+        result = await self._arun_kubectl_command(self._events_command(field_selector), namespace)
+        
+        return result.get("stdout", "")
+    
+    @staticmethod
+    def _events_command(field_selector: Optional[str]) -> List[str]:
         command = ["get", "events", "--sort-by=.lastTimestamp"]
         
         if field_selector:
             command.extend(["--field-selector", field_selector])
         
-        result = self._run_kubectl_command(command, namespace)
-        
-        return result.get("stdout", "")
+        return command
     
     # ========================================================================
     # EKS-SPECIFIC ДІАГНОСТИКА
@@ -377,17 +498,51 @@ class EKSManager:
         Returns:
             Diagnostic report
         """
+        # 1. Pod details
+        pod_desc = self.describe_pod(pod_name, namespace)
+        
+        # 4. Check events
+        events = self.get_events(
+            namespace=namespace,
+            field_selector=f"involvedObject.name={pod_name}",
+            compact=True
+        )
+        
+        return self._image_pull_report(pod_name, namespace, pod_desc, events)
+    
+    async def adiagnose_image_pull_issue(
+        self,
+        pod_name: str,
+        namespace: str = "default"
+    ) -> Dict[str, Any]:
+        """Діагностика ImagePullBackOff для ECR (async, кроки паралельно)"""
+        
+        pod_desc, events = await asyncio.gather(
+            self.adescribe_pod(pod_name, namespace),
+            self.aget_events(
+                namespace=namespace,
+                field_selector=f"involvedObject.name={pod_name}",
+                compact=True
+            ),
+        )
+        
+        return self._image_pull_report(pod_name, namespace, pod_desc, events)
+    
+    @staticmethod
+    def _image_pull_report(
+        pod_name: str,
+        namespace: str,
+        pod_desc: str,
+        events: str
+    ) -> Dict[str, Any]:
         report = {
             "issue": "ImagePullBackOff",
             "pod": pod_name,
             "namespace": namespace,
-            "checks": []
+            "checks": [],
+            "pod_description": pod_desc
         }
         
-        # 1. Pod details
-        pod_desc = self.describe_pod(pod_name, namespace)
-        report["pod_description"] = pod_desc
-        
         # 2. Check if image is from ECR
         if ".dkr.ecr." in pod_desc and ".amazonaws.com" in pod_desc:
             report["checks"].append({
@@ -399,15 +554,16 @@ class EKSManager:
             # 3. Check node IAM role
             # TODO: Get node IAM role from nodegroup and check ECR policy
         
-        # 4. Check events
-        events = self.get_events(
-            namespace=namespace,
-            field_selector=f"involvedObject.name={pod_name}"
-        )
         report["events"] = events
         
         return report
     
+    _LB_CONTROLLER_COMMAND = [
+        "get", "deployment",
+        "aws-load-balancer-controller",
+        "-n", "kube-system"
+    ]
+    
     def diagnose_loadbalancer_pending(
         self,
         service_name: str,
@@ -415,6 +571,54 @@ class EKSManager:
     ) -> Dict[str, Any]:
         """Діагностика Service LoadBalancer Pending"""
         
+        # 1. Check AWS Load Balancer Controller
+        lb_controller_check = self._run_kubectl_command(self._LB_CONTROLLER_COMMAND)
+        
+        # 2. Service details
+        svc_result = self._run_kubectl_command([
+            "get", "svc", service_name, "-o", "yaml"
+        ], namespace)
+        
+        # 3. Events
+        events = self.get_events(
+            namespace=namespace,
+            field_selector=f"involvedObject.name={service_name}",
+            compact=True
+        )
+        
+        return self._loadbalancer_report(
+            service_name, namespace, lb_controller_check, svc_result, events
+        )
+    
+    async def adiagnose_loadbalancer_pending(
+        self,
+        service_name: str,
+        namespace: str = "default"
+    ) -> Dict[str, Any]:
+        """Діагностика Service LoadBalancer Pending (async, кроки паралельно)"""
+        
+        lb_controller_check, svc_result, events = await asyncio.gather(
+            self._arun_kubectl_command(self._LB_CONTROLLER_COMMAND),
+            self._arun_kubectl_command(["get", "svc", service_name, "-o", "yaml"], namespace),
+            self.aget_events(
+                namespace=namespace,
+                field_selector=f"involvedObject.name={service_name}",
+                compact=True
+            ),
+        )
+        
+        return self._loadbalancer_report(
+            service_name, namespace, lb_controller_check, svc_result, events
+        )
+    
+    @staticmethod
+    def _loadbalancer_report(
+        service_name: str,
+        namespace: str,
+        lb_controller_check: Dict[str, Any],
+        svc_result: Dict[str, Any],
+        events: str
+    ) -> Dict[str, Any]:
         report = {
             "issue": "LoadBalancer Pending",
             "service": service_name,
@@ -422,13 +626,6 @@ class EKSManager:
             "checks": []
         }
         
-        # 1. Check AWS Load Balancer Controller
-        lb_controller_check = self._run_kubectl_command([
-            "get", "deployment",
-            "aws-load-balancer-controller",
-            "-n", "kube-system"
-        ])
-        
         if lb_controller_check["success"]:
             report["checks"].append({
                 "name": "AWS LB Controller",
@@ -443,18 +640,7 @@ class EKSManager:
                 "recommendation": "Встановити: helm install aws-load-balancer-controller eks/aws-load-balancer-controller -n kube-system"
             })
         
-        # 2. Service details
-        svc_result = self._run_kubectl_command([
-            "get", "svc", service_name, "-o", "yaml"
-        ], namespace)
-        
         report["service_yaml"] = svc_result.get("stdout", "")
-        
-        # 3. Events
-        events = self.get_events(
-            namespace=namespace,
-            field_selector=f"involvedObject.name={service_name}"
-        )
         report["events"] = events
         
         return report
@@ -463,72 +649,158 @@ class EKSManager:
         """
         Повний diagnostic bundle для EKS кластеру
         Для troubleshooting
+        
+        Синхронна обгортка над aget_eks_diagnostic_bundle для коду без
+        event loop. Усередині loop - RuntimeError: використовуйте
+        await aget_eks_diagnostic_bundle()
         """
-        bundle = {
-            "timestamp": datetime.now().isoformat(),
-            "cluster": {}
-        }
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aget_eks_diagnostic_bundle())
+        
+        raise RuntimeError(
+            "get_eks_diagnostic_bundle() не можна викликати з працюючого event loop; "
+            "використовуйте await aget_eks_diagnostic_bundle()"
+        )
+    
+    async def aget_eks_diagnostic_bundle(
+        self,
+        step_timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Diagnostic bundle: усі кроки паралельно
+        
+        describe-cluster, list-nodegroups -> describe-nodegroup (кожна група
+        окремо), get nodes і get pods стартують одночасно, тож bundle готовий за
+        час найдовшого ланцюжка, а не суми викликів. Кожна команда має власний
+        deadline (EKS_BUNDLE_STEP_TIMEOUT), що починається, коли процес отримав
+        слот K8S_MAX_PROCESSES: describe-nodegroup у черзі за слотом не
+        вичерпує свій deadline. Очікування слоту обмежене тим самим значенням.
+        Крок, що впав або не встиг, не блокує решту - його секція потрапляє
+        в bundle["missing"] з причиною
         
-        # 1. Cluster info
-        cluster_info = self.get_cluster_info()
-        if cluster_info:
-            bundle["cluster"] = {
-                "name": cluster_info.name,
-                "version": cluster_info.version,
-                "status": cluster_info.status,
-                "vpc_id": cluster_info.vpc_id,
+        Args:
+            step_timeout: Deadline одного кроку в секундах
+        
+        Returns:
+            Bundle з секціями cluster, nodegroups, k8s і missing
+        """
+        timeout = settings.EKS_BUNDLE_STEP_TIMEOUT if step_timeout is None else step_timeout
+        missing: Dict[str, str] = {}
+        
+        async def step(section: str, coro) -> Any:
+            """Результат кроку або None (причина - у missing)"""
+            try:
+                return await coro
+            except Exception as e:
+                missing[section] = str(e) or type(e).__name__
+            return None
+        
+        async def aws(command: List[str]) -> str:
+            return self._bundle_output(await self._arun_aws_command(command, timeout, timeout))
+        
+        async def kubectl(command: List[str]) -> str:
+            return self._bundle_output(await self._arun_kubectl_command(command, None, timeout, timeout))
+        
+        async def cluster() -> Dict[str, Any]:
+            stdout = await aws([
+                "describe-cluster",
+                "--name", self.cluster_name,
+                "--output", "json"
+            ])
+            info = self._parse_cluster_info(stdout)
+            if info is None:
+                raise ValueError("invalid describe-cluster response")
+            return {
+                "name": info.name,
+                "version": info.version,
+                "status": info.status,
+                "vpc_id": info.vpc_id,
                 "region": self.region
             }
         
-        # 2. Node groups
-        nodegroups = self.list_node_groups()
-        bundle["nodegroups"] = []
-        
-        for ng_name in nodegroups:
-            ng_info = self.get_nodegroup_info(ng_name)
-            if ng_info:
-                bundle["nodegroups"].append({
-                    "name": ng_info.name,
-                    "instance_types": ng_info.instance_types,
-                    "desired_size": ng_info.desired_size,
-                    "status": ng_info.status
-                })
-        
-        # 3. Kubernetes resources summary
-        bundle["k8s"] = {}
-        
-        # Nodes
-        nodes_result = self._run_kubectl_command(["get", "nodes", "-o", "json"])
-        if nodes_result["success"]:
-            try:
-                nodes_data = json.loads(nodes_result["stdout"])
-                bundle["k8s"]["nodes_count"] = len(nodes_data.get("items", []))
-            except:
-                pass
-        
-        # Pods (all namespaces)
-        pods_result = self._run_kubectl_command([
-            "get", "pods", "--all-namespaces", "-o", "json"
-        ])
-        if pods_result["success"]:
-            try:
-                pods_data = json.loads(pods_result["stdout"])
-                pods = pods_data.get("items", [])
-                
-                # Count by status
-                status_count = {}
-                for pod in pods:
-                    status = pod.get("status", {}).get("phase", "Unknown")
-                    status_count[status] = status_count.get(status, 0) + 1
-                
-                bundle["k8s"]["pods"] = {
-                    "total": len(pods),
-                    "by_status": status_count
-                }
-            except:
-                pass
+        async def list_nodegroups() -> List[str]:
+            stdout = await aws([
+                "list-nodegroups",
+                "--cluster-name", self.cluster_name,
+                "--output", "json"
+            ])
+            return json.loads(stdout).get("nodegroups", [])
+        
+        async def nodegroup(name: str) -> Dict[str, Any]:
+            stdout = await aws(self._nodegroup_command(name))
+            info = self._parse_nodegroup_info(stdout)
+            if info is None:
+                raise ValueError("invalid describe-nodegroup response")
+            return {
+                "name": info.name,
+                "instance_types": info.instance_types,
+                "desired_size": info.desired_size,
+                "status": info.status
+            }
+        
+        async def nodegroups() -> Optional[List[Dict[str, Any]]]:
+            # N describe-nodegroup після list - паралельно, кожен зі своїм deadline
+            names = await step("nodegroups", list_nodegroups())
+            if names is None:
+                return None
+            infos = await asyncio.gather(*(step(f"nodegroups/{name}", nodegroup(name)) for name in names))
+            return [info for info in infos if info]
+        
+        async def nodes() -> int:
+            stdout = await kubectl(["get", "nodes", "-o", "json"])
+            return len(json.loads(stdout).get("items", []))
+        
+        async def pods() -> Dict[str, Any]:
+            stdout = await kubectl([
+                "get", "pods", "--all-namespaces", "-o", "json"
+            ])
+            items = json.loads(stdout).get("items", [])
+            
+            # Count by status
+            status_count: Dict[str, int] = {}
+            for pod in items:
+                status = pod.get("status", {}).get("phase", "Unknown")
+                status_count[status] = status_count.get(status, 0) + 1
+            
+            return {
+                "total": len(items),
+                "by_status": status_count
+            }
+        
+        timestamp = datetime.now().isoformat()
+        cluster_info, nodegroup_list, nodes_count, pods_summary = await asyncio.gather(
+            step("cluster", cluster()),
+            nodegroups(),
+            step("k8s.nodes", nodes()),
+            step("k8s.pods", pods()),
+        )
+        
+        bundle: Dict[str, Any] = {
+            "timestamp": timestamp,
+            "cluster": cluster_info or {},
+            "nodegroups": nodegroup_list or [],
+            "k8s": {}
+        }
+        if nodes_count is not None:
+            bundle["k8s"]["nodes_count"] = nodes_count
+        if pods_summary is not None:
+            bundle["k8s"]["pods"] = pods_summary
+        
+        bundle["missing"] = dict(sorted(missing.items()))
+        if missing:
+            logger.warning(f"Diagnostic bundle неповний: {', '.join(bundle['missing'])}")
         
         return bundle
+    
+    @staticmethod
+    def _bundle_output(result: Dict[str, Any]) -> str:
+        """stdout успішної команди; інакше RuntimeError з причиною для missing"""
+        if result.get("success"):
+            return result["stdout"]
+        reason = (result.get("stderr") or result.get("error") or "").strip()
+        raise RuntimeError(reason.splitlines()[-1] if reason else f"exit code {result.get('returncode')}")
 
 
 # ============================================================================
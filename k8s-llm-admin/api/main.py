@@ -20,27 +20,55 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
     logger.info(f"🚀 Starting {settings.PROJECT_NAME} v{settings.VERSION}")
-    logger.info(f"Ollama URL: {settings.OLLAMA_BASE_URL}")
+    logger.info(f"Ollama URL: {settings.OLLAMA_BACKEND_URLS or settings.OLLAMA_BASE_URL}")
     if settings.EKS_CLUSTER_NAME:
         logger.info(f"EKS Cluster: {settings.EKS_CLUSTER_NAME}")
     else:
         logger.info("Kubernetes: Self-managed cluster (not EKS)")
 
+    # Вбудовані Jinja2 templates компілюються один раз (bytecode cache на диску)
+    from prompts.templates import get_template_registry
+
+    get_template_registry()
+
     # Check Ollama health
     from llm.ollama_client import get_ollama_client
+    from llm.warmup import get_model_warmer
 
     client = get_ollama_client()
+    warmer = get_model_warmer()
 
-    if not client.health_check():
+    if not await client.health_check():
         logger.warning(
             "⚠️ Ollama не доступний! Перевірте чи запущений: ollama serve",
         )
     else:
         logger.info("✅ Ollama підключений")
+        # Preload моделей, щоб перший запит не платив за cold load
+        await warmer.warm_all()
+
+    # Фонові health probes для всіх Ollama backends та model keeper
+    client.start()
+    warmer.start()
+
+    # Informers: list + watch у локальний store (get / health без API round-trip)
+    if settings.K8S_INFORMERS:
+        from k8s.informer import start_cluster_state
+
+        try:
+            start_cluster_state()
+        except Exception as e:
+            logger.warning(f"⚠️ Informers не запущені: {e}")
 
     yield
 
     # Shutdown
+    if settings.K8S_INFORMERS:
+        from k8s.informer import stop_cluster_state
+
+        stop_cluster_state()
+    await warmer.aclose()
+    await client.aclose()
     logger.info("👋 Shutting down")
 
 
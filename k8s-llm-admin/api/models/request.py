@@ -11,6 +11,10 @@ class DiagnoseRequest(BaseModel):
         None,
         description="Тип ресурсу (pod, service, node)",
     )
+    resource_name: Optional[str] = Field(
+        None,
+        description="Ім'я ресурсу - kubectl evidence збирається автоматично",
+    )
     namespace: str = Field(
         default="default",
         description="Kubernetes namespace",
@@ -23,6 +27,10 @@ class DiagnoseRequest(BaseModel):
         default="uk",
         description="Мова відповіді (uk або en)",
     )
+    severity: Optional[str] = Field(
+        None,
+        description="Критичність (critical, high, medium, low) - пріоритет у черзі LLM",
+    )
 
     class Config:
         json_schema_extra = {
@@ -4,8 +4,11 @@ from pydantic import BaseModel
 from typing import Optional
 import json
 
+from llm.admission import AdmissionRejected
 from llm.prompt_manager import orchestrator, DiagnosticRequest
 from prompts.multilang_prompts import Language
+from prompts.system_prompts import ProblemSeverity
+from prompts.validators import ValidationError
 from utils.logger import logger
 
 router = APIRouter()
@@ -16,9 +19,11 @@ class DiagnoseRequest(BaseModel):
 
     message: str
     resource_type: Optional[str] = None
+    resource_name: Optional[str] = None  # kubectl evidence збирається автоматично
     namespace: str = "default"
     kubectl_output: Optional[str] = None
     language: Optional[str] = "uk"
+    severity: Optional[str] = None  # critical, high, medium, low
 
 
 class DiagnoseResponse(BaseModel):
@@ -28,6 +33,15 @@ class DiagnoseResponse(BaseModel):
     model: str
     generation_time: float
     tokens_generated: int
+    cached: bool = False
+
+
+def parse_severity(value: Optional[str]) -> Optional[ProblemSeverity]:
+    """severity string → enum (невідоме значення ігнорується)"""
+    try:
+        return ProblemSeverity(value.lower()) if value else None
+    except ValueError:
+        return None
 
 
 @router.post("/diagnose", response_model=DiagnoseResponse)
@@ -56,22 +70,33 @@ async def diagnose_issue(request: DiagnoseRequest):
         diag_req = DiagnosticRequest(
             user_message=request.message,
             resource_type=request.resource_type,
+            resource_name=request.resource_name,
             namespace=request.namespace,
             kubectl_output=request.kubectl_output,
             language=lang,
             cluster_context=None,  # Можна додати з settings або залишити None
+            severity=parse_severity(request.severity),
         )
 
         # Виконати діагностику
-        response = orchestrator.diagnose(diag_req)
+        response = await orchestrator.diagnose(diag_req)
 
         return DiagnoseResponse(
             diagnosis=response.text,
             model=response.model,
             generation_time=response.generation_time,
             tokens_generated=response.tokens_generated,
+            cached=response.cached,
         )
 
+    except AdmissionRejected as e:
+        logger.warning(f"Запит відхилено admission control: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+
+    except ValidationError as e:
+        logger.warning(f"Запит не пройшов валідацію: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
     except Exception as e:
         logger.error(f"Помилка діагностики: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -121,16 +146,30 @@ async def diagnose_stream(request: DiagnoseRequest):
         diag_req = DiagnosticRequest(
             user_message=request.message,
             resource_type=request.resource_type,
+            resource_name=request.resource_name,
             namespace=request.namespace,
             kubectl_output=request.kubectl_output,
             language=lang,
             cluster_context=None,
+            severity=parse_severity(request.severity),
         )
         
-        def generate_stream():
+        # Дочекатися admission (і першого токена) до відправки headers,
+        # щоб відмова повернулась як 429/503 з Retry-After, а не всередині SSE
+        stream = orchestrator.diagnose_stream(diag_req)
+        try:
+            first_chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = None
+        
+        async def generate_stream():
             """Generator для SSE streaming"""
             try:
-                for chunk in orchestrator.diagnose_stream(diag_req):
+                if first_chunk is not None:
+                    data = json.dumps({"chunk": first_chunk, "done": False})
+                    yield f"data: {data}\n\n"
+                
+                async for chunk in stream:
                     # Формат SSE: data: {json}\n\n
                     data = json.dumps({"chunk": chunk, "done": False})
                     yield f"data: {data}\n\n"
@@ -154,6 +193,14 @@ async def diagnose_stream(request: DiagnoseRequest):
             }
         )
     
+    except AdmissionRejected as e:
+        logger.warning(f"Streaming запит відхилено admission control: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+    
+    except ValidationError as e:
+        logger.warning(f"Streaming запит не пройшов валідацію: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
     except Exception as e:
         logger.error(f"Помилка streaming діагностики: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,11 @@
 from fastapi import APIRouter
 
+from llm.admission import admission
+from llm.cache import diagnosis_cache
 from llm.ollama_client import get_ollama_client
+from llm.prompt_manager import orchestrator
+from llm.warmup import get_model_warmer
+from k8s.read_cache import read_cache
 from config.settings import settings
 
 router = APIRouter()
@@ -12,18 +17,27 @@ async def health_check():
 
     # Check Ollama
     ollama_client = get_ollama_client()
-    ollama_status = "healthy" if ollama_client.health_check() else "unhealthy"
+    ollama_status = "healthy" if await ollama_client.health_check() else "unhealthy"
 
     # Check kubectl access (optional)
     kubectl_status = "unknown"
     try:
         from k8s.kubectl_wrapper import kubectl
 
-        result = kubectl.run(["version", "--client"])
+        result = await kubectl.arun(["version", "--client"])
         kubectl_status = "healthy" if result["success"] else "unhealthy"
     except Exception:
         pass
 
+    # Стан кластера зі store informers (без API запитів)
+    cluster = None
+    if settings.K8S_INFORMERS:
+        from k8s.informer import get_cluster_state
+
+        state = get_cluster_state()
+        if state is not None:
+            cluster = {"summary": state.summary(), "informers": state.stats()}
+
     return {
         "status": "healthy",
         "version": settings.VERSION,
@@ -31,10 +45,23 @@ async def health_check():
             "ollama": ollama_status,
             "kubectl": kubectl_status,
         },
+        "ollama_backends": ollama_client.stats(),
         "config": {
             "model": settings.OLLAMA_MODEL,
             "eks_cluster": settings.EKS_CLUSTER_NAME,
             "language": settings.DEFAULT_LANGUAGE,
         },
+        "cache": {
+            "enabled": settings.ENABLE_CACHE,
+            **diagnosis_cache.stats.as_dict(),
+        },
+        "k8s_read_cache": {
+            "enabled": settings.K8S_READ_CACHE,
+            **read_cache.stats(),
+        },
+        "singleflight": orchestrator.singleflight.stats(),
+        "admission": admission.stats(),
+        "model_warmup": get_model_warmer().stats(),
+        "cluster": cluster,
     }
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: get / list з store informers проти запиту до API (fake apiserver)
+
+Порівнює для --pods pods у namespace:
+  - api: NativeKubeWrapper.get (HTTP round-trip на кожен виклик)
+  - informer: ClusterState.lookup зі store (після одного list + watch)
+
+Використання:
+  python benchmarks/bench_informer.py --pods 2000 -n 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fake_kube import FakeKubeServer, make_pod, write_kubeconfig  # noqa: E402
+from k8s.informer import ClusterState  # noqa: E402
+from k8s.native_client import NativeKubeWrapper  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pods", type=int, default=2000, help="Pods у fake кластері")
+    parser.add_argument("-n", type=int, default=200, help="Викликів на сценарій")
+    args = parser.parse_args()
+
+    fake = FakeKubeServer()
+    for i in range(args.pods):
+        fake.add("pods", make_pod(f"app{i % 50}-{i}", "shop"))
+    kubeconfig = str(write_kubeconfig(Path(tempfile.mkdtemp()) / "kubeconfig", fake.start(), "shop"))
+
+    wrapper = NativeKubeWrapper(kubeconfig)
+    state = ClusterState(["pods"], kubeconfig=kubeconfig)
+    state.start()
+    state.wait_for_sync()
+
+    scenarios = {
+        "get pod": (
+            lambda: wrapper.get("pods", "app7-7"),
+            lambda: state.lookup("pods", "app7-7"),
+        ),
+        "list -l app=app7": (
+            lambda: wrapper.get("pods", label_selector="app=app7"),
+            lambda: state.lookup("pods", label_selector="app=app7"),
+        ),
+    }
+
+    print(f"{'query':<20}{'api ms':>10}{'informer µs':>14}")
+    for name, (api, local) in scenarios.items():
+        timings = []
+        for run in (api, local):
+            start = time.perf_counter()
+            for _ in range(args.n):
+                run()
+            timings.append((time.perf_counter() - start) / args.n)
+        print(f"{name:<20}{timings[0] * 1000:>10.2f}{timings[1] * 1e6:>14.1f}")
+
+    state.stop()
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N послідовних get pod на subprocess (kubectl) і native (Kubernetes API) backend
+
+Без --kubeconfig запускається fake apiserver (benchmarks/fake_kube.py); якщо
+kubectl немає в PATH, subprocess backend викликає kubectl shim з fake_kube.py
+(той самий fork + старт інтерпретатора + завантаження kubeconfig на кожен виклик)
+
+Використання:
+  python benchmarks/bench_k8s_backends.py -n 100
+  python benchmarks/bench_k8s_backends.py --kubeconfig ~/.kube/config --namespace kube-system --pod coredns-xxx
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fake_kube import FakeKubeServer, make_pod, write_kubeconfig  # noqa: E402
+from k8s.kubectl_wrapper import create_kubectl_wrapper  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=100, help="Послідовних get на backend")
+    parser.add_argument("--kubeconfig", help="Реальний кластер замість fake apiserver")
+    parser.add_argument("--namespace", default="default")
+    parser.add_argument("--pod", default="api-0", help="Pod для get")
+    args = parser.parse_args()
+
+    fake = None
+    kubeconfig = args.kubeconfig
+    if kubeconfig is None:
+        fake = FakeKubeServer()
+        fake.add("pods", make_pod(args.pod, args.namespace))
+        url = fake.start()
+        kubeconfig = str(write_kubeconfig(Path(tempfile.mkdtemp()) / "kubeconfig", url, args.namespace))
+
+    subprocess_backend = create_kubectl_wrapper(kubeconfig, backend="kubectl")
+    if shutil.which("kubectl") is None:
+        shim = [sys.executable, str(PROJECT_ROOT / "benchmarks" / "fake_kube.py")]
+        build = subprocess_backend._build_command
+        subprocess_backend._build_command = lambda command: shim + build(command)[1:]
+        print("kubectl не знайдено - subprocess backend через shim (python)")
+
+    backends = {
+        "subprocess": subprocess_backend,
+        "native": create_kubectl_wrapper(kubeconfig, backend="native"),
+    }
+
+    print(f"{'backend':<12}{'total s':>10}{'ms/get':>10}{'conns':>8}")
+    for name, wrapper in backends.items():
+        connections = fake.connections if fake else 0
+        start = time.perf_counter()
+        for _ in range(args.n):
+            pod = wrapper.get("pods", args.pod, namespace=args.namespace)
+            assert pod.get("metadata", {}).get("name") == args.pod, f"{name}: get failed"
+        elapsed = time.perf_counter() - start
+        opened = f"{fake.connections - connections}" if fake else "-"
+        print(f"{name:<12}{elapsed:>10.2f}{elapsed / args.n * 1000:>10.1f}{opened:>8}")
+
+    if fake:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
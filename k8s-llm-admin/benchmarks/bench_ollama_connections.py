@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: накладні витрати з'єднання на один запит до Ollama
+
+Порівнює:
+  - before: нове з'єднання на кожен запит (як module-level requests.post)
+  - pooled TCP: один OllamaClient з keep-alive пулом
+  - pooled UDS: той самий client через Unix domain socket
+
+Використання:
+  python benchmarks/bench_ollama_connections.py -n 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fake_ollama import FakeOllamaServer  # noqa: E402
+from llm.ollama_client import OllamaClient  # noqa: E402
+
+PAYLOAD = {"model": "bench", "prompt": "ping", "stream": False}
+
+
+async def bench_new_connection(base_url: str, n: int) -> float:
+    def post() -> None:
+        response = requests.post(f"{base_url}/api/generate", json=PAYLOAD, timeout=10)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    for _ in range(n):
+        # Fake server живе в цьому ж event loop, тому requests - в окремому потоці
+        await asyncio.to_thread(post)
+    return time.perf_counter() - start
+
+
+async def bench_pooled(client: OllamaClient, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await client._make_request(client.generate_path, PAYLOAD)
+    return time.perf_counter() - start
+
+
+def report(name: str, elapsed: float, n: int, connections: int) -> None:
+    print(f"{name:<24} {elapsed * 1e6 / n:>10.1f} µs/req {n / elapsed:>10.0f} req/s {connections:>8} conns")
+
+
+async def main(n: int) -> None:
+    print(f"{'mode':<24} {'latency':>17} {'throughput':>16} {'opened':>8}")
+
+    server = FakeOllamaServer()
+    base_url = await server.start_tcp()
+    elapsed = await bench_new_connection(base_url, n)
+    report("before (requests.post)", elapsed, n, server.connections)
+    await server.stop()
+
+    server = FakeOllamaServer()
+    base_url = await server.start_tcp()
+    client = OllamaClient(base_url=base_url)
+    elapsed = await bench_pooled(client, n)
+    report("pooled TCP keep-alive", elapsed, n, server.connections)
+    await client.aclose()
+    await server.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "ollama.sock")
+        server = FakeOllamaServer()
+        await server.start_unix(socket_path)
+        client = OllamaClient(base_url="http://localhost", socket_path=socket_path)
+        elapsed = await bench_pooled(client, n)
+        report("pooled Unix socket", elapsed, n, server.connections)
+        await client.aclose()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt_eval_duration для холодного та теплого prompt префіксу
+
+Порівнює layouts:
+  - legacy: весь промпт одним рядком у `prompt`
+  - stable: статичний префікс у `system`, динамічна частина в `prompt`
+
+cold - перший запит з новим префіксом (унікальний nonce на початку),
+warm - наступні запити з тим самим префіксом та різними питаннями.
+
+Використання:
+  python benchmarks/bench_prompt_prefix.py --url http://localhost:11434 -n 10
+  python benchmarks/bench_prompt_prefix.py --fake   # без Ollama, симуляція KV cache
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fake_ollama import FakeOllamaServer  # noqa: E402
+from config.settings import settings  # noqa: E402
+from llm.concurrency import NS  # noqa: E402
+from llm.ollama_client import OllamaClient  # noqa: E402
+from prompts.multilang_prompts import Language, PromptParts, prompt_manager  # noqa: E402
+
+QUESTIONS = [
+    "Под payments-api у CrashLoopBackOff після деплою",
+    "Под не може витягнути image з ECR",
+    "Под у Pending вже 10 хвилин",
+    "Контейнер перезапускається з OOMKilled",
+    "Readiness probe падає з timeout",
+]
+
+CLUSTERS = [
+    {"cluster_name": "prod", "region": "eu-west-1", "k8s_version": "1.29"},
+    {"cluster_name": "staging", "region": "eu-central-1", "k8s_version": "1.30"},
+]
+
+
+def build(layout: str, question: str, cluster: Dict, nonce: str) -> PromptParts:
+    if layout == "stable":
+        parts = prompt_manager.build_prompt_parts(question, "pod", Language.UKRAINIAN, cluster)
+        return PromptParts(system=f"{nonce}\n{parts.system}", prompt=parts.prompt)
+
+    full = prompt_manager.build_full_prompt(question, "pod", Language.UKRAINIAN, cluster)
+    return PromptParts(system="", prompt=f"{nonce}\n{full}")
+
+
+async def measure(client: OllamaClient, parts: PromptParts) -> Tuple[int, float]:
+    """-> (prompt_eval_count, prompt_eval_duration ms)"""
+    payload = {
+        "model": client.model,
+        "prompt": parts.prompt,
+        "stream": False,
+        "options": {"num_predict": 1, "temperature": 0},
+    }
+    if parts.system:
+        payload["system"] = parts.system
+    data = await client._make_request(client.generate_path, client._with_keep_alive(payload))
+    return data.get("prompt_eval_count", 0), data.get("prompt_eval_duration", 0) / NS * 1000
+
+
+async def bench_layout(client: OllamaClient, layout: str, n: int) -> Dict[str, List[Tuple[int, float]]]:
+    nonce = f"# run {uuid.uuid4().hex}"
+    results: Dict[str, List[Tuple[int, float]]] = {"cold": [], "warm": []}
+
+    results["cold"].append(await measure(client, build(layout, QUESTIONS[0], CLUSTERS[0], nonce)))
+    for i in range(1, n + 1):
+        parts = build(layout, QUESTIONS[i % len(QUESTIONS)], CLUSTERS[i % len(CLUSTERS)], nonce)
+        results["warm"].append(await measure(client, parts))
+    return results
+
+
+def fake_prefix_cache_handler():
+    """Fake Ollama з KV prefix cache: оцінюються тільки токени після спільного префіксу"""
+    seen: List[str] = []
+
+    async def handler(path: str, payload: Dict) -> Dict:
+        rendered = f"<system>{payload.get('system', '')}</system><user>{payload['prompt']}</user>"
+        shared = 0
+        for previous in seen[-4:]:  # Кілька слотів, як OLLAMA_NUM_PARALLEL
+            common = 0
+            for a, b in zip(previous, rendered):
+                if a != b:
+                    break
+                common += 1
+            shared = max(shared, common)
+        seen.append(rendered)
+
+        tokens = max(1, (len(rendered) - shared) // 4)
+        return {
+            "response": "ok",
+            "done": True,
+            "prompt_eval_count": tokens,
+            "prompt_eval_duration": int(tokens * 0.0002 * NS),  # ~5000 tok/s prefill
+            "eval_count": 1,
+            "eval_duration": int(0.02 * NS),
+        }
+
+    return handler
+
+
+def report(layout: str, results: Dict[str, List[Tuple[int, float]]]) -> None:
+    for phase, samples in results.items():
+        tokens = statistics.mean(s[0] for s in samples)
+        millis = statistics.mean(s[1] for s in samples)
+        print(f"{layout:<8} {phase:<6} {tokens:>12.0f} {millis:>14.1f}")
+
+
+async def main(url: str, n: int, fake: bool) -> None:
+    server = None
+    if fake:
+        server = FakeOllamaServer(fake_prefix_cache_handler())
+        url = await server.start_tcp()
+
+    client = OllamaClient(base_url=url, timeout=300)
+    print(f"{'layout':<8} {'phase':<6} {'prompt tokens':>12} {'prompt_eval ms':>14}")
+    try:
+        for layout in ("legacy", "stable"):
+            report(layout, await bench_layout(client, layout, n))
+    finally:
+        await client.aclose()
+        if server is not None:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.OLLAMA_BASE_URL)
+    parser.add_argument("-n", "--requests", type=int, default=10)
+    parser.add_argument("--fake", action="store_true", help="Fake Ollama з симуляцією prefix cache")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.requests, args.fake))
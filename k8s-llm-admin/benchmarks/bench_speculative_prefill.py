@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end латентність діагностики з та без speculative prefill
+
+Поки збирається kubectl evidence, orchestrator може відправити prefill
+статичного system prompt, щоб основний запит знайшов префікс у KV cache.
+
+Fake Ollama моделює один слот з prefix cache (prefill ~5000 tok/s), fake
+kubectl - фіксовану затримку. Перед кожною діагностикою cache скидається
+(префікс витіснений іншим трафіком) - найгірший і найцікавіший випадок.
+
+Використання:
+  python benchmarks/bench_speculative_prefill.py -n 10 --kubectl-ms 400
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.fake_ollama import FakeOllamaServer  # noqa: E402
+from config.settings import settings  # noqa: E402
+from llm.concurrency import NS  # noqa: E402
+from llm.ollama_client import OllamaClient  # noqa: E402
+from llm.prompt_manager import DiagnosticRequest, PromptOrchestrator  # noqa: E402
+from prompts.multilang_prompts import Language  # noqa: E402
+
+PREFILL_SECONDS_PER_TOKEN = 0.0002
+DECODE_SECONDS = 0.05
+
+
+class PrefixCacheOllama:
+    """Один слот Ollama: запити виконуються по черзі, спільний префікс не оцінюється"""
+
+    def __init__(self) -> None:
+        self.cached = ""
+        self.lock = asyncio.Lock()
+
+    def reset(self) -> None:
+        self.cached = ""
+
+    async def __call__(self, path: str, payload: Dict) -> Dict:
+        rendered = f"<system>{payload.get('system', '')}</system><user>{payload['prompt']}</user>"
+        async with self.lock:
+            shared = 0
+            for a, b in zip(self.cached, rendered):
+                if a != b:
+                    break
+                shared += 1
+            tokens = max(1, (len(rendered) - shared) // 4)
+            prefill = tokens * PREFILL_SECONDS_PER_TOKEN
+            decode = DECODE_SECONDS if payload["options"].get("num_predict", 0) > 1 else 0.0
+            await asyncio.sleep(prefill + decode)
+            self.cached = rendered
+
+        return {
+            "response": "ok",
+            "done": True,
+            "prompt_eval_count": tokens,
+            "prompt_eval_duration": int(prefill * NS),
+            "eval_count": 1,
+            "eval_duration": int(max(decode, 0.001) * NS),
+        }
+
+
+class FakeEvidence:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    async def collect(self, resource_type, name, namespace="default") -> str:
+        await asyncio.sleep(self.delay)
+        return f"Name: {name}\nStatus: CrashLoopBackOff\nLast State: Terminated (OOMKilled)"
+
+
+async def run(orchestrator: PromptOrchestrator, fake: PrefixCacheOllama, n: int) -> List[float]:
+    latencies = []
+    for i in range(n):
+        fake.reset()
+        start = time.perf_counter()
+        await orchestrator.diagnose(DiagnosticRequest(
+            user_message=f"Чому под payments-api-{i} перезапускається?",
+            resource_type="pod",
+            resource_name=f"payments-api-{i}",
+            language=Language.UKRAINIAN,
+        ))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main(n: int, kubectl_ms: float) -> None:
+    settings.ENABLE_CACHE = False
+    settings.PROMPT_STABLE_PREFIX = True
+
+    fake = PrefixCacheOllama()
+    server = FakeOllamaServer(fake)
+    url = await server.start_tcp()
+
+    orchestrator = PromptOrchestrator()
+    orchestrator.llm_client = OllamaClient(base_url=url, initial_concurrency=4)
+    orchestrator.evidence = FakeEvidence(kubectl_ms / 1000)
+
+    print(f"{'mode':<22} {'mean ms':>10} {'p50 ms':>10} {'max ms':>10}")
+    try:
+        for label, enabled in (("sequential", False), ("speculative prefill", True)):
+            settings.SPECULATIVE_PREFILL = enabled
+            latencies = [x * 1000 for x in await run(orchestrator, fake, n)]
+            print(
+                f"{label:<22} {statistics.mean(latencies):>10.1f} "
+                f"{statistics.median(latencies):>10.1f} {max(latencies):>10.1f}",
+            )
+    finally:
+        await orchestrator.llm_client.aclose()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--requests", type=int, default=10)
+    parser.add_argument("--kubectl-ms", type=float, default=400)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.kubectl_ms))
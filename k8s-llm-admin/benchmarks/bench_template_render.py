@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput рендерингу Jinja2 templates
+
+Порівнює:
+  - from_string: парсинг + компіляція на кожен рендер (як було раніше)
+  - registry: вбудовані templates, скомпільовані один раз
+  - custom LRU: кастомний template, повторно за тим самим вмістом
+  - cold start: створення registry без / з bytecode cache на диску
+
+Використання:
+  python benchmarks/bench_template_render.py -n 2000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from jinja2 import Environment  # noqa: E402
+
+from prompts.templates import DIAGNOSTIC_TEMPLATE, TemplateRegistry  # noqa: E402
+
+CONTEXT = {
+    "severity": "critical",
+    "resource_type": "pod",
+    "namespace": "prod",
+    "cluster_name": "prod-eu-1",
+    "k8s_version": "1.29",
+    "timestamp": "2024-05-01T10:00:00Z",
+    "issue_description": "Под payments-api у CrashLoopBackOff після деплою",
+    "kubectl_output": "State: Waiting\nReason: CrashLoopBackOff\nExit Code: 137",
+    "recent_changes": [{"timestamp": "09:55", "description": "Deployment payments-api оновлено до v2.3"}],
+    "similar_incidents": [{"date": "2024-04-12", "title": "OOMKilled", "resolution_summary": "memory limit 512Mi -> 1Gi"}],
+}
+
+
+def throughput(render: Callable[[], str], n: int) -> float:
+    """renders/s"""
+    start = time.perf_counter()
+    for _ in range(n):
+        render()
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=2000, help="Кількість рендерів на сценарій")
+    args = parser.parse_args()
+
+    env = Environment()
+    registry = TemplateRegistry()
+    custom = DIAGNOSTIC_TEMPLATE + "\n{{ namespace }}"
+
+    results = {
+        "from_string": throughput(lambda: env.from_string(DIAGNOSTIC_TEMPLATE).render(**CONTEXT), args.n),
+        "registry": throughput(lambda: registry.render("diagnostic", CONTEXT), args.n),
+        "custom LRU": throughput(lambda: registry.custom(custom).render(**CONTEXT), args.n),
+    }
+
+    print(f"{'scenario':<14}{'renders/s':>12}{'speedup':>10}")
+    for name, rate in results.items():
+        print(f"{name:<14}{rate:>12.0f}{rate / results['from_string']:>9.1f}x")
+
+    # Cold start: перший процес компілює, наступні - читають bytecode з диску
+    with tempfile.TemporaryDirectory() as cache_dir:
+        timings = {}
+        for label, directory in (("no cache", None), ("cache miss", cache_dir), ("cache hit", cache_dir)):
+            start = time.perf_counter()
+            TemplateRegistry(cache_dir=Path(directory) if directory else None)
+            timings[label] = (time.perf_counter() - start) * 1000
+
+    print()
+    print("registry cold start: " + ", ".join(f"{label} {ms:.1f} ms" for label, ms in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
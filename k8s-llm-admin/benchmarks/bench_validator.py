@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PromptValidator на великому kubectl dump
+
+Порівнює:
+  - per-pattern: окремий re.search на кожен pattern (як було раніше)
+  - single pass: validate_prompt + classify_security_level через один scan
+  - stream: scan_chunks по 4 KB
+
+Використання:
+  python benchmarks/bench_validator.py --size-kb 200 -n 20
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from prompts.validators import PromptValidator  # noqa: E402
+
+WORDS = "pod container image pull error backoff restart kubelet node ready status namespace default".split()
+
+
+def make_dump(size_kb: int) -> str:
+    random.seed(0)
+    lines, size = [], 0
+    while size < size_kb * 1024:
+        line = " ".join(random.choice(WORDS) for _ in range(10))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def per_pattern(validator: PromptValidator, text: str) -> None:
+    """Старий підхід: ~20 повних проходів"""
+    for pattern in validator.FORBIDDEN_PATTERNS + validator.DESTRUCTIVE_COMMANDS:
+        re.search(pattern, text, re.IGNORECASE)
+    lowered = text.lower()
+    any(indicator in lowered for indicator in validator.INJECTION_INDICATORS)
+    for pattern in validator.DESTRUCTIVE_COMMANDS + validator.MODERATE_PATTERNS:
+        re.search(pattern, text, re.IGNORECASE)
+
+
+def single_pass(validator: PromptValidator, text: str) -> None:
+    """Валідація і класифікація з одного scan"""
+    result = validator.scan(text)
+    validator.check(result)
+    result.security_level
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-kb", type=int, default=200, help="Розмір dump")
+    parser.add_argument("-n", type=int, default=20, help="Повторів на сценарій")
+    args = parser.parse_args()
+
+    validator = PromptValidator(max_prompt_length=10**9)
+    text = make_dump(args.size_kb)
+    chunks = [text[i:i + 4096] for i in range(0, len(text), 4096)]
+
+    scenarios = {
+        "per-pattern": lambda: per_pattern(validator, text),
+        "single pass": lambda: single_pass(validator, text),
+        "stream 4KB": lambda: validator.scan_chunks(chunks),
+    }
+
+    print(f"{'scenario':<14}{'ms':>10}{'MB/s':>10}")
+    for name, run in scenarios.items():
+        start = time.perf_counter()
+        for _ in range(args.n):
+            run()
+        elapsed = (time.perf_counter() - start) / args.n
+        print(f"{name:<14}{elapsed * 1000:>10.2f}{len(text) / elapsed / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Мінімальний fake Kubernetes API server для бенчмарків і тестів
+HTTP/1.1 з keep-alive, без зовнішніх залежностей; об'єкти в пам'яті,
+resourceVersion і watch (chunked stream подій, 410 після compact)
+
+Як скрипт - kubectl shim для subprocess backend, коли kubectl недоступний:
+  python benchmarks/fake_kube.py --kubeconfig PATH get pods NAME -n NS -o json
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+_PATH = re.compile(
+    r"^/(?:api/v1|apis/(?P<group>[^/]+/[^/]+))"
+    r"(?:/namespaces/(?P<namespace>[^/]+))?/(?P<plural>[^/]+)(?:/(?P<name>[^/]+))?(?:/(?P<sub>log))?$"
+)
+
+
+def make_pod(name: str, namespace: str = "default", phase: str = "Running") -> Dict[str, Any]:
+    return {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "uid": f"uid-{name}",
+            "resourceVersion": "1",
+            "labels": {"app": name.rsplit("-", 1)[0]},
+            "managedFields": [{"manager": "kubectl", "operation": "Update"}],
+        },
+        "spec": {"nodeName": "node-1", "containers": [{"name": "app", "image": "nginx:1.25"}]},
+        "status": {"phase": phase},
+    }
+
+
+class FakeKubeServer:
+    """Fake apiserver: рахує нові з'єднання, запити (без watch) та watch"""
+
+    def __init__(self) -> None:
+        # (plural, namespace, name) -> об'єкт
+        self.objects: Dict[Tuple[str, Optional[str], str], Dict[str, Any]] = {}
+        self.logs: Dict[Tuple[str, str], str] = {}
+        self.connections = 0
+        self.requests = 0
+        self.watches = 0
+        self.resource_version = 0
+        # (resourceVersion, plural, type, об'єкт) для watch; старші за compacted - 410
+        self.history: List[Tuple[int, str, str, Dict[str, Any]]] = []
+        self.compacted = 0
+        self._changed = threading.Condition()
+        self._stopped = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def add(self, plural: str, obj: Dict[str, Any]) -> None:
+        """Створити або оновити об'єкт (нова resourceVersion, подія для watch)"""
+        metadata = obj["metadata"]
+        key = (plural, metadata.get("namespace"), metadata["name"])
+        with self._changed:
+            self.resource_version += 1
+            metadata["resourceVersion"] = str(self.resource_version)
+            event_type = "MODIFIED" if key in self.objects else "ADDED"
+            self.objects[key] = obj
+            self.history.append((self.resource_version, plural, event_type, obj))
+            self._changed.notify_all()
+
+    def delete(self, plural: str, namespace: Optional[str], name: str) -> None:
+        with self._changed:
+            obj = self.objects.pop((plural, namespace, name))
+            self.resource_version += 1
+            self.history.append((self.resource_version, plural, "DELETED", obj))
+            self._changed.notify_all()
+
+    def compact(self) -> None:
+        """Як etcd compaction: watch від старіших версій отримає 410 Gone"""
+        with self._changed:
+            self.compacted = self.resource_version
+            self.history.clear()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки і тіло - окремі write: без TCP_NODELAY +40ms delayed ACK
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                server.connections += 1
+                super().setup()
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if "watch=true" in self.path:
+                    server.watch(self)
+                    return
+                server.requests += 1
+                status, content_type, body = server.handle(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        sock_host, sock_port = self._server.server_address[:2]
+        return f"http://{sock_host}:{sock_port}"
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def handle(self, raw_path: str) -> Tuple[int, str, bytes]:
+        url = urlsplit(raw_path)
+        query = parse_qs(url.query)
+        match = _PATH.match(url.path)
+        if match is None:
+            return self._status(404, "NotFound", url.path)
+        plural, namespace, name = match["plural"], match["namespace"], match["name"]
+
+        if match["sub"] == "log":
+            text = self.logs.get((namespace, name))
+            if text is None:
+                return self._status(404, "NotFound", f"pods {name}")
+            tail = int(query.get("tailLines", ["0"])[0])
+            if tail:
+                text = "".join(text.splitlines(keepends=True)[-tail:])
+            return 200, "text/plain", text.encode()
+
+        if name:
+            obj = self.objects.get((plural, namespace, name))
+            if obj is None:
+                return self._status(404, "NotFound", f'{plural} "{name}" not found')
+            return 200, "application/json", json.dumps(obj).encode()
+
+        items = [
+            # Як apiserver: у елементах списку немає apiVersion/kind
+            {k: v for k, v in obj.items() if k not in ("apiVersion", "kind")}
+            for (obj_plural, obj_namespace, _), obj in self.objects.items()
+            if obj_plural == plural and namespace in (None, obj_namespace)
+        ]
+        for selector in query.get("labelSelector", []):
+            key, _, value = selector.partition("=")
+            items = [i for i in items if i["metadata"].get("labels", {}).get(key) == value]
+        kind = plural[:-1].capitalize() + "List"
+        body = {"apiVersion": "v1", "kind": kind, "metadata": {"resourceVersion": str(self.resource_version)}, "items": items}
+        return 200, "application/json", json.dumps(body).encode()
+
+    def watch(self, handler: BaseHTTPRequestHandler) -> None:
+        """Chunked stream подій від resourceVersion до timeoutSeconds"""
+        url = urlsplit(handler.path)
+        query = parse_qs(url.query)
+        plural = _PATH.match(url.path)["plural"]
+        since = int(query.get("resourceVersion", ["0"])[0] or 0)
+        deadline = time.monotonic() + float(query.get("timeoutSeconds", ["300"])[0])
+        self.watches += 1
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def send(event: Dict[str, Any]) -> None:
+            data = json.dumps(event).encode() + b"\n"
+            handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        try:
+            if since < self.compacted:
+                send({"type": "ERROR", "object": {"kind": "Status", "code": 410, "reason": "Expired",
+                                                  "message": f"too old resource version: {since}"}})
+            else:
+                while not self._stopped.is_set():
+                    with self._changed:
+                        events = [e for e in self.history if e[0] > since and e[1] == plural]
+                        if not events:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                break
+                            self._changed.wait(min(remaining, 0.5))
+                            continue
+                    for version, _, event_type, obj in events:
+                        send({"type": event_type, "object": obj})
+                        since = version
+            handler.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
+
+    @staticmethod
+    def _status(code: int, reason: str, message: str) -> Tuple[int, str, bytes]:
+        body = {"kind": "Status", "apiVersion": "v1", "status": "Failure", "reason": reason, "message": message, "code": code}
+        return code, "application/json", json.dumps(body).encode()
+
+
+def write_kubeconfig(path: Path, server: str, namespace: str = "default") -> Path:
+    """kubeconfig на fake server (token auth)"""
+    path.write_text(
+        "apiVersion: v1\nkind: Config\n"
+        f"clusters:\n- name: fake\n  cluster:\n    server: {server}\n"
+        f"contexts:\n- name: fake\n  context:\n    cluster: fake\n    user: fake\n    namespace: {namespace}\n"
+        "current-context: fake\n"
+        "users:\n- name: fake\n  user:\n    token: fake-token\n"
+    )
+    return path
+
+
+def _shim(argv: list) -> int:
+    """kubectl get -o json / logs через HTTP на fake server з kubeconfig"""
+    import urllib.error
+    import urllib.request
+
+    import yaml
+
+    args, options = [], {}
+    iterator = iter(argv)
+    for arg in iterator:
+        if arg.startswith("--") and "=" in arg:
+            key, _, value = arg.partition("=")
+            options[key] = value
+        elif arg in ("--kubeconfig", "-n", "-o", "-l", "--field-selector", "--tail", "-c"):
+            options[arg] = next(iterator)
+        elif not arg.startswith("-"):
+            args.append(arg)
+
+    config = yaml.safe_load(Path(options["--kubeconfig"]).read_text())
+    server = config["clusters"][0]["cluster"]["server"]
+    namespace = options.get("-n") or config["contexts"][0]["context"].get("namespace", "default")
+
+    if args[0] == "logs":
+        path = f"/api/v1/namespaces/{namespace}/pods/{args[1]}/log?tailLines={options.get('--tail', 0)}"
+    else:
+        plural = args[1] if args[1].endswith("s") else args[1] + "s"
+        path = f"/api/v1/namespaces/{namespace}/{plural}" + (f"/{args[2]}" if len(args) > 2 else "")
+
+    try:
+        with urllib.request.urlopen(server + path) as response:
+            sys.stdout.write(response.read().decode())
+        return 0
+    except urllib.error.HTTPError as e:
+        sys.stderr.write(json.loads(e.read()).get("message", "") + "\n")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(_shim(sys.argv[1:]))
@@ -0,0 +1,83 @@
+"""
+Мінімальний fake Ollama сервер для бенчмарків
+HTTP/1.1 з keep-alive, TCP або Unix socket, без зовнішніх залежностей
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+Handler = Callable[[str, Dict], Awaitable[Dict]]
+
+
+async def default_handler(path: str, payload: Dict) -> Dict:
+    """Відповідь у форматі /api/generate"""
+    return {"response": "ok", "done": True, "eval_count": 1, "prompt_eval_count": 1}
+
+
+class FakeOllamaServer:
+    """Fake Ollama: рахує нові з'єднання та запити"""
+
+    def __init__(self, handler: Handler = default_handler):
+        self.handler = handler
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._serve, host, port)
+        sock_host, sock_port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{sock_host}:{sock_port}"
+
+    async def start_unix(self, path: str) -> str:
+        self._server = await asyncio.start_unix_server(self._serve, path)
+        return path
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for task in self._handlers:
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode().split(" ", 2)
+
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                payload = json.loads(body) if body else {}
+
+                self.requests += 1
+                result = json.dumps(await self.handler(path, payload)).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(result)}\r\n\r\n".encode()
+                    + result
+                )
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
@@ -4,7 +4,7 @@ Environment variables, constants, configuration
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -21,21 +21,84 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str = Field(default="http://localhost:11434", env="OLLAMA_URL")
     OLLAMA_MODEL: str = Field(default="llama3.2:3b", env="OLLAMA_MODEL")
     OLLAMA_TIMEOUT: int = Field(default=120, env="OLLAMA_TIMEOUT")
+    OLLAMA_SOCKET_PATH: Optional[str] = Field(default=None, env="OLLAMA_SOCKET")  # Unix socket замість TCP
+    OLLAMA_POOL_SIZE: int = Field(default=32, env="OLLAMA_POOL_SIZE")
+    OLLAMA_KEEPALIVE_CONNECTIONS: int = Field(default=16, env="OLLAMA_KEEPALIVE_CONNECTIONS")
+    OLLAMA_KEEPALIVE_EXPIRY: float = Field(default=120.0, env="OLLAMA_KEEPALIVE_EXPIRY")
+    OLLAMA_BACKEND_URLS: str = Field(default="", env="OLLAMA_URLS")  # Кілька хостів через кому
+    OLLAMA_EJECT_AFTER_FAILURES: int = Field(default=3, env="OLLAMA_EJECT_AFTER_FAILURES")
+    OLLAMA_PROBE_INTERVAL: float = Field(default=15.0, env="OLLAMA_PROBE_INTERVAL")
+    OLLAMA_INITIAL_CONCURRENCY: int = Field(default=2, env="OLLAMA_INITIAL_CONCURRENCY")  # AIMD, на backend
+    OLLAMA_MAX_CONCURRENCY: int = Field(default=16, env="OLLAMA_MAX_CONCURRENCY")
+    OLLAMA_QUEUE_DELAY_THRESHOLD: float = Field(default=0.5, env="OLLAMA_QUEUE_DELAY_THRESHOLD")
+    OLLAMA_KEEP_ALIVE: Optional[str] = Field(default="30m", env="OLLAMA_KEEP_ALIVE")  # "-1" - назавжди
+    OLLAMA_WARMUP_MODELS: str = Field(default="", env="OLLAMA_WARMUP_MODELS")  # Через кому, default - OLLAMA_MODEL
+    OLLAMA_COLD_LOAD_THRESHOLD: float = Field(default=1.0, env="OLLAMA_COLD_LOAD_THRESHOLD")
+    OLLAMA_KEEPER_INTERVAL: float = Field(default=60.0, env="OLLAMA_KEEPER_INTERVAL")
     
     # LLM Parameters
     LLM_TEMPERATURE: float = Field(default=0.7, env="LLM_TEMPERATURE")
     LLM_MAX_TOKENS: int = Field(default=2000, env="LLM_MAX_TOKENS")
-    LLM_CONTEXT_WINDOW: int = Field(default=8192, env="LLM_CONTEXT_WINDOW")
+    LLM_CONTEXT_WINDOW: int = Field(default=8192, env="LLM_CONTEXT_WINDOW")  # Максимальний num_ctx
+    # num_ctx на запит округлюється до bucket (менше перезавантажень runner в Ollama)
+    LLM_NUM_CTX_BUCKETS: str = Field(default="2048,4096,8192,16384,32768", env="LLM_NUM_CTX_BUCKETS")
+    # Статичний system prompt окремим полем `system` (KV prefix cache в Ollama)
+    PROMPT_STABLE_PREFIX: bool = Field(default=True, env="PROMPT_STABLE_PREFIX")
+    # Prefill system prompt паралельно зі збором kubectl evidence
+    SPECULATIVE_PREFILL: bool = Field(default=True, env="SPECULATIVE_PREFILL")
+    # Tokenizer для бюджету промпта: <TOKENIZER_DIR>/<family>/tokenizer.json
+    TOKENIZER_DIR: Path = Field(default=Path("./data/tokenizers"), env="TOKENIZER_DIR")
+    TOKENIZER_DOWNLOAD: bool = Field(default=False, env="TOKENIZER_DOWNLOAD")  # З HF Hub, якщо файлу немає
+    # Jinja2 bytecode cache (швидкий cold start) та LRU кастомних templates
+    TEMPLATE_CACHE_DIR: Path = Field(default=Path("./data/jinja_cache"), env="TEMPLATE_CACHE_DIR")
+    TEMPLATE_CUSTOM_CACHE_SIZE: int = Field(default=128, env="TEMPLATE_CUSTOM_CACHE_SIZE")
+    # PromptValidator на кожен запит: питання + injection у kubectl evidence
+    PROMPT_VALIDATION: bool = Field(default=False, env="PROMPT_VALIDATION")
+    
+    # LLM Admission (черга перед Ollama)
+    # 0 - ємність = сума AIMD лімітів backends; > 0 - ще й фіксована стеля
+    LLM_MAX_CONCURRENCY: int = Field(default=0, env="LLM_MAX_CONCURRENCY")
+    LLM_MAX_QUEUE_DEPTH: int = Field(default=64, env="LLM_MAX_QUEUE_DEPTH")
+    LLM_QUEUE_TIMEOUT: float = Field(default=30.0, env="LLM_QUEUE_TIMEOUT")
     
     # AWS EKS
     AWS_REGION: str = Field(default="eu-west-1", env="AWS_REGION")
     AWS_PROFILE: Optional[str] = Field(default=None, env="AWS_PROFILE")
     EKS_CLUSTER_NAME: str = Field(default="", env="EKS_CLUSTER_NAME")
+    # Deadline одного кроку diagnostic bundle; крок, що не встиг, - у missing
+    EKS_BUNDLE_STEP_TIMEOUT: float = Field(default=20.0, env="EKS_BUNDLE_STEP_TIMEOUT")
     
     # Kubernetes
     KUBECONFIG_PATH: Optional[str] = Field(default=None, env="KUBECONFIG")
     DEFAULT_NAMESPACE: str = Field(default="default", env="K8S_NAMESPACE")
     K8S_TIMEOUT: int = Field(default=30, env="K8S_TIMEOUT")
+    # kubectl (subprocess на кожен виклик) або native (Kubernetes API, pooled з'єднання)
+    K8S_BACKEND: str = Field(default="kubectl", env="K8S_BACKEND")
+    K8S_API_POOL_SIZE: int = Field(default=10, env="K8S_API_POOL_SIZE")
+    K8S_MAX_PROCESSES: int = Field(default=8, env="K8S_MAX_PROCESSES")  # Паралельних kubectl/aws процесів
+    # Informers: list + watch у локальний store, get читає з нього (потрібен доступ до API)
+    K8S_INFORMERS: bool = Field(default=False, env="K8S_INFORMERS")
+    K8S_INFORMER_KINDS: str = Field(
+        default="pods,events,nodes,services,endpoints,deployments,replicasets",
+        env="K8S_INFORMER_KINDS",
+    )
+    K8S_INFORMER_NAMESPACE: Optional[str] = Field(default=None, env="K8S_INFORMER_NAMESPACE")  # None - усі
+    K8S_WATCH_TIMEOUT: int = Field(default=300, env="K8S_WATCH_TIMEOUT")
+    # Read-through кеш get / describe / logs: TTL за kind, NotFound - коротко
+    K8S_READ_CACHE: bool = Field(default=True, env="K8S_READ_CACHE")
+    K8S_READ_CACHE_TTL: float = Field(default=10.0, env="K8S_READ_CACHE_TTL")
+    K8S_READ_CACHE_KIND_TTLS: str = Field(
+        default="nodes=60,namespaces=300,storageclasses=300,persistentvolumes=60,services=30,configmaps=30,"
+                "deployments=15,statefulsets=15,daemonsets=15,replicasets=15,endpoints=10,pods=5,events=3,logs=5",
+        env="K8S_READ_CACHE_KIND_TTLS",
+    )
+    K8S_NOT_FOUND_TTL: float = Field(default=2.0, env="K8S_NOT_FOUND_TTL")
+    K8S_READ_CACHE_MAX_BYTES: int = Field(default=32 * 1024 * 1024, env="K8S_READ_CACHE_MAX_BYTES")
+    EVIDENCE_LOG_TAIL: int = Field(default=10000, env="EVIDENCE_LOG_TAIL")
+    # Логи pod у промпт як шаблони (Drain) замість сирого tail
+    LOG_TEMPLATE_SUMMARY: bool = Field(default=True, env="LOG_TEMPLATE_SUMMARY")
+    # Маскування секретів, AWS ключів, IP у kubectl виводі до промпта
+    REDACT_EVIDENCE: bool = Field(default=True, env="REDACT_EVIDENCE")
     
     # Language
     DEFAULT_LANGUAGE: str = Field(default="uk", env="DEFAULT_LANGUAGE")
@@ -59,15 +122,45 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     LOG_FILE: Optional[Path] = Field(default=None, env="LOG_FILE") # Kept for backward compatibility if needed
     LOG_DIR: Path = Field(default=Path("./logs"), env="LOG_DIR")
+    REDACT_LOGS: bool = Field(default=True, env="REDACT_LOGS")  # Маскування в усіх log sinks
     
     # Cache
     ENABLE_CACHE: bool = Field(default=True, env="ENABLE_CACHE")
     CACHE_TTL_SECONDS: int = Field(default=3600, env="CACHE_TTL")
+    CACHE_MAX_ENTRIES: int = Field(default=1024, env="CACHE_MAX_ENTRIES")
+    CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, env="CACHE_MAX_BYTES")
     
     # Monitoring
     ENABLE_METRICS: bool = Field(default=True, env="ENABLE_METRICS")
     METRICS_PORT: int = Field(default=9090, env="METRICS_PORT")
     
+    @property
+    def ollama_backend_urls(self) -> List[str]:
+        """Список Ollama backends з OLLAMA_URLS (порожній - один OLLAMA_URL)"""
+        return [url.strip() for url in self.OLLAMA_BACKEND_URLS.split(",") if url.strip()]
+    
+    @property
+    def num_ctx_buckets(self) -> List[int]:
+        """Розміри num_ctx з LLM_NUM_CTX_BUCKETS (порожній - завжди LLM_CONTEXT_WINDOW)"""
+        return sorted(int(size) for size in self.LLM_NUM_CTX_BUCKETS.split(",") if size.strip())
+    
+    @property
+    def informer_kinds(self) -> List[str]:
+        """Типи ресурсів для informers з K8S_INFORMER_KINDS"""
+        return [kind.strip() for kind in self.K8S_INFORMER_KINDS.split(",") if kind.strip()]
+    
+    @property
+    def read_cache_ttls(self) -> Dict[str, float]:
+        """TTL за kind з K8S_READ_CACHE_KIND_TTLS (`kind=seconds` через кому)"""
+        pairs = (item.split("=", 1) for item in self.K8S_READ_CACHE_KIND_TTLS.split(",") if "=" in item)
+        return {kind.strip(): float(ttl) for kind, ttl in pairs}
+    
+    @property
+    def warmup_models(self) -> List[str]:
+        """Моделі для preload на старті (default - OLLAMA_MODEL)"""
+        models = [m.strip() for m in self.OLLAMA_WARMUP_MODELS.split(",") if m.strip()]
+        return models or [self.OLLAMA_MODEL]
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
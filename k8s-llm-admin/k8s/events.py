@@ -0,0 +1,170 @@
+"""
+Компактизація Kubernetes events
+Events (JSON) групуються за involvedObject + reason + шаблоном повідомлення:
+лічильники сумуються, зберігається діапазон часу; результат - короткий
+ранжований список замість тисяч рядків BackOff/FailedScheduling
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Змінні частини повідомлення: uuid, суфікси ReplicaSet/pod (алфавіт
+# rand.SafeEncodeString - без голосних), hex, числа
+_VARIABLE_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|(?<=-)[bcdfghjklmnpqrstvwxz2-9]{5,10}(?![a-z0-9])"
+    r"|0x[0-9a-f]+|\d+(?:\.\d+)?",
+)
+
+
+@dataclass
+class EventGroup:
+    """Однакові events одного об'єкта"""
+
+    kind: str
+    name: str
+    namespace: str
+    reason: str
+    type: str
+    template: str
+    message: str  # Останнє повідомлення як приклад
+    count: int = 0
+    events: int = 0  # Скільки Event об'єктів злито в групу
+    first_timestamp: str = ""
+    last_timestamp: str = ""
+
+    @property
+    def is_warning(self) -> bool:
+        return self.type == "Warning"
+
+    @property
+    def time_range(self) -> str:
+        if not self.first_timestamp or self.first_timestamp == self.last_timestamp:
+            return self.last_timestamp
+        return f"{self.first_timestamp} - {self.last_timestamp}"
+
+    def as_template_event(self) -> Dict[str, str]:
+        """Елемент `resource.events` для MULTI_RESOURCE_TEMPLATE"""
+        repeated = f" (×{self.count})" if self.count > 1 else ""
+        return {
+            "timestamp": self.time_range,
+            "message": f"{self.type} {self.reason}{repeated}: {self.message}",
+            "reason": self.reason,
+            "type": self.type,
+            "count": self.count,
+        }
+
+
+def message_template(message: str) -> str:
+    """Повідомлення без змінних частин (ключ групування)"""
+    return _VARIABLE_RE.sub("<*>", " ".join(message.split()))
+
+
+def _timestamps(event: Dict[str, Any]) -> Tuple[str, str]:
+    """(first, last) з core/v1 полів, series або eventTime"""
+    series = event.get("series") or {}
+    created = (event.get("metadata") or {}).get("creationTimestamp") or ""
+    first = event.get("firstTimestamp") or event.get("eventTime") or created
+    last = series.get("lastObservedTime") or event.get("lastTimestamp") or event.get("eventTime") or created
+    # eventTime має мікросекунди - до секунд, щоб рядки порівнювались коректно
+    return first[:19] + "Z" if first else "", last[:19] + "Z" if last else ""
+
+
+def compact_events(items: Iterable[Dict[str, Any]]) -> List[EventGroup]:
+    """
+    Згрупувати events
+
+    Args:
+        items: `items` з `kubectl get events -o json`
+
+    Returns:
+        Групи, ранжовані: Warning першими, далі за кількістю, потім за свіжістю
+    """
+    groups: Dict[Tuple[str, ...], EventGroup] = {}
+
+    for event in items:
+        obj = event.get("involvedObject") or event.get("regarding") or {}
+        message = " ".join((event.get("message") or event.get("note") or "").split())
+        reason = event.get("reason", "")
+        key = (obj.get("kind", ""), obj.get("name", ""), obj.get("namespace", ""), reason, message_template(message))
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = EventGroup(
+                kind=key[0],
+                name=key[1],
+                namespace=key[2],
+                reason=reason,
+                type=event.get("type", "Normal"),
+                template=key[4],
+                message=message,
+            )
+
+        first, last = _timestamps(event)
+        group.count += event.get("count") or (event.get("series") or {}).get("count") or 1
+        group.events += 1
+        if first and (not group.first_timestamp or first < group.first_timestamp):
+            group.first_timestamp = first
+        if last and last >= group.last_timestamp:
+            group.last_timestamp = last
+            group.message = message
+        if event.get("type") == "Warning":
+            group.type = "Warning"
+
+    # Стабільне сортування: спершу за свіжістю, потім за важливістю
+    ranked = sorted(groups.values(), key=lambda g: g.last_timestamp, reverse=True)
+    return sorted(ranked, key=lambda g: (not g.is_warning, -g.count))
+
+
+def format_event_summary(groups: List[EventGroup], max_groups: int = 30) -> str:
+    """Ранжований текстовий підсумок для промпта"""
+    if not groups:
+        return ""
+
+    total = sum(group.count for group in groups)
+    lines = [f"Events: {len(groups)} груп, {total} подій"]
+    for group in groups[:max_groups]:
+        lines.append(
+            f"[{group.type} ×{group.count}] {group.kind}/{group.name} {group.reason}: "
+            f"{group.message} ({group.time_range})"
+        )
+
+    hidden = groups[max_groups:]
+    if hidden:
+        lines.append(f"[... ще {len(hidden)} груп, {sum(g.count for g in hidden)} подій]")
+    return "\n".join(lines)
+
+
+def events_by_object(groups: List[EventGroup]) -> Dict[Tuple[str, str], List[Dict[str, str]]]:
+    """
+    (kind, name) -> `resource.events` для MULTI_RESOURCE_TEMPLATE
+
+    Події в хронологічному порядку (template показує останні п'ять)
+    """
+    result: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+    for group in sorted(groups, key=lambda g: g.last_timestamp):
+        result.setdefault((group.kind, group.name), []).append(group.as_template_event())
+    return result
+
+
+def attach_events(resources: List[Dict[str, Any]], groups: List[EventGroup]) -> List[Dict[str, Any]]:
+    """Заповнити `events` кожного ресурсу (type/name як у MULTI_RESOURCE_TEMPLATE)"""
+    by_object = {
+        (kind.lower(), name): events
+        for (kind, name), events in events_by_object(groups).items()
+    }
+    for resource in resources:
+        key = (str(resource.get("type", "")).lower(), resource.get("name"))
+        resource["events"] = by_object.get(key, [])
+    return resources
+
+
+def fetch_events(
+    kubectl_wrapper: Any,
+    namespace: Optional[str] = None,
+    field_selector: Optional[str] = None,
+) -> List[EventGroup]:
+    """kubectl get events -o json -> згруповані events"""
+    data = kubectl_wrapper.get("events", namespace=namespace, field_selector=field_selector)
+    return compact_events(data.get("items", []))
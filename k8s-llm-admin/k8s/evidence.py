@@ -0,0 +1,73 @@
+"""
+Збір kubectl evidence для діагностики
+describe + events (+ logs для pod) одного ресурсу, паралельно (async kubectl)
+"""
+
+import asyncio
+from typing import List, Optional
+
+from config.settings import settings
+from k8s.events import compact_events, format_event_summary
+from k8s.kubectl_wrapper import KubectlWrapper, kubectl
+from k8s.resources import resolve_resource
+from utils.logger import logger
+
+
+class EvidenceCollector:
+    """kubectl дані про ресурс для промпта"""
+
+    def __init__(
+        self,
+        kubectl_wrapper: KubectlWrapper = kubectl,
+        log_tail: int = settings.EVIDENCE_LOG_TAIL,
+        summarize_logs: bool = settings.LOG_TEMPLATE_SUMMARY,
+    ) -> None:
+        self.kubectl = kubectl_wrapper
+        self.log_tail = log_tail
+        self.summarize_logs = summarize_logs
+
+    async def _events(self, name: str, namespace: str) -> str:
+        """Events ресурсу, згруповані (BackOff x300 - один рядок)"""
+        data = await self.kubectl.aget("events", namespace=namespace, field_selector=f"involvedObject.name={name}")
+        return format_event_summary(compact_events(data.get("items", [])))
+
+    async def collect(
+        self,
+        resource_type: Optional[str],
+        name: str,
+        namespace: str = "default",
+    ) -> str:
+        """
+        Зібрати evidence (kubectl виклики йдуть паралельно, в межах ліміту процесів)
+
+        Returns:
+            Текст для секції kubectl output (порожній якщо нічого не знайдено)
+        """
+        resource = resource_type or "pod"
+        steps = {
+            f"kubectl describe {resource} {name}": self.kubectl.adescribe(resource, name, namespace),
+            f"kubectl get events (involvedObject.name={name})": self._events(name, namespace),
+        }
+        # pod / pods / po / Pod - логи є лише в pod
+        api_resource = resolve_resource(resource)
+        if api_resource is not None and api_resource.kind == "Pod":
+            title = f"kubectl logs {name} --tail={self.log_tail}"
+            steps[f"{title} (шаблони)" if self.summarize_logs else title] = self.kubectl.alogs(
+                name, namespace, tail=self.log_tail, summarize=self.summarize_logs,
+            )
+
+        results = await asyncio.gather(*steps.values(), return_exceptions=True)
+
+        sections: List[str] = []
+        for title, output in zip(steps, results):
+            if isinstance(output, Exception):
+                logger.warning(f"Evidence '{title}' не зібрано: {output}")
+                continue
+            if output and output.strip():
+                sections.append(f"$ {title}\n{output.strip()}")
+
+        return "\n\n".join(sections)
+
+
+# Global instance
+evidence_collector = EvidenceCollector()
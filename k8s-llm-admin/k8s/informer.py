@@ -0,0 +1,562 @@
+"""
+Informers: list + watch ресурсів кластера в локальний індексований store
+
+На кожен kind - один list і далі один довгий watch від його resourceVersion
+(після timeout watch продовжується з останньої версії, після 410 Gone -
+повторний list). Store індексується за namespace, owner, node і label, тож
+get / list для діагностики і health читаються з пам'яті без API round-trip.
+
+Об'єкти в store тільки замінюються (не змінюються на місці) і віддаються без
+копій - читачі не повинні їх змінювати
+"""
+
+import copy
+import json
+import socket
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from kubernetes.client import ApiClient
+
+from config.settings import settings
+from k8s.native_client import _context_namespace, get_api_client
+from k8s.resources import ApiResource, resolve_resource
+from utils.logger import logger
+
+Key = Tuple[str, str]  # (namespace, name)
+
+
+def _namespace_index(obj: Dict[str, Any]) -> List[str]:
+    return [obj["metadata"].get("namespace", "")]
+
+
+def _owner_index(obj: Dict[str, Any]) -> List[str]:
+    """`Kind/name` власників (ownerReferences; для events - involvedObject)"""
+    refs = list(obj["metadata"].get("ownerReferences") or [])
+    if obj.get("involvedObject"):
+        refs.append(obj["involvedObject"])
+    return [f"{ref.get('kind')}/{ref.get('name')}" for ref in refs]
+
+
+def _node_index(obj: Dict[str, Any]) -> List[str]:
+    node = (obj.get("spec") or {}).get("nodeName")
+    return [node] if node else []
+
+
+def _label_index(obj: Dict[str, Any]) -> List[str]:
+    return [f"{key}={value}" for key, value in (obj["metadata"].get("labels") or {}).items()]
+
+
+INDEXERS: Dict[str, Callable[[Dict[str, Any]], List[str]]] = {
+    "namespace": _namespace_index,
+    "owner": _owner_index,
+    "node": _node_index,
+    "label": _label_index,
+}
+
+
+def _key(obj: Dict[str, Any]) -> Key:
+    metadata = obj["metadata"]
+    return metadata.get("namespace", ""), metadata["name"]
+
+
+def _version(resource_version: Optional[str]) -> Optional[int]:
+    """resourceVersion як число (формально непрозорий рядок - тоді None)"""
+    try:
+        return int(resource_version)
+    except (TypeError, ValueError):
+        return None
+
+
+def _field(obj: Dict[str, Any], path: str) -> str:
+    value: Any = obj
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return "" if value is None else str(value)
+
+
+def parse_label_selector(selector: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    `app=api,tier!=db,canary,!legacy` -> [(key, op, value)]
+
+    Raises:
+        ValueError: set-based вирази (in, notin) - store їх не обслуговує
+    """
+    terms = []
+    for term in filter(None, (t.strip() for t in selector.split(","))):
+        if " " in term or "(" in term:
+            raise ValueError(f"Unsupported label selector: {term}")
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            terms.append((key, "!=", value))
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            terms.append((key, "=", value))
+        elif term.startswith("!"):
+            terms.append((term[1:], "!", None))
+        else:
+            terms.append((term, "exists", None))
+    return terms
+
+
+class ObjectStore:
+    """Об'єкти одного kind з індексами (thread-safe)"""
+
+    def __init__(self) -> None:
+        self.resource_version = ""
+        self._objects: Dict[Key, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[str, Set[Key]]] = {name: {} for name in INDEXERS}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def _index(self, key: Key, obj: Dict[str, Any], add: bool) -> None:
+        for name, indexer in INDEXERS.items():
+            index = self._indexes[name]
+            for value in indexer(obj):
+                if add:
+                    index.setdefault(value, set()).add(key)
+                else:
+                    keys = index.get(value)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del index[value]
+
+    def replace(self, items: List[Dict[str, Any]], resource_version: str) -> None:
+        """Повний стан після list"""
+        with self._lock:
+            self._objects = {}
+            self._indexes = {name: {} for name in INDEXERS}
+            for obj in items:
+                key = _key(obj)
+                self._objects[key] = obj
+                self._index(key, obj, add=True)
+            self.resource_version = resource_version
+
+    def apply(self, event_type: str, obj: Dict[str, Any]) -> bool:
+        """
+        Подія watch (ADDED / MODIFIED / DELETED)
+
+        Returns:
+            False, якщо в store вже новіша версія об'єкта (подія застаріла)
+        """
+        key = _key(obj)
+        incoming = obj["metadata"].get("resourceVersion")
+        with self._lock:
+            current = self._objects.get(key)
+            if current is not None and event_type != "DELETED":
+                current_version = _version(current["metadata"].get("resourceVersion"))
+                new_version = _version(incoming)
+                if current_version is not None and new_version is not None and new_version < current_version:
+                    return False
+
+            if current is not None:
+                self._index(key, current, add=False)
+                del self._objects[key]
+            if event_type != "DELETED":
+                self._objects[key] = obj
+                self._index(key, obj, add=True)
+            if incoming:
+                self.resource_version = incoming
+        return True
+
+    def get(self, namespace: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        return self._objects.get((namespace or "", name))
+
+    def by_index(self, index: str, value: str) -> List[Dict[str, Any]]:
+        """Об'єкти за індексом (namespace, owner `Kind/name`, node, label `key=value`)"""
+        with self._lock:
+            return [self._objects[key] for key in sorted(self._indexes[index].get(value, ()))]
+
+    def list(
+        self,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Аналог list з selectors (field selector - рівність / нерівність за шляхом)
+
+        Raises:
+            ValueError: selector, який store не обслуговує
+        """
+        labels = parse_label_selector(label_selector) if label_selector else []
+        fields = []
+        for term in filter(None, (field_selector or "").split(",")):
+            negate = "!=" in term
+            path, _, value = term.replace("!=", "=").replace("==", "=").partition("=")
+            fields.append((path.strip(), value.strip(), negate))
+
+        with self._lock:
+            if namespace is not None:
+                keys = set(self._indexes["namespace"].get(namespace, ()))
+            else:
+                keys = set(self._objects)
+            for key, op, value in labels:
+                if op == "=":
+                    keys &= self._indexes["label"].get(f"{key}={value}", set())
+            objects = [self._objects[key] for key in sorted(keys)]
+
+        result = []
+        for obj in objects:
+            obj_labels = obj["metadata"].get("labels") or {}
+            if any(
+                (op == "!=" and obj_labels.get(key) == value)
+                or (op == "exists" and key not in obj_labels)
+                or (op == "!" and key in obj_labels)
+                for key, op, value in labels
+            ):
+                continue
+            if any((_field(obj, path) == value) == negate for path, value, negate in fields):
+                continue
+            result.append(obj)
+        return result
+
+
+class _Expired(Exception):
+    """410 Gone: resourceVersion вже недоступний - потрібен повний list"""
+
+
+class Informer:
+    """list + watch одного kind у фоновому потоці"""
+
+    def __init__(
+        self,
+        resource: ApiResource,
+        api_client: ApiClient,
+        namespace: Optional[str] = None,
+        watch_timeout: int = 300,
+    ) -> None:
+        self.resource = resource
+        self.api_client = api_client
+        self.namespace = namespace if resource.namespaced else None
+        self.watch_timeout = watch_timeout
+        self.store = ObjectStore()
+        self.synced = threading.Event()
+        self.lists = 0
+        self.events = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._response: Any = None
+
+    def _request(self, query: List[Tuple[str, Any]], timeout: Any) -> Any:
+        return self.api_client.call_api(
+            self.resource.path(self.namespace),
+            "GET",
+            query_params=query,
+            header_params={"Accept": "application/json"},
+            auth_settings=["BearerToken"],
+            _preload_content=False,
+            _return_http_data_only=True,
+            _request_timeout=timeout,
+        )
+
+    def _prepare(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Як kubectl get: apiVersion/kind в кожному об'єкті; managedFields не зберігаються"""
+        obj.setdefault("apiVersion", self.resource.api_version)
+        obj.setdefault("kind", self.resource.kind)
+        obj["metadata"].pop("managedFields", None)
+        return obj
+
+    def _list(self) -> None:
+        data = json.loads(self._request([], settings.K8S_TIMEOUT).data)
+        items = [self._prepare(item) for item in data.get("items", [])]
+        self.store.replace(items, data.get("metadata", {}).get("resourceVersion", ""))
+        self.lists += 1
+        self.synced.set()
+        logger.debug(f"Informer {self.resource.plural}: list {len(items)} об'єктів")
+
+    def _lines(self, response: Any) -> Iterator[bytes]:
+        pending = b""
+        for chunk in response.stream(65536):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            yield from lines
+        if pending:
+            yield pending
+
+    def _watch(self) -> None:
+        """Один watch до timeoutSeconds сервера; 410 -> _Expired"""
+        query = [
+            ("watch", "true"),
+            ("resourceVersion", self.store.resource_version),
+            ("allowWatchBookmarks", "true"),
+            ("timeoutSeconds", self.watch_timeout),
+        ]
+        response = self._response = self._request(query, (settings.K8S_TIMEOUT, self.watch_timeout + 30))
+        try:
+            for line in self._lines(response):
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                event_type, obj = event.get("type"), event.get("object") or {}
+                if event_type == "ERROR":
+                    if obj.get("code") == 410:
+                        raise _Expired(obj.get("message", ""))
+                    raise RuntimeError(obj.get("message", "watch error"))
+                if event_type == "BOOKMARK":
+                    self.store.resource_version = obj["metadata"]["resourceVersion"]
+                    continue
+                self.store.apply(event_type, self._prepare(obj))
+                self.events += 1
+        finally:
+            self._response = None
+            response.release_conn()
+
+    def _run(self) -> None:
+        relist = True
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                if relist:
+                    self._list()
+                    relist = False
+                self._watch()
+                backoff = 1.0
+            except _Expired:
+                logger.info(f"Informer {self.resource.plural}: resourceVersion застарів, повторний list")
+                relist = True
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                self.errors += 1
+                logger.warning(f"Informer {self.resource.plural}: {e}, повтор через {backoff:.0f}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"informer-{self.resource.plural}", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        sock = getattr(getattr(self._response, "connection", None), "sock", None)
+        if sock is not None:
+            # Перервати блокуюче читання watch (close з іншого потоку recv не будить)
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "synced": self.synced.is_set(),
+            "objects": len(self.store),
+            "resource_version": self.store.resource_version,
+            "lists": self.lists,
+            "events": self.events,
+            "errors": self.errors,
+        }
+
+
+class ClusterState:
+    """Informers для набору kinds + читання зі store замість API"""
+
+    def __init__(
+        self,
+        kinds: Optional[List[str]] = None,
+        kubeconfig: Optional[str] = None,
+        namespace: Optional[str] = None,
+        watch_timeout: int = 300,
+        api_client: Optional[ApiClient] = None,
+    ) -> None:
+        self.kubeconfig = kubeconfig
+        self.namespace = namespace
+        self.default_namespace = _context_namespace(kubeconfig, None) or "default"
+
+        if api_client is None:
+            # Окремий pool: довгі watch не займають з'єднання для get
+            configuration = copy.deepcopy(get_api_client(kubeconfig).configuration)
+            configuration.connection_pool_maxsize = len(kinds or settings.informer_kinds) + 1
+            api_client = ApiClient(configuration)
+
+        self.informers: Dict[str, Informer] = {}
+        for kind in kinds or settings.informer_kinds:
+            resource = resolve_resource(kind)
+            if resource is None:
+                logger.warning(f"Informer: невідомий тип ресурсу {kind}")
+                continue
+            self.informers[resource.plural] = Informer(resource, api_client, namespace, watch_timeout)
+
+    def start(self) -> None:
+        for informer in self.informers.values():
+            informer.start()
+
+    def stop(self) -> None:
+        for informer in self.informers.values():
+            informer.stop()
+
+    def wait_for_sync(self, timeout: float = 30.0) -> bool:
+        return all(informer.synced.wait(timeout) for informer in self.informers.values())
+
+    def store(self, resource: str) -> Optional[ObjectStore]:
+        """Store kind, якщо його informer уже синхронізований"""
+        api_resource = resolve_resource(resource)
+        informer = self.informers.get(api_resource.plural) if api_resource else None
+        if informer is None or not informer.synced.is_set():
+            return None
+        return informer.store
+
+    def lookup(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Відповідь як у kubectl get -o json зі store
+
+        Returns:
+            None - запит не обслуговується зі store (kind без informer, інший
+            namespace, непідтримуваний selector, об'єкта ще немає) і має піти в API
+        """
+        api_resource = resolve_resource(resource)
+        store = self.store(resource)
+        if api_resource is None or store is None:
+            return None
+
+        if api_resource.namespaced:
+            namespace = namespace or self.default_namespace
+            if self.namespace and namespace != self.namespace:
+                return None
+        else:
+            namespace = None
+
+        if name:
+            obj = store.get(namespace, name)
+            if obj is None or label_selector or field_selector:
+                return None
+            return obj
+
+        try:
+            items = store.list(namespace, label_selector, field_selector)
+        except ValueError:
+            return None
+        return {
+            "apiVersion": "v1",
+            "kind": "List",
+            "metadata": {"resourceVersion": store.resource_version},
+            "items": items,
+        }
+
+    def version(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        with_events: bool = False,
+    ) -> Optional[str]:
+        """
+        Версія даних зі store: resourceVersion об'єкта (with_events - плюс версії
+        його events, як у describe) або kind для списку; None - невідомо
+        """
+        api_resource = resolve_resource(resource)
+        store = self.store(resource)
+        if api_resource is None or store is None:
+            return None
+        if not name:
+            return store.resource_version or None
+
+        namespace = (namespace or self.default_namespace) if api_resource.namespaced else ""
+        obj = store.get(namespace, name)
+        if obj is None:
+            return None
+        version = obj["metadata"].get("resourceVersion", "")
+        if with_events:
+            events = self.store("events")
+            if events is None:
+                return None
+            related = sorted(
+                event["metadata"].get("resourceVersion", "")
+                for event in events.by_index("owner", f"{api_resource.kind}/{name}")
+                if event["metadata"].get("namespace", "") == namespace
+            )
+            version += "/" + ",".join(related)
+        return version
+
+    def summary(self) -> Dict[str, Any]:
+        """Стан кластера для health (лише синхронізовані kinds)"""
+        result: Dict[str, Any] = {}
+
+        nodes = self.store("nodes")
+        if nodes is not None:
+            items = nodes.list()
+            ready = sum(
+                any(
+                    condition.get("type") == "Ready" and condition.get("status") == "True"
+                    for condition in node.get("status", {}).get("conditions") or []
+                )
+                for node in items
+            )
+            result["nodes"] = {"total": len(items), "ready": ready, "not_ready": len(items) - ready}
+
+        pods = self.store("pods")
+        if pods is not None:
+            by_phase: Dict[str, int] = {}
+            restarts = crash_loop = 0
+            for pod in pods.list():
+                status = pod.get("status", {})
+                phase = status.get("phase", "Unknown")
+                by_phase[phase] = by_phase.get(phase, 0) + 1
+                for container in status.get("containerStatuses") or []:
+                    restarts += container.get("restartCount", 0)
+                    waiting = (container.get("state") or {}).get("waiting") or {}
+                    crash_loop += waiting.get("reason") == "CrashLoopBackOff"
+            result["pods"] = {"total": len(pods), "by_phase": by_phase, "restarts": restarts, "crash_loop": crash_loop}
+
+        deployments = self.store("deployments")
+        if deployments is not None:
+            result["deployments"] = {
+                "total": len(deployments),
+                "unavailable": sum(bool(d.get("status", {}).get("unavailableReplicas")) for d in deployments.list()),
+            }
+
+        events = self.store("events")
+        if events is not None:
+            result["events"] = {"total": len(events), "warnings": len(events.list(field_selector="type=Warning"))}
+
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {kind: informer.stats() for kind, informer in self.informers.items()}
+
+
+# Global cluster state (None, поки informers не запущені)
+_cluster_state: Optional[ClusterState] = None
+
+
+def get_cluster_state() -> Optional[ClusterState]:
+    return _cluster_state
+
+
+def start_cluster_state() -> ClusterState:
+    """Запустити informers з налаштувань (K8S_INFORMER_KINDS, K8S_INFORMER_NAMESPACE)"""
+    global _cluster_state
+
+    if _cluster_state is None:
+        _cluster_state = ClusterState(
+            kubeconfig=settings.KUBECONFIG_PATH,
+            namespace=settings.K8S_INFORMER_NAMESPACE,
+            watch_timeout=settings.K8S_WATCH_TIMEOUT,
+        )
+        _cluster_state.start()
+
+    return _cluster_state
+
+
+def stop_cluster_state() -> None:
+    global _cluster_state
+
+    if _cluster_state is not None:
+        _cluster_state.stop()
+        _cluster_state = None
@@ -1,8 +1,14 @@
 import subprocess
 import json
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 
+from config.settings import settings
+from k8s.read_cache import Version, cache_kind, normalize_selector, read_cache
+from prompts.log_templates import LogTemplateMiner, summarize_logs
 from utils.logger import logger
+from utils.process import process_runner
+from utils.redaction import get_redactor
 
 
 class KubectlWrapper:
@@ -21,6 +27,22 @@ class KubectlWrapper:
         cmd.extend(command)
         return cmd
 
+    def _full_command(
+        self,
+        command: List[str],
+        namespace: Optional[str] = None,
+        output_format: Optional[str] = None,
+    ) -> List[str]:
+        full_cmd = self._build_command(command)
+
+        if namespace:
+            full_cmd.extend(["-n", namespace])
+
+        if output_format and output_format in ["json", "yaml"]:
+            full_cmd.extend(["-o", output_format])
+
+        return full_cmd
+
     def run(
         self,
         command: List[str],
@@ -38,13 +60,7 @@ class KubectlWrapper:
         Returns:
             Result dict
         """
-        full_cmd = self._build_command(command)
-
-        if namespace:
-            full_cmd.extend(["-n", namespace])
-
-        if output_format and output_format in ["json", "yaml"]:
-            full_cmd.extend(["-o", output_format])
+        full_cmd = self._full_command(command, namespace, output_format)
 
         try:
             logger.debug(f"Виконання: {' '.join(full_cmd)}")
@@ -53,7 +69,7 @@ class KubectlWrapper:
                 full_cmd,
                 capture_output=True,
                 text=True,
-                timeout=60,
+                timeout=settings.K8S_TIMEOUT,
             )
 
             return {
@@ -80,14 +96,198 @@ class KubectlWrapper:
                 "command": " ".join(full_cmd),
             }
 
-    def get(
+    async def arun(
+        self,
+        command: List[str],
+        namespace: Optional[str] = None,
+        output_format: Optional[str] = "json",
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        run без блокування event loop
+
+        Процес запускається через process_runner: спільний ліміт паралельних
+        kubectl, deadline (K8S_TIMEOUT) і kill при скасуванні задачі
+        """
+        full_cmd = self._full_command(command, namespace, output_format)
+        logger.debug(f"Виконання (async): {' '.join(full_cmd)}")
+        return await process_runner.run(full_cmd, timeout)
+
+    def stream(
+        self,
+        command: List[str],
+        namespace: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Рядки stdout kubectl по мірі надходження (без буферизації всього виводу)
+
+        Після timeout процес вбивається, і ітерація просто завершується.
+        З REDACT_EVIDENCE секрети маскуються потоково, ще до розбору рядків.
+        """
+        full_cmd = self._build_command(command)
+
+        if namespace:
+            full_cmd.extend(["-n", namespace])
+
+        logger.debug(f"Виконання (stream): {' '.join(full_cmd)}")
+        try:
+            process = subprocess.Popen(
+                full_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except Exception as e:
+            logger.error(f"Kubectl error: {e}")
+            return
+
+        timer = threading.Timer(settings.K8S_TIMEOUT if timeout is None else timeout, process.kill)
+        timer.start()
+        try:
+            if settings.REDACT_EVIDENCE:
+                for block in get_redactor().redact_chunks(process.stdout):
+                    yield from block.splitlines(keepends=True)
+            else:
+                yield from process.stdout
+            process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                # Ітерацію перервано - процес більше не потрібен
+                process.kill()
+                process.wait()
+
+        if process.returncode:
+            logger.warning(f"Kubectl exit code {process.returncode}: {' '.join(full_cmd)}")
+
+    async def astream(
+        self,
+        command: List[str],
+        namespace: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """stream без блокування event loop (рядки stdout, секрети замасковані з REDACT_EVIDENCE)"""
+        full_cmd = self._full_command(command, namespace)
+        logger.debug(f"Виконання (async stream): {' '.join(full_cmd)}")
+
+        redaction = get_redactor().stream() if settings.REDACT_EVIDENCE else None
+        pending = ""
+        async for chunk in process_runner.stream(full_cmd, timeout):
+            if redaction is not None:
+                chunk = redaction.feed(chunk)
+            lines = (pending + chunk).splitlines(keepends=True)
+            pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+            for line in lines:
+                yield line
+
+        if redaction is not None:
+            pending += redaction.finish()
+        for line in pending.splitlines(keepends=True):
+            yield line
+
+    def _cluster_state(self) -> Any:
+        """ClusterState informers для цього kubeconfig (None - informers вимкнені)"""
+        if not settings.K8S_INFORMERS:
+            return None
+
+        from k8s.informer import get_cluster_state
+
+        state = get_cluster_state()
+        return state if state is not None and state.kubeconfig == self.kubeconfig else None
+
+    def _from_informers(
         self,
         resource: str,
         name: Optional[str] = None,
         namespace: Optional[str] = None,
         label_selector: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        """kubectl get"""
+        field_selector: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """get з локального store informers (None - informers вимкнені або запит не обслуговують)"""
+        state = self._cluster_state()
+        if state is None:
+            return None
+        return state.lookup(resource, name, namespace, label_selector, field_selector)
+
+    def _cache_version(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        with_events: bool = False,
+    ) -> Version:
+        """Поточна resourceVersion з informers для revalidation кешу"""
+        def version() -> Optional[str]:
+            state = self._cluster_state()
+            return state.version(resource, name, namespace, with_events) if state is not None else None
+
+        return version
+
+    def _cache_key(self, verb: str, resource: str, *parts: Any) -> str:
+        return read_cache.make_key(type(self).__name__, self._build_command([]), verb, cache_kind(resource), *parts)
+
+    @staticmethod
+    def _outcome(result: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        """(текст, знайдено) з result run; текст None - помилка (не кешується)"""
+        if result.get("success"):
+            return result["stdout"], True
+        if "(NotFound)" in result.get("stderr", ""):
+            return "", False
+        return None, False
+
+    def _read(
+        self,
+        key: str,
+        kind: str,
+        version: Optional[Version],
+        fetch: Callable[[], Tuple[Optional[str], bool]],
+    ) -> str:
+        """Read-through K8S_READ_CACHE: текст з кешу або fetch() -> (текст, знайдено)"""
+        if not settings.K8S_READ_CACHE:
+            return fetch()[0] or ""
+
+        text = read_cache.get(key, version)
+        if text is not None:
+            return text
+
+        # Версія до запиту: зміна під час fetch лише змусить перечитати
+        current = version() if version else None
+        text, found = fetch()
+        if text is None:
+            return ""
+        read_cache.put(key, text, kind, found, current)
+        return text
+
+    async def _aread(
+        self,
+        key: str,
+        kind: str,
+        version: Optional[Version],
+        fetch: Callable[[], Awaitable[Tuple[Optional[str], bool]]],
+    ) -> str:
+        """_read для async fetch"""
+        if not settings.K8S_READ_CACHE:
+            return (await fetch())[0] or ""
+
+        text = read_cache.get(key, version)
+        if text is not None:
+            return text
+
+        current = version() if version else None
+        text, found = await fetch()
+        if text is None:
+            return ""
+        read_cache.put(key, text, kind, found, current)
+        return text
+
+    @staticmethod
+    def _get_command(
+        resource: str,
+        name: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> List[str]:
         cmd: List[str] = ["get", resource]
 
         if name:
@@ -96,15 +296,75 @@ class KubectlWrapper:
         if label_selector:
             cmd.extend(["-l", label_selector])
 
-        result = self.run(cmd, namespace=namespace, output_format="json")
+        if field_selector:
+            cmd.extend(["--field-selector", field_selector])
+
+        return cmd
+
+    def _get_key(
+        self,
+        resource: str,
+        name: Optional[str],
+        namespace: Optional[str],
+        label_selector: Optional[str],
+        field_selector: Optional[str],
+    ) -> str:
+        return self._cache_key(
+            "get", resource, name, namespace, normalize_selector(label_selector), normalize_selector(field_selector),
+        )
+
+    @staticmethod
+    def _parse_json(text: str) -> Dict[str, Any]:
+        try:
+            return json.loads(text) if text else {}
+        except Exception:
+            return {}
+
+    def get(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """kubectl get (informers store -> read cache -> kubectl)"""
+        cached = self._from_informers(resource, name, namespace, label_selector, field_selector)
+        if cached is not None:
+            return cached
+
+        cmd = self._get_command(resource, name, label_selector, field_selector)
+        return self._parse_json(self._read(
+            self._get_key(resource, name, namespace, label_selector, field_selector),
+            cache_kind(resource),
+            self._cache_version(resource, name, namespace),
+            lambda: self._outcome(self.run(cmd, namespace=namespace, output_format="json")),
+        ))
+
+    async def aget(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """kubectl get (async)"""
+        cached = self._from_informers(resource, name, namespace, label_selector, field_selector)
+        if cached is not None:
+            return cached
+
+        cmd = self._get_command(resource, name, label_selector, field_selector)
 
-        if result["success"]:
-            try:
-                return json.loads(result["stdout"])
-            except Exception:
-                return {}
+        async def fetch() -> Tuple[Optional[str], bool]:
+            return self._outcome(await self.arun(cmd, namespace=namespace, output_format="json"))
 
-        return {}
+        return self._parse_json(await self._aread(
+            self._get_key(resource, name, namespace, label_selector, field_selector),
+            cache_kind(resource),
+            self._cache_version(resource, name, namespace),
+            fetch,
+        ))
 
     def describe(
         self,
@@ -112,20 +372,41 @@ class KubectlWrapper:
         name: str,
         namespace: Optional[str] = None,
     ) -> str:
-        """kubectl describe"""
+        """kubectl describe (кеш revalidується за версією об'єкта і його events)"""
         cmd = ["describe", resource, name]
-        result = self.run(cmd, namespace=namespace, output_format=None)
-        return result.get("stdout", "")
-
-    def logs(
+        return self._read(
+            self._cache_key("describe", resource, name, namespace),
+            cache_kind(resource),
+            self._cache_version(resource, name, namespace, with_events=True),
+            lambda: self._outcome(self.run(cmd, namespace=namespace, output_format=None)),
+        )
+
+    async def adescribe(
         self,
-        pod_name: str,
+        resource: str,
+        name: str,
         namespace: Optional[str] = None,
+    ) -> str:
+        """kubectl describe (async)"""
+        cmd = ["describe", resource, name]
+
+        async def fetch() -> Tuple[Optional[str], bool]:
+            return self._outcome(await self.arun(cmd, namespace=namespace, output_format=None))
+
+        return await self._aread(
+            self._cache_key("describe", resource, name, namespace),
+            cache_kind(resource),
+            self._cache_version(resource, name, namespace, with_events=True),
+            fetch,
+        )
+
+    @staticmethod
+    def _logs_command(
+        pod_name: str,
         container: Optional[str] = None,
         previous: bool = False,
         tail: int = 100,
-    ) -> str:
-        """kubectl logs"""
+    ) -> List[str]:
         cmd: List[str] = ["logs", pod_name, f"--tail={tail}"]
 
         if container:
@@ -134,8 +415,52 @@ class KubectlWrapper:
         if previous:
             cmd.append("--previous")
 
-        result = self.run(cmd, namespace=namespace, output_format=None)
-        return result.get("stdout", "")
+        return cmd
+
+    def logs(
+        self,
+        pod_name: str,
+        namespace: Optional[str] = None,
+        container: Optional[str] = None,
+        previous: bool = False,
+        tail: int = 100,
+        summarize: bool = False,
+    ) -> str:
+        """kubectl logs (summarize - шаблони логів замість сирих рядків)"""
+        cmd = self._logs_command(pod_name, container, previous, tail)
+
+        def fetch() -> Tuple[Optional[str], bool]:
+            if summarize:
+                # Рядки йдуть у miner по одному - пам'ять не залежить від tail
+                return summarize_logs(self.stream(cmd, namespace=namespace)), True
+            return self._outcome(self.run(cmd, namespace=namespace, output_format=None))
+
+        # Логи дописуються без зміни resourceVersion - лише TTL
+        key = self._cache_key("logs", "logs", pod_name, namespace, container, previous, tail, summarize)
+        return self._read(key, "logs", None, fetch)
+
+    async def alogs(
+        self,
+        pod_name: str,
+        namespace: Optional[str] = None,
+        container: Optional[str] = None,
+        previous: bool = False,
+        tail: int = 100,
+        summarize: bool = False,
+    ) -> str:
+        """kubectl logs (async)"""
+        cmd = self._logs_command(pod_name, container, previous, tail)
+
+        async def fetch() -> Tuple[Optional[str], bool]:
+            if summarize:
+                miner = LogTemplateMiner()
+                async for line in self.astream(cmd, namespace=namespace):
+                    miner.add(line)
+                return (miner.summary() if miner.lines else ""), True
+            return self._outcome(await self.arun(cmd, namespace=namespace, output_format=None))
+
+        key = self._cache_key("logs", "logs", pod_name, namespace, container, previous, tail, summarize)
+        return await self._aread(key, "logs", None, fetch)
 
     def exec(
         self,
@@ -156,6 +481,20 @@ class KubectlWrapper:
         return result.get("stdout", "")
 
 
+def create_kubectl_wrapper(
+    kubeconfig: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> KubectlWrapper:
+    """KubectlWrapper для K8S_BACKEND: kubectl (subprocess) або native (Kubernetes API)"""
+    backend = backend or settings.K8S_BACKEND
+    if backend == "native":
+        # kubernetes client імпортується лише для native backend
+        from k8s.native_client import NativeKubeWrapper
+
+        return NativeKubeWrapper(kubeconfig)
+    return KubectlWrapper(kubeconfig)
+
+
 # Global instance
-kubectl = KubectlWrapper()
+kubectl = create_kubectl_wrapper()
 
@@ -0,0 +1,286 @@
+"""
+Native Kubernetes API backend (kubernetes Python client)
+Той самий інтерфейс, що й KubectlWrapper, але без fork kubectl на кожен
+виклик: один ApiClient (urllib3 pool, kubeconfig і auth завантажені один
+раз, token оновлюється сам) на кластер
+"""
+
+import asyncio
+import codecs
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+from kubernetes.client import ApiClient, Configuration
+from kubernetes.client.rest import ApiException
+from kubernetes.config import ConfigException, load_incluster_config, load_kube_config
+from kubernetes.config.kube_config import list_kube_config_contexts
+
+from config.settings import settings
+from k8s.events import fetch_events, format_event_summary
+from k8s.kubectl_wrapper import KubectlWrapper
+from k8s.resources import resolve_resource
+from prompts.log_templates import summarize_logs
+from utils.logger import logger
+from utils.redaction import get_redactor
+
+
+_clients: Dict[Tuple[Optional[str], Optional[str]], ApiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_api_client(kubeconfig: Optional[str] = None, context: Optional[str] = None) -> ApiClient:
+    """
+    Один ApiClient на кластер (kubeconfig + context)
+
+    Без kubeconfig - ~/.kube/config або $KUBECONFIG, інакше in-cluster service account
+    """
+    key = (kubeconfig, context)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            configuration = Configuration()
+            try:
+                load_kube_config(
+                    config_file=kubeconfig,
+                    context=context,
+                    client_configuration=configuration,
+                    persist_config=False,
+                )
+            except (ConfigException, FileNotFoundError):
+                if kubeconfig:
+                    raise
+                load_incluster_config(client_configuration=configuration)
+            configuration.connection_pool_maxsize = settings.K8S_API_POOL_SIZE
+            client = _clients[key] = ApiClient(configuration)
+            logger.info(f"Kubernetes API client: {configuration.host}")
+        return client
+
+
+def _context_namespace(kubeconfig: Optional[str], context: Optional[str]) -> Optional[str]:
+    """Namespace з context kubeconfig (як у kubectl без -n)"""
+    try:
+        contexts, active = list_kube_config_contexts(config_file=kubeconfig)
+    except (ConfigException, FileNotFoundError):
+        return None
+    if context:
+        active = next((c for c in contexts if c.get("name") == context), active)
+    return (active or {}).get("context", {}).get("namespace")
+
+
+def _split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Довільні шматки тексту -> рядки (з \\n)"""
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
+    if pending:
+        yield pending
+
+
+class NativeKubeWrapper(KubectlWrapper):
+    """
+    get / describe / logs через Kubernetes API
+
+    Невідомі типи ресурсів (CRD), exec і довільні команди run/stream -
+    через kubectl, як у KubectlWrapper. Async варіанти виконують API виклики
+    в потоках (kubernetes client синхронний)
+    """
+
+    def __init__(self, kubeconfig: Optional[str] = None, context: Optional[str] = None) -> None:
+        super().__init__(kubeconfig)
+        self.context = context
+        self.timeout = settings.K8S_TIMEOUT
+        self._default_namespace: Optional[str] = None
+
+    @property
+    def api_client(self) -> ApiClient:
+        return get_api_client(self.kubeconfig, self.context)
+
+    def _build_command(self, command: List[str]) -> List[str]:
+        """kubectl для fallback - з тим самим context"""
+        cmd = super()._build_command([])
+        if self.context:
+            cmd.extend(["--context", self.context])
+        return cmd + command
+
+    def _namespace(self, namespace: Optional[str]) -> str:
+        if namespace:
+            return namespace
+        if self._default_namespace is None:
+            self._default_namespace = _context_namespace(self.kubeconfig, self.context) or "default"
+        return self._default_namespace
+
+    def _request(self, path: str, query: Optional[List[Tuple[str, Any]]] = None) -> Any:
+        """GET без десеріалізації в моделі: urllib3 response"""
+        return self.api_client.call_api(
+            path,
+            "GET",
+            query_params=query or [],
+            header_params={"Accept": "application/json"},
+            auth_settings=["BearerToken"],
+            _preload_content=False,
+            _return_http_data_only=True,
+            _request_timeout=self.timeout,
+        )
+
+    def get(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """kubectl get -o json"""
+        api_resource = resolve_resource(resource)
+        if api_resource is None:
+            return super().get(resource, name, namespace, label_selector, field_selector)
+
+        cached = self._from_informers(resource, name, namespace, label_selector, field_selector)
+        if cached is not None:
+            return cached
+
+        query = []
+        if label_selector:
+            query.append(("labelSelector", label_selector))
+        if field_selector:
+            query.append(("fieldSelector", field_selector))
+
+        namespace = self._namespace(namespace)
+        path = api_resource.path(namespace, name)
+
+        def fetch() -> Tuple[Optional[str], bool]:
+            logger.debug(f"API GET {path}")
+            try:
+                return self._request(path, query).data.decode("utf-8"), True
+            except ApiException as e:
+                if e.status == 404:
+                    return "", False
+                logger.error(f"Kubernetes API error {e.status}: {path}")
+            except Exception as e:
+                logger.error(f"Kubernetes API error: {e}")
+            return None, False
+
+        data = self._parse_json(self._read(
+            self._get_key(resource, name, namespace, label_selector, field_selector),
+            api_resource.plural,
+            self._cache_version(resource, name, namespace),
+            fetch,
+        ))
+
+        # Як kubectl: у елементів списку є apiVersion/kind
+        for item in data.get("items", []):
+            item.setdefault("apiVersion", api_resource.api_version)
+            item.setdefault("kind", api_resource.kind)
+        return data
+
+    def describe(
+        self,
+        resource: str,
+        name: str,
+        namespace: Optional[str] = None,
+    ) -> str:
+        """
+        Аналог kubectl describe: YAML об'єкта без службових полів + згруповані events
+
+        Формат відрізняється від kubectl, зміст той самий
+        """
+        if resolve_resource(resource) is None:
+            return super().describe(resource, name, namespace)
+
+        obj = self.get(resource, name, namespace)
+        if not obj:
+            return ""
+
+        # Копія metadata: об'єкт може бути зі store informers
+        metadata = {k: v for k, v in obj.get("metadata", {}).items() if k != "managedFields"}
+        annotations = dict(metadata.pop("annotations", None) or {})
+        annotations.pop("kubectl.kubernetes.io/last-applied-configuration", None)
+        if annotations:
+            metadata["annotations"] = annotations
+        text = yaml.safe_dump({**obj, "metadata": metadata}, sort_keys=False, default_flow_style=False, allow_unicode=True)
+
+        events = format_event_summary(fetch_events(self, namespace, f"involvedObject.name={name}"))
+        return f"{text}\n{events}" if events else text
+
+    def logs(
+        self,
+        pod_name: str,
+        namespace: Optional[str] = None,
+        container: Optional[str] = None,
+        previous: bool = False,
+        tail: int = 100,
+        summarize: bool = False,
+    ) -> str:
+        """kubectl logs (summarize - шаблони логів, відповідь читається потоком)"""
+        query: List[Tuple[str, Any]] = [("tailLines", tail)]
+        if container:
+            query.append(("container", container))
+        if previous:
+            query.append(("previous", "true"))
+
+        namespace = self._namespace(namespace)
+        path = f"/api/v1/namespaces/{namespace}/pods/{pod_name}/log"
+
+        def fetch() -> Tuple[Optional[str], bool]:
+            logger.debug(f"API GET {path}")
+            try:
+                response = self._request(path, query)
+            except ApiException as e:
+                if e.status == 404:
+                    return "", False
+                logger.error(f"Kubernetes API logs error {e.status}: {path}")
+                return None, False
+            except Exception as e:
+                logger.error(f"Kubernetes API logs error: {e}")
+                return None, False
+
+            try:
+                if not summarize:
+                    return response.data.decode("utf-8", errors="replace"), True
+
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                chunks: Iterable[str] = (decoder.decode(chunk) for chunk in response.stream(65536))
+                if settings.REDACT_EVIDENCE:
+                    chunks = get_redactor().redact_chunks(chunks)
+                return summarize_logs(_split_lines(chunks)), True
+            finally:
+                response.release_conn()
+
+        key = self._cache_key("logs", "logs", pod_name, namespace, container, previous, tail, summarize)
+        return self._read(key, "logs", None, fetch)
+
+    async def aget(
+        self,
+        resource: str,
+        name: Optional[str] = None,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        field_selector: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if resolve_resource(resource) is None:
+            return await super().aget(resource, name, namespace, label_selector, field_selector)
+        return await asyncio.to_thread(self.get, resource, name, namespace, label_selector, field_selector)
+
+    async def adescribe(
+        self,
+        resource: str,
+        name: str,
+        namespace: Optional[str] = None,
+    ) -> str:
+        if resolve_resource(resource) is None:
+            return await super().adescribe(resource, name, namespace)
+        return await asyncio.to_thread(self.describe, resource, name, namespace)
+
+    async def alogs(
+        self,
+        pod_name: str,
+        namespace: Optional[str] = None,
+        container: Optional[str] = None,
+        previous: bool = False,
+        tail: int = 100,
+        summarize: bool = False,
+    ) -> str:
+        return await asyncio.to_thread(self.logs, pod_name, namespace, container, previous, tail, summarize)
@@ -0,0 +1,129 @@
+"""
+Read-through кеш kubectl get / describe / logs
+
+Ключ - нормалізований запит (backend + kubeconfig, verb, kind, name, namespace,
+selectors). TTL залежить від kind: nodes змінюються рідко, events - постійно.
+NotFound кешується коротко, помилки не кешуються. Після TTL запис ще
+використовується, якщо informers підтверджують, що resourceVersion об'єкта
+(kind - для списків) не змінився.
+
+Зберігається сирий текст відповіді: кожен hit отримує власну копію при розборі
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+from k8s.resources import resolve_resource
+from llm.cache import LRUTTLCache
+
+Version = Callable[[], Optional[str]]
+
+
+def normalize_selector(selector: Optional[str]) -> Optional[str]:
+    """`b=2, a=1` і `a=1,b=2` - один ключ"""
+    if not selector:
+        return None
+    return ",".join(sorted(term.strip() for term in selector.split(",") if term.strip())) or None
+
+
+def cache_kind(resource: str) -> str:
+    """pods / po / pod -> pods (невідомі типи - як є)"""
+    api_resource = resolve_resource(resource)
+    return api_resource.plural if api_resource else resource.lower()
+
+
+@dataclass
+class _Entry:
+    text: str
+    version: Optional[str]
+    ttl: float
+    fresh_until: float
+
+
+class ReadCache:
+    """TTL за kind + revalidation за resourceVersion після TTL"""
+
+    def __init__(
+        self,
+        kind_ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 10.0,
+        not_found_ttl: float = 2.0,
+        max_entries: int = 4096,
+        max_bytes: int = 32 * 1024 * 1024,
+        revalidate_window: float = 10.0,
+    ):
+        self.kind_ttls = kind_ttls or {}
+        self.default_ttl = default_ttl
+        self.not_found_ttl = not_found_ttl
+        # Скільки TTL застарілий запис з версією ще чекає на revalidation
+        self.revalidate_window = revalidate_window
+        self._cache: LRUTTLCache[_Entry] = LRUTTLCache(max_entries, max_bytes, default_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.not_found = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return json.dumps(parts, default=str)
+
+    def ttl(self, kind: str) -> float:
+        return self.kind_ttls.get(kind, self.default_ttl)
+
+    def get(self, key: str, version: Optional[Version] = None) -> Optional[str]:
+        """
+        Свіжий текст або None
+
+        Застарілий запис повертається, якщо version() (поточна версія з
+        informers) збігається з версією на момент запису
+        """
+        entry = self._cache.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry.fresh_until:
+            self.hits += 1
+            return entry.text
+
+        if entry is not None and entry.version is not None and version is not None and version() == entry.version:
+            entry.fresh_until = now + entry.ttl
+            self.revalidated += 1
+            self.hits += 1
+            return entry.text
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str, kind: str, found: bool = True, version: Optional[str] = None) -> None:
+        ttl = self.ttl(kind) if found else self.not_found_ttl
+        if not found:
+            self.not_found += 1
+            version = None
+        keep = ttl * self.revalidate_window if version is not None else ttl
+        entry = _Entry(text, version, ttl, time.monotonic() + ttl)
+        self._cache.set(key, entry, len(text) + 256, ttl_seconds=keep)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "not_found": self.not_found,
+            "entries": len(self._cache),
+            "bytes": self._cache.stats.bytes,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Глобальний кеш: спільний для всіх користувачів і follow-up запитів
+read_cache = ReadCache(
+    kind_ttls=settings.read_cache_ttls,
+    default_ttl=settings.K8S_READ_CACHE_TTL,
+    not_found_ttl=settings.K8S_NOT_FOUND_TTL,
+    max_bytes=settings.K8S_READ_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,65 @@
+"""
+Вбудовані типи ресурсів Kubernetes: імена kubectl -> шлях у REST API
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class ApiResource:
+    """Тип ресурсу: шлях у REST API"""
+
+    api_version: str  # "v1" або "<group>/<version>"
+    plural: str
+    kind: str
+    namespaced: bool = True
+
+    def path(self, namespace: Optional[str] = None, name: Optional[str] = None) -> str:
+        path = "/api/v1" if self.api_version == "v1" else f"/apis/{self.api_version}"
+        if self.namespaced and namespace:
+            path += f"/namespaces/{namespace}"
+        path += f"/{self.plural}"
+        return f"{path}/{name}" if name else path
+
+
+# (api_version, plural, kind, namespaced, short names)
+_BUILTIN_RESOURCES = [
+    ("v1", "pods", "Pod", True, ("po",)),
+    ("v1", "services", "Service", True, ("svc",)),
+    ("v1", "endpoints", "Endpoints", True, ("ep",)),
+    ("v1", "events", "Event", True, ("ev",)),
+    ("v1", "configmaps", "ConfigMap", True, ("cm",)),
+    ("v1", "secrets", "Secret", True, ()),
+    ("v1", "serviceaccounts", "ServiceAccount", True, ("sa",)),
+    ("v1", "persistentvolumeclaims", "PersistentVolumeClaim", True, ("pvc",)),
+    ("v1", "persistentvolumes", "PersistentVolume", False, ("pv",)),
+    ("v1", "nodes", "Node", False, ("no",)),
+    ("v1", "namespaces", "Namespace", False, ("ns",)),
+    ("apps/v1", "deployments", "Deployment", True, ("deploy",)),
+    ("apps/v1", "replicasets", "ReplicaSet", True, ("rs",)),
+    ("apps/v1", "statefulsets", "StatefulSet", True, ("sts",)),
+    ("apps/v1", "daemonsets", "DaemonSet", True, ("ds",)),
+    ("batch/v1", "jobs", "Job", True, ()),
+    ("batch/v1", "cronjobs", "CronJob", True, ("cj",)),
+    ("networking.k8s.io/v1", "ingresses", "Ingress", True, ("ing",)),
+    ("autoscaling/v2", "horizontalpodautoscalers", "HorizontalPodAutoscaler", True, ("hpa",)),
+    ("policy/v1", "poddisruptionbudgets", "PodDisruptionBudget", True, ("pdb",)),
+    ("storage.k8s.io/v1", "storageclasses", "StorageClass", False, ("sc",)),
+]
+
+# Імена як у kubectl: plural, singular, short name, з групою (deployments.apps)
+RESOURCES: Dict[str, ApiResource] = {}
+for _api_version, _plural, _kind, _namespaced, _short in _BUILTIN_RESOURCES:
+    _resource = ApiResource(_api_version, _plural, _kind, _namespaced)
+    for _alias in (_plural, _kind.lower(), *_short):
+        RESOURCES[_alias] = _resource
+
+
+def resolve_resource(resource: str) -> Optional[ApiResource]:
+    """`pods`, `pod`, `po`, `deployments.apps` -> ApiResource (None - невідомий, напр. CRD)"""
+    name = resource.lower()
+    found = RESOURCES.get(name)
+    if found is None and "." in name:
+        found = RESOURCES.get(name.split(".", 1)[0])
+    return found
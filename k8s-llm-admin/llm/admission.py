@@ -0,0 +1,275 @@
+"""
+Admission control перед LLM
+Ліміт паралельних генерацій, черги за пріоритетом (severity), deadline-based shedding
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from config.settings import settings
+from prompts.system_prompts import ProblemSeverity
+from utils.logger import logger
+
+
+class RequestPriority(IntEnum):
+    """Пріоритет запиту (менше значення - раніше)"""
+    CRITICAL = 0     # Production incident
+    INTERACTIVE = 1  # Streaming - людина чекає на екрані
+    HIGH = 2
+    MEDIUM = 3
+    LOW = 4          # Batch sweeps, фонові перевірки
+
+
+_SEVERITY_PRIORITY = {
+    ProblemSeverity.CRITICAL: RequestPriority.CRITICAL,
+    ProblemSeverity.HIGH: RequestPriority.HIGH,
+    ProblemSeverity.MEDIUM: RequestPriority.MEDIUM,
+    ProblemSeverity.LOW: RequestPriority.LOW,
+}
+
+
+def priority_for(severity: Optional[ProblemSeverity], interactive: bool = False) -> RequestPriority:
+    """CRITICAL завжди перший, далі interactive streams, далі за severity"""
+    priority = _SEVERITY_PRIORITY.get(severity, RequestPriority.MEDIUM)
+    if interactive:
+        priority = min(priority, RequestPriority.INTERACTIVE)
+    return priority
+
+
+class AdmissionRejected(Exception):
+    """Запит не допущено до LLM (черга переповнена або deadline не встигне)"""
+
+    def __init__(self, message: str, status_code: int, retry_after: float):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """
+    Пріоритетна черга з обмеженням паралельних генерацій
+
+    capacity - поточна ємність LLM (сума AIMD лімітів backends): ліміт росте
+    разом з нею, інакше фіксована стеля не дала б AIMD знайти більше.
+    max_concurrency > 0 - додаткова фіксована стеля
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_queue_depth: int = 64,
+        max_wait_seconds: float = 30.0,
+        initial_service_time: float = 10.0,
+        capacity: Optional[Callable[[], int]] = None,
+    ):
+        self.concurrency_cap = max_concurrency
+        self.capacity = capacity
+        self.max_queue_depth = max_queue_depth
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        # Час старту генерацій у польоті (min-heap): залишок першої хвилі
+        self._started: List[float] = []
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+
+        # EWMA тривалості генерації та очікування в черзі
+        self.avg_service_time = initial_service_time
+        self.avg_wait_time = 0.0
+        self.max_wait_observed = 0.0
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.shed_deadline = 0
+
+    @property
+    def max_concurrency(self) -> int:
+        """Поточний ліміт: capacity() під стелею concurrency_cap (0 - без стелі)"""
+        if self.capacity is None:
+            return max(1, self.concurrency_cap)
+        limit = self.capacity()
+        if self.concurrency_cap > 0:
+            limit = min(limit, self.concurrency_cap)
+        return max(1, limit)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for w in self._queue if not w.future.done())
+
+    def _waiting_ahead(self, priority: int) -> int:
+        return sum(1 for w in self._queue if w.priority <= priority and not w.future.done())
+
+    def estimate_wait(self, ahead: int) -> float:
+        """
+        Оцінка очікування: залишок генерацій у польоті + повні "хвилі" попереду
+
+        Слот звільняється, коли завершується генерація в польоті - через
+        max(0, avg - elapsed), а не через повний avg_service_time
+        """
+        limit = self.max_concurrency
+        now = time.monotonic()
+        remaining = sorted(max(0.0, self.avg_service_time - (now - started)) for started in self._started)
+        remaining = (remaining + [0.0] * limit)[:limit]
+        waves, slot = divmod(ahead, limit)
+        return remaining[slot] + waves * self.avg_service_time
+
+    def _start_slot(self) -> None:
+        self.in_flight += 1
+        heapq.heappush(self._started, time.monotonic())
+
+    async def acquire(self, priority: RequestPriority, max_wait: Optional[float] = None) -> None:
+        """Дочекатися слоту або отримати AdmissionRejected"""
+        start = time.monotonic()
+
+        if self.in_flight < self.max_concurrency and self.queue_depth == 0:
+            self._start_slot()
+            self._record_wait(0.0)
+            return
+
+        if self.queue_depth >= self.max_queue_depth:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(
+                "LLM queue is full",
+                status_code=429,
+                retry_after=self.estimate_wait(self.queue_depth),
+            )
+
+        budget = self.max_wait_seconds if max_wait is None else max_wait
+        ahead = self._waiting_ahead(priority)
+        estimated = self.estimate_wait(ahead)
+        if ahead > 0 and priority != RequestPriority.CRITICAL and estimated > budget:
+            # Не встигне до deadline - відмовити одразу, а не після очікування.
+            # Першого в черзі та CRITICAL не відкидаємо за оцінкою: вони
+            # отримають наступний слот, відмову дасть лише реальний timeout
+            self.shed_deadline += 1
+            raise AdmissionRejected(
+                f"Estimated LLM wait {estimated:.0f}s exceeds deadline {budget:.0f}s",
+                status_code=503,
+                retry_after=estimated,
+            )
+
+        waiter = _Waiter(int(priority), next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=budget)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self.shed_deadline += 1
+                raise AdmissionRejected(
+                    f"LLM queue wait exceeded {budget:.0f}s",
+                    status_code=503,
+                    retry_after=self.estimate_wait(self._waiting_ahead(priority)),
+                )
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Слот уже передано, але клієнт пішов - віддати наступному
+                self.release()
+            else:
+                waiter.future.cancel()
+            raise
+
+        self._record_wait(time.monotonic() - start)
+
+    def try_acquire(self) -> bool:
+        """
+        Слот без очікування (спекулятивна робота, напр. prefill): лише якщо
+        слот вільний і черга порожня - інакше False, чекаючі мають перевагу
+        """
+        if self.in_flight < self.max_concurrency and self.queue_depth == 0:
+            self._start_slot()
+            self.admitted += 1
+            return True
+        return False
+
+    def release(self) -> None:
+        """Звільнити слот: передати найпріоритетнішому з черги"""
+        self.in_flight -= 1
+        if self._started:
+            # Слот не ідентифікується - вважаємо, що завершилась найстаріша
+            heapq.heappop(self._started)
+        # Ліміт міг вирости (AIMD) - допустити стільки, скільки є слотів
+        limit = self.max_concurrency
+        while self._queue and self.in_flight < limit:
+            waiter = heapq.heappop(self._queue)
+            if not waiter.future.done():
+                self._start_slot()
+                waiter.future.set_result(None)
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        priority: RequestPriority,
+        max_wait: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """Виконати блок в межах ліміту паралельних генерацій"""
+        await self.acquire(priority, max_wait)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record_service(time.monotonic() - start)
+            self.release()
+
+    def _record_wait(self, seconds: float) -> None:
+        self.admitted += 1
+        self.avg_wait_time = 0.8 * self.avg_wait_time + 0.2 * seconds
+        self.max_wait_observed = max(self.max_wait_observed, seconds)
+        if seconds > 1.0:
+            logger.info(f"Запит чекав у черзі LLM {seconds:.1f}s")
+
+    def _record_service(self, seconds: float) -> None:
+        self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * seconds
+
+    def stats(self) -> Dict[str, Any]:
+        depth_by_priority = {p.name.lower(): 0 for p in RequestPriority}
+        for waiter in self._queue:
+            if not waiter.future.done():
+                depth_by_priority[RequestPriority(waiter.priority).name.lower()] += 1
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(depth_by_priority.values()),
+            "queue_depth_by_priority": depth_by_priority,
+            "avg_wait_seconds": round(self.avg_wait_time, 3),
+            "max_wait_seconds": round(self.max_wait_observed, 3),
+            "avg_service_seconds": round(self.avg_service_time, 3),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "shed_deadline": self.shed_deadline,
+        }
+
+
+def _backend_capacity() -> int:
+    """Сума AIMD лімітів backends глобального Ollama client"""
+    from llm.ollama_client import get_ollama_client
+
+    return get_ollama_client().pool.capacity()
+
+
+# Глобальний admission controller
+admission = AdmissionController(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue_depth=settings.LLM_MAX_QUEUE_DEPTH,
+    max_wait_seconds=settings.LLM_QUEUE_TIMEOUT,
+    capacity=_backend_capacity,
+)
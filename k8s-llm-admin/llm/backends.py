@@ -0,0 +1,251 @@
+"""
+Пул Ollama backends
+Least-outstanding-requests routing, перевага backend з уже завантаженою моделлю,
+фонові health probes, ejection несправних хостів та AIMD ліміт на кожен backend
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+
+import httpx
+
+from llm.concurrency import AIMDLimiter
+from utils.logger import logger
+
+UNIX_PREFIX = "unix:"
+
+
+def parse_backend_url(url: str) -> tuple[str, Optional[str]]:
+    """'unix:/run/ollama.sock' -> ('http://localhost', '/run/ollama.sock')"""
+    if url.startswith(UNIX_PREFIX):
+        return "http://localhost", url[len(UNIX_PREFIX):]
+    return url.rstrip("/"), None
+
+
+class OllamaBackend:
+    """Один Ollama хост зі своїм пулом з'єднань"""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        client_factory: Callable[[Optional[str]], httpx.AsyncClient],
+        socket_path: Optional[str] = None,
+        limiter: Optional[AIMDLimiter] = None,
+        max_warm_prefixes: int = 8,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.socket_path = socket_path
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.loaded_models: Set[str] = set()
+        self.last_probe = 0.0
+        self.total_requests = 0
+        self.limiter = limiter or AIMDLimiter()
+        # Префікси, що нещодавно пройшли prefill тут (ймовірно ще в KV cache)
+        self.warm_prefixes: "OrderedDict[str, float]" = OrderedDict()
+        self.max_warm_prefixes = max_warm_prefixes
+        self._client_factory = client_factory
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """HTTP client backend (створюється при першому використанні)"""
+        if self._http is None or self._http.is_closed:
+            self._http = self._client_factory(self.socket_path)
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def remember_prefix(self, prefix_id: str) -> None:
+        self.warm_prefixes[prefix_id] = time.time()
+        self.warm_prefixes.move_to_end(prefix_id)
+        while len(self.warm_prefixes) > self.max_warm_prefixes:
+            self.warm_prefixes.popitem(last=False)
+
+    def has_prefix(self, prefix_id: Optional[str]) -> bool:
+        return prefix_id is not None and prefix_id in self.warm_prefixes
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "total_requests": self.total_requests,
+            "consecutive_failures": self.consecutive_failures,
+            "loaded_models": sorted(self.loaded_models),
+            "warm_prefixes": len(self.warm_prefixes),
+            "concurrency": self.limiter.stats(),
+        }
+
+
+class BackendPool:
+    """Набір Ollama backends з least-outstanding-requests маршрутизацією"""
+
+    def __init__(
+        self,
+        urls: List[str],
+        client_factory: Callable[[Optional[str]], httpx.AsyncClient],
+        eject_after_failures: int = 3,
+        probe_interval: float = 15.0,
+        limiter_factory: Callable[[], AIMDLimiter] = AIMDLimiter,
+    ):
+        if not urls:
+            raise ValueError("Потрібен хоча б один Ollama backend")
+
+        self.eject_after_failures = eject_after_failures
+        self.probe_interval = probe_interval
+        self.backends: List[OllamaBackend] = []
+        for url in urls:
+            base_url, socket_path = parse_backend_url(url)
+            self.backends.append(
+                OllamaBackend(
+                    name=url,
+                    base_url=base_url,
+                    client_factory=client_factory,
+                    socket_path=socket_path,
+                    limiter=limiter_factory(),
+                )
+            )
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @property
+    def primary(self) -> OllamaBackend:
+        return self.backends[0]
+
+    def capacity(self) -> int:
+        """Сума поточних AIMD лімітів здорових backends (всі ejected - усіх)"""
+        backends = [b for b in self.backends if b.healthy] or self.backends
+        return sum(int(b.limiter.limit) for b in backends)
+
+    def pick(
+        self,
+        model: Optional[str] = None,
+        exclude: Optional[Set[str]] = None,
+        prefix: Optional[str] = None,
+    ) -> OllamaBackend:
+        """Backend з найменшою кількістю активних запитів
+
+        Серед здорових backends спершу ті, де модель уже в пам'яті
+        (немає load_duration), потім ті, де ``prefix`` уже в KV cache і є
+        вільний слот, потім - найменш завантажені відносно їхнього
+        поточного AIMD ліміту.
+        ``exclude`` - backends, що вже не відповіли на цей запит.
+        """
+        exclude = exclude or set()
+        candidates = [b for b in self.backends if b.healthy and b.name not in exclude]
+        if not candidates:
+            candidates = [b for b in self.backends if b.name not in exclude]
+        if not candidates:
+            # Всі ejected - краще спробувати, ніж відмовити одразу
+            candidates = self.backends
+
+        return min(
+            candidates,
+            key=lambda b: (
+                model is not None and model not in b.loaded_models,
+                not (b.has_prefix(prefix) and b.limiter.available),
+                b.outstanding / max(b.limiter.limit, 1.0),
+            ),
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        model: Optional[str] = None,
+        exclude: Optional[Set[str]] = None,
+        prefix: Optional[str] = None,
+    ) -> AsyncIterator[OllamaBackend]:
+        """Зарезервувати backend (і слот його AIMD ліміту) на час одного запиту"""
+        backend = self.pick(model, exclude, prefix)
+        backend.outstanding += 1
+        backend.total_requests += 1
+        try:
+            await backend.limiter.acquire()
+            try:
+                yield backend
+            finally:
+                await backend.limiter.release()
+        except httpx.TransportError:
+            self.mark_failure(backend)
+            raise
+        else:
+            self.mark_success(backend, model)
+            if prefix:
+                backend.remember_prefix(prefix)
+        finally:
+            backend.outstanding -= 1
+
+    def mark_failure(self, backend: OllamaBackend) -> None:
+        backend.consecutive_failures += 1
+        if backend.healthy and backend.consecutive_failures >= self.eject_after_failures:
+            backend.healthy = False
+            logger.warning(f"Ollama backend {backend.name} виключено з пулу")
+
+    def mark_success(self, backend: OllamaBackend, model: Optional[str] = None) -> None:
+        backend.consecutive_failures = 0
+        if not backend.healthy:
+            backend.healthy = True
+            logger.info(f"Ollama backend {backend.name} повернуто в пул")
+        if model:
+            backend.loaded_models.add(model)
+
+    async def probe(self, backend: OllamaBackend) -> bool:
+        """Health probe: /api/ps дає і доступність, і завантажені моделі"""
+        backend.last_probe = time.time()
+        try:
+            response = await backend.http.get(backend.url("/api/ps"), timeout=5)
+            if response.status_code == 404:
+                # Старі версії Ollama без /api/ps - тільки liveness
+                response = await backend.http.get(backend.url("/api/version"), timeout=5)
+                response.raise_for_status()
+            else:
+                response.raise_for_status()
+                backend.loaded_models = {m.get("name", "") for m in response.json().get("models", [])}
+            self.mark_success(backend)
+            return True
+        except (httpx.HTTPError, ValueError):
+            self.mark_failure(backend)
+            return False
+
+    async def probe_all(self) -> List[bool]:
+        return await asyncio.gather(*(self.probe(b) for b in self.backends))
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self.probe_all()
+            except Exception as e:  # pragma: no cover - probe не має вбити loop
+                logger.error(f"Помилка health probe: {e}")
+
+    def start(self) -> None:
+        """Запустити фонові health probes"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def aclose(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+        for backend in self.backends:
+            await backend.aclose()
+
+    def stats(self) -> List[Dict]:
+        return [b.stats() for b in self.backends]
@@ -0,0 +1,164 @@
+"""
+In-memory LRU + TTL кеш відповідей LLM
+Ключ - hash нормалізованого промпта + модель + параметри генерації
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+from config.settings import settings
+
+V = TypeVar("V")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Нормалізація промпта: однакові питання з різними пробілами - один ключ"""
+    return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+
+def make_cache_key(
+    prompt: str,
+    model: str,
+    options: Optional[Dict[str, Any]] = None,
+    system_prompt: Optional[str] = None,
+    system_id: Optional[str] = None,
+) -> str:
+    """SHA-256 ключ для (промпт, system, модель, options)
+
+    system_id (prefix_id передобчисленого system prompt) замінює
+    нормалізацію та hashing багатокілобайтного system на кожен запит.
+    """
+    if system_id:
+        system = f"id:{system_id}"
+    else:
+        system = normalize_prompt(system_prompt) if system_prompt else None
+    material = json.dumps(
+        {
+            "prompt": normalize_prompt(prompt),
+            "system": system,
+            "model": model,
+            "options": options or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def make_prefix_id(system_prompt: str) -> str:
+    """Короткий ID статичного префіксу (байт-у-байт, без нормалізації)
+
+    Мемоізовано: для interned варіантів повторний виклик - lookup без sha256.
+    """
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class CacheStats:
+    """Лічильники кешу"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": self.entries,
+            "bytes": self.bytes,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class LRUTTLCache(Generic[V]):
+    """Bounded LRU кеш з TTL та лімітом за кількістю записів і байтами"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        # key -> (value, size_bytes, expires_at)
+        self._data: "OrderedDict[str, Tuple[V, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.stats.misses += 1
+                return None
+
+            value, size, expires_at = item
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: V, size_bytes: int, ttl_seconds: Optional[float] = None) -> None:
+        if size_bytes > self.max_bytes:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, size_bytes, time.monotonic() + ttl)
+            self.stats.entries += 1
+            self.stats.bytes += size_bytes
+
+            while self._data and (
+                self.stats.entries > self.max_entries or self.stats.bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.stats.entries = 0
+            self.stats.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= size
+
+
+# Глобальний кеш діагнозів
+diagnosis_cache: LRUTTLCache = LRUTTLCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+)
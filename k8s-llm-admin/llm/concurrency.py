@@ -0,0 +1,128 @@
+"""
+Adaptive (AIMD) ліміт паралельних запитів до одного Ollama backend
+Additive increase поки латентність стабільна, multiplicative decrease коли
+запити починають чекати всередині Ollama (TTFT росте) або токени сповільнюються
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+NS = 1e9  # Ollama повертає тривалості в наносекундах
+
+
+class AIMDLimiter:
+    """Динамічний in-flight ліміт, що шукає паралельну ємність Ollama"""
+
+    def __init__(
+        self,
+        initial_limit: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        backoff: float = 0.7,
+        queue_delay_threshold: float = 0.5,
+        gradient_tolerance: float = 0.6,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.queue_delay_threshold = queue_delay_threshold
+        self.gradient_tolerance = gradient_tolerance
+
+        self.in_flight = 0
+        self._changed: Optional[asyncio.Condition] = None
+
+        # Латентність: найкраща (baseline) та поточна (EWMA) секунд на токен
+        self.baseline_token_latency: Optional[float] = None
+        self.avg_token_latency: Optional[float] = None
+        self.gradient = 1.0
+        self.avg_ttft = 0.0
+        self.last_queue_delay = 0.0
+
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+
+    @property
+    def changed(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    @property
+    def available(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self) -> None:
+        async with self.changed:
+            while self.in_flight >= int(self.limit):
+                await self.changed.wait()
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self.changed:
+            self.in_flight -= 1
+            self.changed.notify_all()
+
+    def observe(self, ttft: float, stats: Dict[str, Any]) -> None:
+        """Оновити ліміт за одним завершеним запитом
+
+        Args:
+            ttft: Time-to-first-token, виміряний клієнтом (секунди)
+            stats: Фінальний JSON Ollama (load/prompt_eval/eval durations)
+        """
+        load = stats.get("load_duration", 0) / NS
+        prompt_eval = stats.get("prompt_eval_duration", 0) / NS
+        eval_duration = stats.get("eval_duration", 0) / NS
+        eval_count = stats.get("eval_count", 0)
+
+        # Час, що запит простояв у черзі всередині Ollama
+        queue_delay = max(0.0, ttft - load - prompt_eval)
+        self.last_queue_delay = queue_delay
+        self.avg_ttft = 0.8 * self.avg_ttft + 0.2 * ttft if self.avg_ttft else ttft
+
+        if eval_count:
+            per_token = eval_duration / eval_count
+            if self.baseline_token_latency is None:
+                self.baseline_token_latency = per_token
+            else:
+                # Baseline повільно "спливає", щоб адаптуватись до зміни моделі/хоста
+                self.baseline_token_latency = min(per_token, self.baseline_token_latency * 1.01)
+            self.avg_token_latency = (
+                per_token if self.avg_token_latency is None
+                else 0.8 * self.avg_token_latency + 0.2 * per_token
+            )
+            self.gradient = self.baseline_token_latency / self.avg_token_latency
+
+        congested = queue_delay > self.queue_delay_threshold or self.gradient < self.gradient_tolerance
+
+        if congested:
+            self._decrease()
+        elif self.in_flight >= int(self.limit) - 1:
+            # Рости тільки якщо ліміт справді використовується
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self.increases += 1
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        # Одна congestion-подія - одне зменшення (запити, що вже летять, не рахуються)
+        if now - self._last_decrease < max(self.avg_ttft, 1.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self.decreases += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "limit_exact": round(self.limit, 3),
+            "in_flight": self.in_flight,
+            "latency_gradient": round(self.gradient, 3),
+            "avg_ttft_seconds": round(self.avg_ttft, 3),
+            "last_queue_delay_seconds": round(self.last_queue_delay, 3),
+            "avg_token_latency_ms": round((self.avg_token_latency or 0) * 1000, 3),
+            "baseline_token_latency_ms": round((self.baseline_token_latency or 0) * 1000, 3),
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
@@ -1,18 +1,28 @@
 """
 Client для взаємодії з Ollama API
-Обгортка для HTTP запитів з retry logic, streaming, caching
+Async обгортка (httpx) з retry logic, streaming та пулом з'єднань
 """
 
-import requests
+import asyncio
 import json
 import time
-from typing import Dict, Any, Optional, Generator, List
+from typing import Dict, Any, Optional, AsyncIterator, List, Set
 from dataclasses import dataclass
 from enum import Enum
 
+import httpx
+
 from config.settings import settings
+from llm.backends import BackendPool, OllamaBackend, UNIX_PREFIX
+from llm.cache import make_prefix_id
+from llm.concurrency import AIMDLimiter, NS
+from llm.warmup import ColdLoadStats
+from prompts.tokenizer import get_token_counter
 from utils.logger import logger
 
+# Chat template (role headers, BOS/EOS) понад підраховані токени тексту
+NUM_CTX_OVERHEAD = 32
+
 
 class ModelSize(Enum):
     """Розміри моделей"""
@@ -30,10 +40,19 @@ class LLMResponse:
     generation_time: float
     prompt_tokens: int
     cached: bool = False
+    load_duration: float = 0.0  # > 0 якщо модель довантажувалась (cold load)
 
 
 class OllamaClient:
-    """Client для Ollama API"""
+    """Async client для Ollama API
+    
+    Кожен Ollama backend має свій довгоживучий ``httpx.AsyncClient``,
+    тому генерація не блокує event loop, а з'єднання перевикористовуються.
+    Розмір пулу та keep-alive налаштовуються; ``socket_path`` перемикає
+    transport на Unix domain socket (base_url тоді лише для Host header).
+    ``backend_urls`` задає кілька Ollama хостів: кожен запит іде на backend
+    з найменшою кількістю активних запитів (див. ``llm.backends``).
+    """
     
     def __init__(
         self,
@@ -41,25 +60,184 @@ class OllamaClient:
         model: str = settings.OLLAMA_MODEL,
         timeout: int = settings.OLLAMA_TIMEOUT,
         max_retries: int = 3,
+        pool_size: int = settings.OLLAMA_POOL_SIZE,
+        keepalive_connections: int = settings.OLLAMA_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.OLLAMA_KEEPALIVE_EXPIRY,
+        socket_path: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        backend_urls: Optional[List[str]] = None,
+        eject_after_failures: int = settings.OLLAMA_EJECT_AFTER_FAILURES,
+        probe_interval: float = settings.OLLAMA_PROBE_INTERVAL,
+        initial_concurrency: int = settings.OLLAMA_INITIAL_CONCURRENCY,
+        max_concurrency: int = settings.OLLAMA_MAX_CONCURRENCY,
+        keep_alive: Optional[str] = settings.OLLAMA_KEEP_ALIVE,
+        cold_load_threshold: float = settings.OLLAMA_COLD_LOAD_THRESHOLD,
+        context_window: int = settings.LLM_CONTEXT_WINDOW,
+        num_ctx_buckets: Optional[List[int]] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
         self.max_retries = max_retries
+        self.socket_path = socket_path
+        self.keep_alive = keep_alive
+        self.cold_loads = ColdLoadStats(cold_load_threshold)
+        self.context_window = context_window
+        if num_ctx_buckets is None:
+            num_ctx_buckets = settings.num_ctx_buckets
+        # Bucket-и понад context_window не використовуються, сам cap - останній bucket
+        self.num_ctx_buckets = sorted({b for b in num_ctx_buckets if b < context_window} | {context_window})
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=min(keepalive_connections, pool_size),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        
+        if not backend_urls:
+            backend_urls = [f"{UNIX_PREFIX}{socket_path}" if socket_path else self.base_url]
+        self.pool = BackendPool(
+            backend_urls,
+            client_factory=self._build_http,
+            eject_after_failures=eject_after_failures,
+            probe_interval=probe_interval,
+            limiter_factory=lambda: AIMDLimiter(
+                initial_limit=initial_concurrency,
+                max_limit=max_concurrency,
+                queue_delay_threshold=settings.OLLAMA_QUEUE_DELAY_THRESHOLD,
+            ),
+        )
+        
+        # Endpoints (backend обирається на кожен запит)
+        self.generate_path = "/api/generate"
+        self.chat_path = "/api/chat"
+        self.models_path = "/api/tags"
+    
+    def _build_http(self, socket_path: Optional[str]) -> httpx.AsyncClient:
+        """HTTP client з keep-alive пулом; Unix socket якщо Ollama на тому ж хості"""
+        if socket_path:
+            logger.info(f"Ollama через Unix socket: {socket_path}")
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=10.0),
+            transport=self._transport or httpx.AsyncHTTPTransport(limits=self.limits, uds=socket_path),
+        )
+    
+    def start(self) -> None:
+        """Запустити фонові health probes backends"""
+        self.pool.start()
+    
+    async def aclose(self) -> None:
+        """Зупинити probes та закрити пули з'єднань"""
+        await self.pool.aclose()
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Стан backends (для /api/health)"""
+        return self.pool.stats()
+    
+    def _with_keep_alive(self, payload: Dict) -> Dict:
+        """keep_alive на кожен виклик - Ollama не вивантажує модель між запитами"""
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def num_ctx_for(self, prompt_tokens: int, max_tokens: int) -> int:
+        """Найменший bucket, у який влазять prompt + відповідь (не більше context_window)"""
+        needed = prompt_tokens + max_tokens + NUM_CTX_OVERHEAD
+        return next((bucket for bucket in self.num_ctx_buckets if bucket >= needed), self.context_window)
+    
+    @property
+    def default_prompt_budget(self) -> int:
+        """Резерв промпта діагнозу: context window без відповіді (LLM_MAX_TOKENS)"""
+        return self.context_window - settings.LLM_MAX_TOKENS - NUM_CTX_OVERHEAD
+    
+    def _with_num_ctx(
+        self,
+        payload: Dict,
+        texts: List[str],
+        max_tokens: int,
+        prompt_budget: Optional[int] = None,
+    ) -> Dict:
+        """
+        num_ctx за фактичним розміром запиту замість default моделі
+        
+        prompt_budget резервує місце під промпт: warm-up, prefill і сам діагноз
+        отримують один bucket, хоч би якого розміру був evidence (інший num_ctx
+        перезавантажує runner і скидає KV cache)
+        """
+        counter = get_token_counter(payload["model"])
+        prompt_tokens = sum(counter.count(text) for text in texts if text)
+        prompt_tokens = max(prompt_tokens, prompt_budget or 0)
+        payload.setdefault("options", {})["num_ctx"] = self.num_ctx_for(prompt_tokens, max_tokens)
+        return payload
+    
+    def _observe(self, backend: OllamaBackend, ttft: float, data: Dict) -> None:
+        """Метрики завершеного запиту: AIMD ліміт та cold loads"""
+        backend.limiter.observe(ttft, data)
+        self.cold_loads.record(
+            data.get("model", self.model),
+            backend.name,
+            data.get("load_duration", 0) / NS,
+        )
+    
+    async def warm_up(self, model: Optional[str] = None, backend: Optional[OllamaBackend] = None) -> float:
+        """Завантажити модель у пам'ять backend (порожній prompt) -> load_duration, s"""
+        backend = backend or self.pool.pick(model or self.model)
+        payload = self._with_keep_alive({"model": model or self.model, "prompt": "", "stream": False})
+        # Runner завантажується з тим num_ctx, який матимуть діагнози
+        self._with_num_ctx(payload, [], settings.LLM_MAX_TOKENS, self.default_prompt_budget)
+        response = await backend.http.post(backend.url(self.generate_path), json=payload)
+        response.raise_for_status()
+        backend.loaded_models.add(payload["model"])
+        return response.json().get("load_duration", 0) / NS
+    
+    async def prefill(
+        self,
+        system_prompt: str,
+        max_tokens: int = settings.LLM_MAX_TOKENS,
+        prompt_budget: Optional[int] = None,
+    ) -> bool:
+        """
+        Speculative prefill: оцінити тільки статичний system prompt
+        
+        Запит потрапляє на backend, який потім обере основний запит
+        з тим самим префіксом, тож його KV cache вже буде готовий.
+        num_ctx рахується як для основного запиту (max_tokens і резерв
+        prompt_budget під evidence): інший bucket перезавантажив би runner.
+        
+        Returns:
+            True якщо prefill виконано
+        """
+        payload = self._with_keep_alive({
+            "model": self.model,
+            "system": system_prompt,
+            "prompt": "",
+            "stream": False,
+            # num_predict 0 в Ollama означає "без ліміту", тому мінімум - 1 токен
+            "options": {"num_predict": 1, "temperature": 0},
+        })
+        self._with_num_ctx(payload, [system_prompt], max_tokens, prompt_budget)
+        
+        try:
+            data = await self._make_request(self.generate_path, payload)
+        except Exception as e:
+            logger.debug(f"Prefill не вдався: {e}")
+            return False
         
-        # Endpoints
-        self.generate_url = f"{self.base_url}/api/generate"
-        self.chat_url = f"{self.base_url}/api/chat"
-        self.models_url = f"{self.base_url}/api/tags"
+        logger.debug(
+            f"Prefill {data.get('prompt_eval_count', 0)} токенів за "
+            f"{data.get('prompt_eval_duration', 0) / NS:.2f}s",
+        )
+        return True
     
-    def generate(
+    async def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 2000,
-        stream: bool = False
-    ) -> LLMResponse | Generator[str, None, None]:
+        stream: bool = False,
+        prompt_budget: Optional[int] = None
+    ) -> LLMResponse | AsyncIterator[str]:
         """
         Генерація відповіді від LLM
         
@@ -69,9 +247,10 @@ class OllamaClient:
             temperature: Sampling temperature (0.0 - 1.0)
             max_tokens: Max tokens to generate
             stream: Whether to stream response
+            prompt_budget: Резерв токенів промпта для num_ctx (замість фактичного розміру)
         
         Returns:
-            LLMResponse або Generator для streaming
+            LLMResponse або AsyncIterator для streaming
         """
         payload = {
             "model": self.model,
@@ -86,21 +265,23 @@ class OllamaClient:
         if system_prompt:
             payload["system"] = system_prompt
         
+        self._with_keep_alive(payload)
+        self._with_num_ctx(payload, [prompt, system_prompt], max_tokens, prompt_budget)
         start_time = time.time()
         
         try:
             if stream:
                 return self._generate_stream(payload)
             else:
-                return self._generate_complete(payload, start_time)
+                return await self._generate_complete(payload, start_time)
         
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
             raise
     
-    def _generate_complete(self, payload: Dict, start_time: float) -> LLMResponse:
+    async def _generate_complete(self, payload: Dict, start_time: float) -> LLMResponse:
         """Повна генерація (non-streaming)"""
-        response = self._make_request(self.generate_url, payload)
+        response = await self._make_request(self.generate_path, payload)
         
         generation_time = time.time() - start_time
         
@@ -109,29 +290,33 @@ class OllamaClient:
             model=self.model,
             tokens_generated=response.get('eval_count', 0),
             generation_time=generation_time,
-            prompt_tokens=response.get('prompt_eval_count', 0)
+            prompt_tokens=response.get('prompt_eval_count', 0),
+            load_duration=response.get('load_duration', 0) / NS,
         )
     
-    def _generate_stream(self, payload: Dict) -> Generator[str, None, None]:
+    async def _generate_stream(self, payload: Dict) -> AsyncIterator[str]:
         """Streaming генерація"""
-        response = requests.post(
-            self.generate_url,
-            json=payload,
-            timeout=self.timeout,
-            stream=True
-        )
-        response.raise_for_status()
-        
-        for line in response.iter_lines():
-            if line:
-                chunk = json.loads(line)
-                if 'response' in chunk:
-                    yield chunk['response']
+        prefix = make_prefix_id(payload["system"]) if payload.get("system") else None
+        async with self.pool.acquire(self.model, prefix=prefix) as backend:
+            start = time.monotonic()
+            ttft: Optional[float] = None
+            
+            async with backend.http.stream("POST", backend.url(self.generate_path), json=payload) as response:
+                response.raise_for_status()
                 
-                if chunk.get('done', False):
-                    break
+                async for line in response.aiter_lines():
+                    if line:
+                        chunk = json.loads(line)
+                        if ttft is None:
+                            ttft = time.monotonic() - start
+                        if 'response' in chunk:
+                            yield chunk['response']
+                        
+                        if chunk.get('done', False):
+                            self._observe(backend, ttft, chunk)
+                            break
     
-    def chat(
+    async def chat(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
@@ -158,8 +343,11 @@ class OllamaClient:
             }
         }
         
+        self._with_keep_alive(payload)
+        # + кілька токенів role header на кожне повідомлення
+        self._with_num_ctx(payload, [m["content"] for m in messages], max_tokens + 4 * len(messages))
         start_time = time.time()
-        response = self._make_request(self.chat_url, payload)
+        response = await self._make_request(self.chat_path, payload)
         generation_time = time.time() - start_time
         
         return LLMResponse(
@@ -167,28 +355,37 @@ class OllamaClient:
             model=self.model,
             tokens_generated=response.get('eval_count', 0),
             generation_time=generation_time,
-            prompt_tokens=response.get('prompt_eval_count', 0)
+            prompt_tokens=response.get('prompt_eval_count', 0),
+            load_duration=response.get('load_duration', 0) / NS,
         )
     
-    def _make_request(self, url: str, payload: Dict) -> Dict:
-        """HTTP request з retry logic"""
+    async def _make_request(self, path: str, payload: Dict) -> Dict:
+        """HTTP request з retry logic (повтор іде на інший backend)"""
+        failed: Set[str] = set()
+        prefix = make_prefix_id(payload["system"]) if payload.get("system") else None
+        
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
-                    url,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.json()
+                async with self.pool.acquire(self.model, exclude=failed, prefix=prefix) as backend:
+                    failed.add(backend.name)
+                    start = time.monotonic()
+                    response = await backend.http.post(backend.url(path), json=payload)
+                    response.raise_for_status()
+                    data = response.json()
+                    
+                    if "eval_duration" in data or "load_duration" in data:
+                        # Non-streaming: TTFT = весь час мінус генерація токенів
+                        ttft = time.monotonic() - start - data.get("eval_duration", 0) / NS
+                        self._observe(backend, max(ttft, 0.0), data)
+                    return data
             
-            except requests.exceptions.Timeout:
+            except httpx.TimeoutException:
                 logger.warning(f"Request timeout (attempt {attempt + 1}/{self.max_retries})")
                 if attempt == self.max_retries - 1:
                     raise
-                time.sleep(2 ** attempt)  # Exponential backoff
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff
             
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 if e.response.status_code == 404:
                     error_msg = f"Модель '{self.model}' не знайдена. Перевірте чи модель встановлена: ollama list"
                     logger.error(error_msg)
@@ -196,37 +393,40 @@ class OllamaClient:
                 logger.error(f"HTTP error: {e.response.status_code} - {e.response.text}")
                 raise
             
-            except requests.exceptions.RequestException as e:
+            except httpx.ConnectError as e:
+                logger.warning(f"Ollama backend недоступний (attempt {attempt + 1}/{self.max_retries}): {e}")
+                if attempt == self.max_retries - 1:
+                    raise
+            
+            except httpx.HTTPError as e:
                 logger.error(f"Request failed: {e}")
                 raise
     
-    def list_models(self) -> List[str]:
+    async def list_models(self) -> List[str]:
         """Список доступних моделей"""
-        response = requests.get(self.models_url, timeout=10)
+        backend = self.pool.pick()
+        response = await backend.http.get(backend.url(self.models_path), timeout=10)
         response.raise_for_status()
         models = response.json().get('models', [])
         return [m['name'] for m in models]
     
-    def model_info(self, model_name: Optional[str] = None) -> Dict:
+    async def model_info(self, model_name: Optional[str] = None) -> Dict:
         """Інформація про модель"""
         model = model_name or self.model
-        response = requests.post(
-            f"{self.base_url}/api/show",
+        backend = self.pool.pick(model)
+        response = await backend.http.post(
+            backend.url("/api/show"),
             json={"name": model},
             timeout=10
         )
         response.raise_for_status()
         return response.json()
     
-    def health_check(self) -> bool:
-        """Перевірка доступності Ollama"""
+    async def health_check(self) -> bool:
+        """Перевірка доступності Ollama (хоча б один backend живий)"""
         try:
-            response = requests.get(
-                f"{self.base_url}/api/version",
-                timeout=5,
-            )
-            return response.status_code == 200
-        except:
+            return any(await self.pool.probe_all())
+        except Exception:
             return False
 
 
@@ -243,6 +443,8 @@ def get_ollama_client() -> OllamaClient:
             base_url=settings.OLLAMA_BASE_URL,
             model=settings.OLLAMA_MODEL,
             timeout=settings.OLLAMA_TIMEOUT,
+            socket_path=settings.OLLAMA_SOCKET_PATH,
+            backend_urls=settings.ollama_backend_urls,
         )
 
     return _ollama_client
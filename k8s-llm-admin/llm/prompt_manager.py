@@ -1,14 +1,30 @@
-from typing import Dict, Optional, Any, List
-from dataclasses import dataclass
+import asyncio
+from typing import Dict, Optional, Any, List, AsyncIterator
+from dataclasses import dataclass, replace
 
 from prompts.multilang_prompts import (
     prompt_manager,
     Language,
+    PromptParts,
     detect_language,
 )
+from prompts.budget import KUBECTL_EVIDENCE, SECTION_POLICY, fit_messages
+from prompts.compression import output_compressor
+from prompts.system_prompts import ProblemSeverity, optimize_prompt_length
+from prompts.tokenizer import get_token_counter
+from prompts.validators import ValidationError, validator
+from utils.redaction import get_redactor
+from config.settings import settings
+from k8s.evidence import evidence_collector
+from llm.admission import admission, priority_for, RequestPriority
+from llm.cache import diagnosis_cache, make_cache_key, make_prefix_id
 from llm.ollama_client import get_ollama_client, LLMResponse
+from llm.singleflight import SingleFlight
 from utils.logger import logger
 
+# Токени role headers / special tokens chat template навколо system + prompt
+TEMPLATE_OVERHEAD_TOKENS = 64
+
 
 @dataclass
 class DiagnosticRequest:
@@ -16,10 +32,12 @@ class DiagnosticRequest:
 
     user_message: str
     resource_type: Optional[str] = None
+    resource_name: Optional[str] = None  # Якщо вказано - evidence збирається через kubectl
     namespace: str = "default"
     kubectl_output: Optional[str] = None
     language: Optional[Language] = None
     cluster_context: Optional[Dict[str, Any]] = None
+    severity: Optional[ProblemSeverity] = None
 
 
 class PromptOrchestrator:
@@ -28,8 +46,13 @@ class PromptOrchestrator:
     def __init__(self) -> None:
         self.llm_client = get_ollama_client()
         self.prompt_manager = prompt_manager
+        self.cache = diagnosis_cache
+        self.singleflight = SingleFlight()
+        self.admission = admission
+        self.evidence = evidence_collector
+        self._prefills: Dict[str, asyncio.Task] = {}
 
-    def diagnose(self, request: DiagnosticRequest) -> LLMResponse:
+    async def diagnose(self, request: DiagnosticRequest) -> LLMResponse:
         """
         Головна функція діагностики
 
@@ -46,36 +69,172 @@ class PromptOrchestrator:
             language = detected
             logger.info(f"Визначена мова: {detected.value}")
 
-        # 2. Згенерувати промпт
+        # 2. Зібрати kubectl evidence (паралельно з prefill) і згенерувати промпт
+        request = await self.collect_evidence(request, language)
+        self.validate(request)
+        parts = self.build_prompt(request, language)
+
+        logger.debug(
+            f"Згенерований промпт (system: {len(parts.system)}, prompt: {len(parts.prompt)} chars)",
+        )
+
+        # 3. Перевірити кеш (однакові питання повторюються під час інцидентів)
+        options = {"temperature": 0.7, "max_tokens": settings.LLM_MAX_TOKENS}
+        cache_key = make_cache_key(parts.prompt, self.llm_client.model, options, parts.system, parts.prefix_id)
+
+        if settings.ENABLE_CACHE:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Діагноз взято з кешу")
+                return replace(cached, cached=True)
+
+        # 4. Відправити до LLM (однакові in-flight запити ділять одну генерацію)
+        priority = priority_for(request.severity)
+        return await self.singleflight.do(
+            cache_key,
+            lambda: self._generate(parts, options, cache_key, priority),
+        )
+
+    @property
+    def prompt_token_budget(self) -> int:
+        """Context window мінус відповідь (LLM_MAX_TOKENS) і службові токени chat template"""
+        return settings.LLM_CONTEXT_WINDOW - settings.LLM_MAX_TOKENS - TEMPLATE_OVERHEAD_TOKENS
+
+    def build_prompt(self, request: DiagnosticRequest, language: Language) -> PromptParts:
+        """Стабільний префікс у `system` або (legacy) один рядок у `prompt`"""
+        kubectl_output = self.compress_evidence(request.kubectl_output)
+
+        if settings.PROMPT_STABLE_PREFIX:
+            return self.prompt_manager.build_prompt_parts(
+                user_message=request.user_message,
+                resource_type=request.resource_type,
+                language=language,
+                cluster_context=request.cluster_context,
+                kubectl_output=kubectl_output,
+                token_budget=self.prompt_token_budget,
+                model=self.llm_client.model,
+            )
+
         full_prompt = self.prompt_manager.build_full_prompt(
             user_message=request.user_message,
             resource_type=request.resource_type,
             language=language,
             cluster_context=request.cluster_context,
+            kubectl_output=kubectl_output,
         )
+        full_prompt = optimize_prompt_length(full_prompt, self.prompt_token_budget, self.llm_client.model)
+        return PromptParts(system="", prompt=full_prompt)
+
+    def compress_evidence(self, kubectl_output: Optional[str]) -> Optional[str]:
+        """Замаскувати секрети і стиснути kubectl вивід до частки evidence у бюджеті промпта"""
+        if not kubectl_output:
+            return kubectl_output
 
-        logger.debug(f"Згенерований промпт (довжина: {len(full_prompt)} chars)")
+        if settings.REDACT_EVIDENCE:
+            kubectl_output = get_redactor().redact(kubectl_output)
 
-        # 3. Відправити до LLM
+        max_tokens = int(self.prompt_token_budget * SECTION_POLICY[KUBECTL_EVIDENCE]["max_share"])
+        compressed = output_compressor.compress(kubectl_output, max_tokens, self.llm_client.model)
+        logger.info(f"kubectl вивід: {len(kubectl_output)} -> {len(compressed)} chars")
+        return compressed
+
+    def validate(self, request: DiagnosticRequest) -> None:
+        """
+        PROMPT_VALIDATION: питання користувача - повна перевірка, kubectl
+        evidence - лише injection (деструктивні команди в events/логах нормальні)
+
+        Raises:
+            ValidationError: промпт відхилено
+        """
+        if not settings.PROMPT_VALIDATION:
+            return
+
+        # Питання про `kubectl delete` - не дія, тому allow_destructive
+        is_valid, error = validator.validate_prompt(request.user_message, allow_destructive=True)
+        if not is_valid:
+            raise ValidationError(error)
+
+        if request.kubectl_output:
+            scan = validator.scan(request.kubectl_output)
+            if scan.injection:
+                raise ValidationError(f"Potential injection attack detected in kubectl output: {scan.injection[0]}")
+
+        logger.debug(f"Рівень безпеки запиту: {validator.classify_security_level(request.user_message).value}")
+
+    async def collect_evidence(self, request: DiagnosticRequest, language: Language) -> DiagnosticRequest:
+        """kubectl evidence для resource_name; поки kubectl працює, LLM робить prefill"""
+        if request.kubectl_output is not None or not request.resource_name:
+            return request
+
+        if settings.SPECULATIVE_PREFILL and settings.PROMPT_STABLE_PREFIX:
+            # Статичний префікс відомий одразу - не чекати на kubectl
+            self.start_prefill(self.prompt_manager.get_static_prefix(request.resource_type, language))
+
+        output = await self.evidence.collect(
+            request.resource_type,
+            request.resource_name,
+            request.namespace,
+        )
+        return replace(request, kubectl_output=output)
+
+    def start_prefill(self, system_prompt: str) -> None:
+        """
+        Фоновий prefill system prompt (один на префікс одночасно)
+
+        Prefill - теж генерація, тож займає слот admission; лише вільний:
+        під навантаженням prefill пропускається, а не стає в чергу
+        """
+        prefix_id = make_prefix_id(system_prompt)
+        if prefix_id in self._prefills:
+            return
+        if not self.admission.try_acquire():
+            logger.debug("Prefill пропущено: немає вільного слоту LLM")
+            return
+
+        task = asyncio.create_task(self._prefill(system_prompt))
+        self._prefills[prefix_id] = task
+        task.add_done_callback(lambda _: self._prefills.pop(prefix_id, None))
+
+    async def _prefill(self, system_prompt: str) -> bool:
+        """Prefill у слоті, отриманому try_acquire"""
         try:
-            response = self.llm_client.generate(
-                prompt=full_prompt,
-                temperature=0.7,
-                max_tokens=2000,
-            )
+            return await self.llm_client.prefill(system_prompt, prompt_budget=self.prompt_token_budget)
+        finally:
+            self.admission.release()
+
+    async def _generate(
+        self,
+        parts: PromptParts,
+        options: Dict[str, Any],
+        cache_key: str,
+        priority: RequestPriority,
+    ) -> LLMResponse:
+        """Один виклик LLM (через admission чергу) + запис у кеш"""
+        try:
+            async with self.admission.admit(priority):
+                response = await self.llm_client.generate(
+                    prompt=parts.prompt,
+                    system_prompt=parts.system or None,
+                    temperature=options["temperature"],
+                    max_tokens=options["max_tokens"],
+                    prompt_budget=self.prompt_token_budget,
+                )
 
             logger.info(
                 f"LLM відповів за {response.generation_time:.2f}s, "
                 f"згенеровано {response.tokens_generated} токенів",
             )
 
+            if settings.ENABLE_CACHE and response.text:
+                self.cache.set(cache_key, response, len(response.text.encode("utf-8")))
+
             return response
 
-        except Exception as e:  # pragma: no cover - логування помилок
+        except Exception as e:
             logger.error(f"Помилка LLM генерації: {e}")
             raise
 
-    def chat(
+    async def chat(
         self,
         messages: List[Dict[str, str]],
         language: Language = Language.UKRAINIAN,
@@ -88,13 +247,23 @@ class PromptOrchestrator:
             include_cloud=True,
         )
 
+        # Найстаріші повідомлення відкидаються, якщо історія не влазить у context window
+        history = fit_messages(
+            system_prompt,
+            messages,
+            self.prompt_token_budget,
+            get_token_counter(self.llm_client.model),
+        )
+        if len(history) < len(messages):
+            logger.info(f"Chat history скорочено: {len(messages)} -> {len(history)} повідомлень")
+
         messages_with_system: List[Dict[str, str]] = [
             {"role": "system", "content": system_prompt},
-        ] + messages
+        ] + history
 
-        return self.llm_client.chat(messages_with_system)
+        return await self.llm_client.chat(messages_with_system)
     
-    def diagnose_stream(self, request: DiagnosticRequest):
+    async def diagnose_stream(self, request: DiagnosticRequest) -> AsyncIterator[str]:
         """
         Streaming діагностика
         
@@ -111,31 +280,54 @@ class PromptOrchestrator:
             language = detected
             logger.info(f"Визначена мова: {detected.value}")
         
-        # 2. Згенерувати промпт
-        full_prompt = self.prompt_manager.build_full_prompt(
-            user_message=request.user_message,
-            resource_type=request.resource_type,
-            language=language,
-            cluster_context=request.cluster_context,
+        # 2. Зібрати kubectl evidence (паралельно з prefill) і згенерувати промпт
+        request = await self.collect_evidence(request, language)
+        self.validate(request)
+        parts = self.build_prompt(request, language)
+        
+        logger.debug(
+            f"Згенерований промпт (system: {len(parts.system)}, prompt: {len(parts.prompt)} chars)",
         )
         
-        logger.debug(f"Згенерований промпт (довжина: {len(full_prompt)} chars)")
+        # 3. Відправити до LLM з streaming (однакові streams ділять одну генерацію)
+        options = {"temperature": 0.7, "max_tokens": settings.LLM_MAX_TOKENS}
+        stream_key = make_cache_key(parts.prompt, self.llm_client.model, options, parts.system, parts.prefix_id)
+        
+        # Streaming - інтерактивний запит, йде перед batch
+        priority = priority_for(request.severity, interactive=True)
         
-        # 3. Відправити до LLM з streaming
         try:
-            stream = self.llm_client.generate(
-                prompt=full_prompt,
-                temperature=0.7,
-                max_tokens=2000,
-                stream=True
+            stream = self.singleflight.stream(
+                stream_key,
+                lambda: self._generate_stream(parts, options, priority),
             )
             
-            for chunk in stream:
+            async for chunk in stream:
                 yield chunk
         
         except Exception as e:
             logger.error(f"Помилка LLM streaming: {e}")
             raise
+    
+    async def _generate_stream(
+        self,
+        parts: PromptParts,
+        options: Dict[str, Any],
+        priority: RequestPriority,
+    ) -> AsyncIterator[str]:
+        """Upstream stream токенів від LLM (слот admission тримається до кінця)"""
+        async with self.admission.admit(priority):
+            stream = await self.llm_client.generate(
+                prompt=parts.prompt,
+                system_prompt=parts.system or None,
+                temperature=options["temperature"],
+                max_tokens=options["max_tokens"],
+                stream=True,
+                prompt_budget=self.prompt_token_budget,
+            )
+            
+            async for chunk in stream:
+                yield chunk
 
 
 # Global instance
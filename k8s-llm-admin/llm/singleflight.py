@@ -0,0 +1,127 @@
+"""
+Single-flight: об'єднання однакових запитів, що виконуються одночасно
+Під час інциденту кілька інженерів питають те саме - генерація одна на всіх
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import logger
+
+
+class StreamBroadcast:
+    """Один upstream stream токенів -> багато підписників
+
+    Всі токени буферизуються, тому підписник, що приєднався пізніше,
+    спочатку отримує вже згенеровані токени, а потім - нові.
+    """
+
+    def __init__(self, source: AsyncIterator[str], on_finish: Callable[[], None]):
+        self._source = source
+        self._on_finish = on_finish
+        self._chunks: List[str] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Condition()
+        self._subscribers = 0
+        self._finished = False
+        self._task = asyncio.create_task(self._pump())
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    async def _pump(self) -> None:
+        try:
+            async for chunk in self._source:
+                async with self._changed:
+                    self._chunks.append(chunk)
+                    self._changed.notify_all()
+        except asyncio.CancelledError:
+            # Пізній підписник отримує звичайну помилку, а не CancelledError,
+            # яку його власний task сприйняв би як скасування
+            self._error = RuntimeError("stream abandoned")
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._finish()
+            async with self._changed:
+                self._changed.notify_all()
+
+    def _finish(self) -> None:
+        if not self._finished:
+            self._finished = True
+            self._on_finish()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Підписка: replay буфера, потім live токени"""
+        self._subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with self._changed:
+                    while position >= len(self._chunks) and not self._done:
+                        await self._changed.wait()
+                    pending = self._chunks[position:]
+                    finished = self._done
+
+                for chunk in pending:
+                    yield chunk
+                position += len(pending)
+
+                if finished and position >= len(self._chunks):
+                    if self._error is not None:
+                        raise self._error
+                    return
+        finally:
+            self._subscribers -= 1
+            if self._subscribers == 0 and not self._done:
+                # Ніхто більше не слухає - не витрачати GPU/CPU на Ollama.
+                # Ключ звільняється одразу, щоб новий запит не приєднався
+                # до stream, що вже скасовується
+                self._finish()
+                self._task.cancel()
+
+
+class SingleFlight:
+    """Групування in-flight запитів за ключем (hash промпта)"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, StreamBroadcast] = {}
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Виконати fn один раз для всіх одночасних викликів з тим самим key"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.info(f"Запит приєднано до вже запущеної генерації ({key[:12]})")
+
+        # shield: скасування одного клієнта не зупиняє генерацію для інших
+        return await asyncio.shield(task)
+
+    def stream(self, key: str, fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Підписатися на спільний stream токенів для key"""
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = StreamBroadcast(fn(), on_finish=lambda: self._streams.pop(key, None))
+            self._streams[key] = broadcast
+        else:
+            self.coalesced += 1
+            logger.info(f"Stream приєднано до вже запущеної генерації ({key[:12]})")
+
+        return broadcast.subscribe()
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": self.in_flight, "coalesced": self.coalesced}
@@ -0,0 +1,158 @@
+"""
+Прогрів моделей та keep_alive
+Preload моделей на старті, фоновий keeper, що повертає вивантажені моделі,
+та статистика cold loads (load_duration у відповідях Ollama)
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from utils.logger import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from llm.backends import OllamaBackend
+    from llm.ollama_client import OllamaClient
+
+
+class ColdLoadStats:
+    """Скільки разів користувачі платили за завантаження моделі"""
+
+    def __init__(self, threshold_seconds: float = 1.0):
+        self.threshold_seconds = threshold_seconds
+        self.by_model: Dict[str, Dict[str, Any]] = {}
+        self._detected: Optional[asyncio.Event] = None
+
+    @property
+    def detected(self) -> asyncio.Event:
+        if self._detected is None:
+            self._detected = asyncio.Event()
+        return self._detected
+
+    def record(self, model: str, backend: str, load_seconds: float) -> bool:
+        """Зафіксувати load_duration; True якщо це cold load"""
+        if load_seconds < self.threshold_seconds:
+            return False
+
+        stats = self.by_model.setdefault(
+            model,
+            {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_backend": None, "last_at": None},
+        )
+        stats["count"] += 1
+        stats["total_seconds"] += load_seconds
+        stats["max_seconds"] = max(stats["max_seconds"], load_seconds)
+        stats["last_backend"] = backend
+        stats["last_at"] = time.time()
+
+        logger.warning(f"Cold load моделі {model} на {backend}: {load_seconds:.1f}s")
+        self.detected.set()
+        return True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            model: {
+                **stats,
+                "total_seconds": round(stats["total_seconds"], 3),
+                "max_seconds": round(stats["max_seconds"], 3),
+                "avg_seconds": round(stats["total_seconds"] / stats["count"], 3),
+            }
+            for model, stats in self.by_model.items()
+        }
+
+
+class ModelWarmer:
+    """Тримає потрібні моделі завантаженими на всіх backends"""
+
+    def __init__(self, client: "OllamaClient", models: List[str], interval: float = 60.0):
+        self.client = client
+        self.models = models
+        self.interval = interval
+        self.warmups = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def warm(self, backend: "OllamaBackend", model: str) -> Optional[float]:
+        """Завантажити модель (порожній prompt) і повернути load_duration"""
+        try:
+            load_seconds = await self.client.warm_up(model, backend)
+            self.warmups += 1
+            logger.info(f"Модель {model} прогріта на {backend.name} ({load_seconds:.1f}s)")
+            return load_seconds
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Не вдалося прогріти {model} на {backend.name}: {e}")
+            return None
+
+    async def warm_all(self) -> None:
+        """Preload усіх моделей на всіх здорових backends"""
+        await asyncio.gather(*(
+            self.warm(backend, model)
+            for backend in self.client.pool.backends if backend.healthy
+            for model in self.models
+        ))
+
+    async def ensure_loaded(self) -> None:
+        """Прогріти моделі, яких немає в /api/ps відповідного backend"""
+        await self.client.pool.probe_all()
+        await asyncio.gather(*(
+            self.warm(backend, model)
+            for backend in self.client.pool.backends if backend.healthy
+            for model in self.models if model not in backend.loaded_models
+        ))
+
+    async def _keeper_loop(self) -> None:
+        detected = self.client.cold_loads.detected
+        while True:
+            try:
+                # Прокинутись по таймеру або одразу після cold load
+                await asyncio.wait_for(detected.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            detected.clear()
+
+            try:
+                await self.ensure_loaded()
+            except Exception as e:  # pragma: no cover - keeper не має падати
+                logger.error(f"Помилка model keeper: {e}")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._keeper_loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": self.models,
+            "warmups": self.warmups,
+            "failures": self.failures,
+            "cold_loads": self.client.cold_loads.as_dict(),
+        }
+
+
+# Global warmer instance
+_model_warmer: Optional[ModelWarmer] = None
+
+
+def get_model_warmer() -> ModelWarmer:
+    """Get global model warmer (моделі з OLLAMA_WARMUP_MODELS)"""
+    global _model_warmer
+
+    if _model_warmer is None:
+        from config.settings import settings
+        from llm.ollama_client import get_ollama_client
+
+        _model_warmer = ModelWarmer(
+            get_ollama_client(),
+            models=settings.warmup_models,
+            interval=settings.OLLAMA_KEEPER_INTERVAL,
+        )
+
+    return _model_warmer
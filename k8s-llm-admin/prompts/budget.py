@@ -0,0 +1,269 @@
+"""
+Розподіл token budget між секціями промпта
+Кожна секція має пріоритет та min/max частку бюджету; бюджет заповнюється
+жадібно, а зайве відкидається цілими одиницями (рядки логів, events, приклади)
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from prompts.tokenizer import TokenCounter, get_token_counter
+
+# Назви секцій
+SYSTEM = "system"
+SPECIALIZED = "specialized"
+FEW_SHOT = "few_shot"
+CLUSTER_CONTEXT = "cluster_context"
+KUBECTL_EVIDENCE = "kubectl_evidence"
+CONVERSATION_HISTORY = "conversation_history"
+USER_MESSAGE = "user_message"
+
+# Політика за замовчуванням (менший priority - важливіше)
+SECTION_POLICY: Dict[str, Dict] = {
+    SYSTEM: {"priority": 0, "required": True, "static": True},
+    USER_MESSAGE: {"priority": 0, "required": True},
+    SPECIALIZED: {"priority": 1, "min_share": 0.1, "static": True},
+    CLUSTER_CONTEXT: {"priority": 2, "max_share": 0.05},
+    KUBECTL_EVIDENCE: {"priority": 3, "min_share": 0.15, "max_share": 0.6, "keep": "both"},
+    CONVERSATION_HISTORY: {"priority": 4, "max_share": 0.3, "keep": "tail"},
+    FEW_SHOT: {"priority": 5, "max_share": 0.2, "static": True},
+}
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def split_lines(text: str) -> List[str]:
+    return [line for line in text.splitlines() if line.strip()]
+
+
+def split_paragraphs(text: str) -> List[str]:
+    return [p.strip("\n") for p in _PARAGRAPH_RE.split(text) if p.strip()]
+
+
+@dataclass
+class PromptSection:
+    """Секція промпта з одиниць, які можна відкидати по одній"""
+
+    name: str
+    units: List[str]
+    priority: int = 5
+    min_share: float = 0.0
+    max_share: float = 1.0
+    required: bool = False
+    keep: str = "head"  # head | tail | both - які одиниці важливіші
+    header: str = ""
+    footer: str = ""
+    separator: str = "\n"
+    static: bool = False  # Текст не змінюється між запитами - підрахунок мемоізується
+
+    @classmethod
+    def build(cls, name: str, units: List[str], **overrides) -> "PromptSection":
+        """Секція з політикою SECTION_POLICY[name] + overrides"""
+        options = {**SECTION_POLICY.get(name, {}), **overrides}
+        return cls(name=name, units=units, **options)
+
+    def order(self) -> List[int]:
+        """Порядок, у якому одиниці потрапляють у бюджет"""
+        indices = list(range(len(self.units)))
+        if self.keep == "tail":
+            return indices[::-1]
+        if self.keep == "both":
+            # Початок і кінець (запуск та останні помилки) важливіші за середину
+            result = []
+            low, high = 0, len(indices) - 1
+            while low <= high:
+                result.append(low)
+                if high != low:
+                    result.append(high)
+                low += 1
+                high -= 1
+            return result
+        return indices
+
+
+@dataclass
+class Allocation:
+    """Результат розподілу бюджету"""
+
+    sections: List[PromptSection]
+    texts: List[str]
+    tokens: List[int]
+    selected: List[List[int]]
+    budget: int
+
+    @property
+    def used(self) -> int:
+        return sum(self.tokens)
+
+    def dropped(self, name: str) -> int:
+        for section, selected in zip(self.sections, self.selected):
+            if section.name == name:
+                return len(section.units) - len(selected)
+        return 0
+
+    def text(self, name: str) -> str:
+        return next((t for s, t in zip(self.sections, self.texts) if s.name == name), "")
+
+    def render(self, separator: str = "\n\n") -> str:
+        return separator.join(text for text in self.texts if text)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            section.name: {
+                "tokens": tokens,
+                "units": len(selected),
+                "dropped": len(section.units) - len(selected),
+            }
+            for section, tokens, selected in zip(self.sections, self.tokens, self.selected)
+        }
+
+
+class PromptBudget:
+    """Жадібний розподіл token budget між секціями"""
+
+    def __init__(self, budget: int, counter: Optional[TokenCounter] = None):
+        self.budget = budget
+        self.counter = counter or get_token_counter()
+
+    def _cost(self, section: PromptSection, text: str) -> int:
+        count = self.counter.count_static(text) if section.static else self.counter.count(text)
+        return count + 1  # + separator
+
+    def allocate(self, sections: List[PromptSection]) -> Allocation:
+        costs = [[self._cost(s, u) for u in s.units] for s in sections]
+        # Header/footer оплачуються разом з першою одиницею секції
+        header_costs = [
+            (self._cost(s, s.header) if s.header else 0) + (self._cost(s, s.footer) if s.footer else 0)
+            for s in sections
+        ]
+        selected: List[List[int]] = [[] for _ in sections]
+        used = [0] * len(sections)
+        units = [list(s.units) for s in sections]
+        reserved: Dict[int, int] = {}
+
+        def take(i: int, limit: float) -> None:
+            """Додавати одиниці секції i, поки вкладаємось у limit токенів секції"""
+            nonlocal remaining
+            section = sections[i]
+            if i not in reserved and sum(costs[i]) + header_costs[i] > min(limit, used[i] + remaining):
+                # Секція не влізе цілком - місце під маркер пропуску
+                reserved[i] = self._cost(section, self._marker(len(units[i]), len(units[i])))
+                remaining -= reserved[i]
+            chosen = set(selected[i])
+            for index in section.order():
+                if index in chosen:
+                    continue
+                cost = costs[i][index] + (header_costs[i] if not selected[i] else 0)
+                if cost > remaining or used[i] + cost > limit:
+                    continue  # Менші одиниці далі ще можуть поміститись
+                selected[i].append(index)
+                chosen.add(index)
+                used[i] += cost
+                remaining -= cost
+
+        # Розділювачі між секціями
+        remaining = self.budget - 2 * len(sections)
+        by_priority = sorted(range(len(sections)), key=lambda i: sections[i].priority)
+
+        # 1. Обов'язкові секції цілком (якщо не влазять - обрізаються токенами)
+        for i in by_priority:
+            if sections[i].required:
+                take(i, float("inf"))
+                missing = [j for j in range(len(units[i])) if j not in selected[i]]
+                for j in missing:
+                    cut = self.counter.truncate(units[i][j], max(remaining - 1 - header_costs[i], 0))
+                    if not cut:
+                        continue
+                    units[i][j] = cut
+                    cost = self.counter.count(cut) + 1 + (header_costs[i] if not selected[i] else 0)
+                    selected[i].append(j)
+                    used[i] += cost
+                    remaining -= cost
+
+        # 2. Гарантований мінімум, 3. жадібно до max_share - за пріоритетом
+        for share in ("min_share", "max_share"):
+            for i in by_priority:
+                if not sections[i].required:
+                    take(i, getattr(sections[i], share) * self.budget)
+
+        # 4. Залишок бюджету, який ніхто не використав, - понад max_share
+        for i in by_priority:
+            if not sections[i].required:
+                take(i, float("inf"))
+
+        texts: List[str] = []
+        for i, section in enumerate(sections):
+            if not selected[i]:
+                texts.append("")
+                continue
+
+            chosen = sorted(selected[i])
+            parts = [units[i][j] for j in chosen]
+            remaining += reserved.get(i, 0)
+            if len(chosen) < len(units[i]):
+                # Маркер пропуску, якщо на нього лишилось місце
+                marker = self._marker(len(units[i]) - len(chosen), len(units[i]))
+                marker_cost = self._cost(section, marker)
+                if marker_cost <= remaining:
+                    gap = next((n for n, j in enumerate(chosen) if j != n), len(chosen))
+                    parts.insert(gap, marker)
+                    used[i] += marker_cost
+                    remaining -= marker_cost
+
+            texts.append(section.separator.join(
+                part for part in (section.header, *parts, section.footer) if part
+            ))
+
+        return Allocation(sections, texts, used, [sorted(s) for s in selected], self.budget)
+
+    def fit(self, sections: List[PromptSection], separator: str = "\n\n", rounds: int = 4) -> Allocation:
+        """allocate() + уточнення: сума по одиницях завищена, тож невикористаний
+        залишок (за підрахунком готового тексту) роздається ще раз"""
+        allocation = self.allocate(sections)
+        inflated = self.budget
+        slack = self.budget - self.counter.count(allocation.render(separator))
+
+        for _ in range(rounds):
+            dropped = any(len(s.units) > len(sel) for s, sel in zip(sections, allocation.selected))
+            if not dropped or slack < max(8, self.budget // 50):
+                break
+
+            candidate = PromptBudget(inflated + slack, self.counter).allocate(sections)
+            actual = self.counter.count(candidate.render(separator))
+            if actual > self.budget:
+                # Велика одиниця не влізла б - спробувати менший крок
+                slack //= 2
+                continue
+            allocation, inflated = candidate, inflated + slack
+            slack = self.budget - actual
+
+        allocation.budget = self.budget
+        return allocation
+
+    @staticmethod
+    def _marker(dropped: int, total: int) -> str:
+        return f"[... пропущено {dropped} з {total} ...]"
+
+
+def fit_messages(
+    system_prompt: str,
+    messages: List[Dict[str, str]],
+    budget: int,
+    counter: Optional[TokenCounter] = None,
+) -> List[Dict[str, str]]:
+    """Chat history у бюджет: найстаріші повідомлення відкидаються першими,
+    останнє (поточне питання) лишається завжди"""
+    if not messages:
+        return []
+
+    history, current = messages[:-1], messages[-1]
+    # Кожне повідомлення - ще кілька токенів role header у chat template
+    sections = [
+        PromptSection.build(SYSTEM, [system_prompt]),
+        PromptSection.build(CONVERSATION_HISTORY, [m["content"] for m in history]),
+        PromptSection.build(USER_MESSAGE, [current["content"]]),
+    ]
+    allocation = PromptBudget(budget - 4 * (len(messages) + 1), counter).allocate(sections)
+
+    return [history[i] for i in allocation.selected[1]] + [current]
@@ -0,0 +1,256 @@
+"""
+Стиснення kubectl виводу перед промптом
+ANSI коди та timestamps прибираються, повтори згортаються з лічильником,
+stack traces - до верхніх frames; якщо результат не влазить у token budget,
+лишаються рядки навколо помилок, ключові поля describe, початок і кінець
+"""
+
+import re
+from typing import List, Optional, Set
+
+from prompts.tokenizer import TokenCounter, get_token_counter
+from utils.logger import logger
+
+ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)")
+
+_ISO_TS = r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"
+# Timestamp на початку рядка: RFC3339 (kubectl logs --timestamps), logfmt, syslog
+TIMESTAMP_RE = re.compile(
+    rf"^(?:\[{_ISO_TS}\]|{_ISO_TS}|(?:ts|time)=\"?{_ISO_TS}\"?|[A-Z][a-z]{{2}} [ \d]\d \d{{2}}:\d{{2}}:\d{{2}})\s+"
+)
+# klog: "E0501 10:00:00.123456    1 file.go:12] ..." -> "E file.go:12] ..."
+KLOG_RE = re.compile(r"^([IWEF])\d{4} \d{2}:\d{2}:\d{2}\.\d+\s+(?:\d+\s+)?")
+
+# Змінні частини рядка (для пошуку повторів)
+VARIABLE_RE = re.compile(r"0x[0-9a-f]+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+", re.I)
+
+ERROR_RE = re.compile(
+    r"^[EF] |level=(?:error|fatal)|\b(?:error|err|fail(?:ed|ure)?|fatal|panic|exception|traceback|"
+    r"killed|oomkilled|crashloopbackoff|backoff|refused|denied|forbidden|unauthorized|"
+    r"timeout|timed out|unhealthy|evicted|warning)\b",
+    re.I,
+)
+# Заголовки EvidenceCollector та ключові поля kubectl describe
+STRUCTURE_RE = re.compile(
+    r"^\$ |^\s*(?:Status|State|Last State|Reason|Exit Code|Restart Count|Message|Events):"
+)
+
+FRAME_RE = re.compile(
+    r"^\s+at [\w$.<>/@-]+[(\s]"                         # Java / Node.js
+    r"|^\s+File \".*\", line \d+"                        # Python
+    r"|^\t.+\.go:\d+"                                    # Go (file:line)
+    r"|^\s*\.\.\. \d+ (?:more|common frames omitted)"    # Java
+)
+GO_FUNC_RE = re.compile(r"^(?:created by )?[\w./*()\[\]-]+\(.*\)(?: in goroutine \d+)?$")
+
+
+class OutputCompressor:
+    """Стиснення логів / kubectl виводу зі збереженням діагностичного сигналу"""
+
+    def __init__(
+        self,
+        max_frames: int = 3,
+        context_lines: int = 2,
+        max_period: int = 4,
+        max_line_chars: int = 400,
+    ):
+        self.max_frames = max_frames
+        self.context_lines = context_lines
+        self.max_period = max_period
+        self.max_line_chars = max_line_chars
+
+    def compress(self, text: str, max_tokens: Optional[int] = None, model: Optional[str] = None) -> str:
+        """
+        Стиснути вивід
+
+        Args:
+            text: Сирий kubectl вивід (describe, events, logs)
+            max_tokens: Token budget результату (None - тільки згортання без відкидання)
+            model: Модель, чиїм tokenizer рахувати токени
+
+        Returns:
+            Стиснутий текст
+        """
+        if not text:
+            return ""
+
+        lines = [self._clean(line) for line in ANSI_RE.sub("", text).splitlines()]
+        lines = [line for line in lines if line.strip()]
+        lines = self._collapse_repeats(self._fold_stack_traces(lines))
+
+        if max_tokens is not None:
+            lines = self._fit(lines, max_tokens, get_token_counter(model))
+
+        result = "\n".join(lines)
+        logger.debug(f"kubectl вивід стиснуто: {len(text)} -> {len(result)} chars")
+        return result
+
+    def _clean(self, line: str) -> str:
+        line = KLOG_RE.sub(r"\1 ", TIMESTAMP_RE.sub("", line.rstrip()))
+        if len(line) > self.max_line_chars:
+            line = f"{line[:self.max_line_chars]}... [+{len(line) - self.max_line_chars} chars]"
+        return line
+
+    @staticmethod
+    def _mask(line: str) -> str:
+        return VARIABLE_RE.sub("#", line)
+
+    # ------------------------------------------------------------------
+    # Stack traces
+    # ------------------------------------------------------------------
+
+    def _frames_at(self, lines: List[str], start: int) -> List[List[str]]:
+        """Frames stack trace, що починається з рядка start (порожній список - не trace)"""
+        frames: List[List[str]] = []
+        i = start
+        while i < len(lines):
+            line = lines[i]
+            if FRAME_RE.match(line):
+                frame = [line]
+                indent = len(line) - len(line.lstrip())
+                i += 1
+                # Python: рядок коду під 'File "...", line N'
+                while (
+                    i < len(lines)
+                    and len(lines[i]) - len(lines[i].lstrip()) > indent
+                    and not FRAME_RE.match(lines[i])
+                ):
+                    frame.append(lines[i])
+                    i += 1
+            elif GO_FUNC_RE.match(line) and i + 1 < len(lines) and lines[i + 1].startswith("\t"):
+                frame = [line, lines[i + 1]]
+                i += 2
+            else:
+                break
+            frames.append(frame)
+        return frames
+
+    def _fold_stack_traces(self, lines: List[str]) -> List[str]:
+        result: List[str] = []
+        i = 0
+        while i < len(lines):
+            frames = self._frames_at(lines, i)
+            if not frames:
+                result.append(lines[i])
+                i += 1
+                continue
+
+            i += sum(len(frame) for frame in frames)
+            if len(frames) <= self.max_frames:
+                result.extend(line for frame in frames for line in frame)
+                continue
+
+            marker = f"    [... ще {len(frames) - self.max_frames} frames]"
+            if frames[0][0].lstrip().startswith("File "):
+                # Python: "most recent call last" - найближчі до помилки frames в кінці
+                result.append(marker)
+                result.extend(line for frame in frames[-self.max_frames:] for line in frame)
+            else:
+                result.extend(line for frame in frames[:self.max_frames] for line in frame)
+                result.append(marker)
+        return result
+
+    # ------------------------------------------------------------------
+    # Повтори
+    # ------------------------------------------------------------------
+
+    def _collapse_repeats(self, lines: List[str]) -> List[str]:
+        """Послідовні повтори рядка або блоку до max_period рядків (з точністю до чисел/id)"""
+        # Frames stack trace порівнюються точно: method1/method2 - різні frames
+        keys = [line if FRAME_RE.match(line) else self._mask(line) for line in lines]
+        result: List[str] = []
+        i = 0
+        while i < len(lines):
+            best_period, best_repeats = 1, 1
+            for period in range(1, self.max_period + 1):
+                block = keys[i:i + period]
+                if len(block) < period:
+                    break
+                repeats = 1
+                while keys[i + repeats * period:i + (repeats + 1) * period] == block:
+                    repeats += 1
+                if repeats > 1 and repeats * period > best_repeats * best_period:
+                    best_period, best_repeats = period, repeats
+
+            if best_repeats == 1:
+                result.append(lines[i])
+                i += 1
+                continue
+
+            if best_period == 1:
+                result.append(f"{lines[i]} [×{best_repeats}]")
+            else:
+                result.extend(lines[i:i + best_period])
+                result.append(f"[... {best_period} рядки вище повторено ×{best_repeats}]")
+            i += best_period * best_repeats
+        return result
+
+    # ------------------------------------------------------------------
+    # Token budget
+    # ------------------------------------------------------------------
+
+    def _candidates(self, lines: List[str]) -> List[int]:
+        """Порядок, у якому рядки потрапляють у бюджет"""
+        order = [i for i, line in enumerate(lines) if STRUCTURE_RE.match(line)]
+
+        # Найсвіжіші помилки важливіші; сусідні рядки - від найближчого
+        for i in reversed([i for i, line in enumerate(lines) if ERROR_RE.search(line)]):
+            order.append(i)
+            for distance in range(1, self.context_lines + 1):
+                order.extend(j for j in (i - distance, i + distance) if 0 <= j < len(lines))
+
+        # Далі - початок і кінець виводу
+        low, high = 0, len(lines) - 1
+        while low <= high:
+            order.append(low)
+            if high != low:
+                order.append(high)
+            low += 1
+            high -= 1
+        return order
+
+    def _fit(self, lines: List[str], max_tokens: int, counter: TokenCounter) -> List[str]:
+        costs = [counter.count(line) + 1 for line in lines]
+        if sum(costs) <= max_tokens:
+            return lines
+
+        marker_cost = counter.count(self._gap_marker(len(lines))) + 1
+        kept: Set[int] = set()
+        remaining = max_tokens
+
+        for i in self._candidates(lines):
+            if i in kept:
+                continue
+            # Зміна кількості пропусків: рядок між двома пропусками додає ще один маркер
+            left_dropped = i > 0 and i - 1 not in kept
+            right_dropped = i < len(lines) - 1 and i + 1 not in kept
+            gaps_delta = (left_dropped and right_dropped) - (not left_dropped and not right_dropped)
+            if not kept:
+                gaps_delta = int(i > 0) + int(i < len(lines) - 1)
+            cost = costs[i] + gaps_delta * marker_cost
+            if cost > remaining:
+                continue
+            kept.add(i)
+            remaining -= cost
+
+        result: List[str] = []
+        dropped = 0
+        for i, line in enumerate(lines):
+            if i not in kept:
+                dropped += 1
+                continue
+            if dropped:
+                result.append(self._gap_marker(dropped))
+                dropped = 0
+            result.append(line)
+        if dropped and kept:
+            result.append(self._gap_marker(dropped))
+        return result
+
+    @staticmethod
+    def _gap_marker(dropped: int) -> str:
+        return f"[... пропущено {dropped} рядків ...]"
+
+
+# Global instance
+output_compressor = OutputCompressor()
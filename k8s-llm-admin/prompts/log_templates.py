@@ -0,0 +1,190 @@
+"""
+Online mining шаблонів логів (Drain)
+Рядки кластеризуються за один прохід у шаблони з <*> на місці змінних;
+пам'ять обмежена max_clusters (LRU), тож 10k рядків логів стають кількома
+десятками шаблонів з лічильниками
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from prompts.compression import ANSI_RE, ERROR_RE, TIMESTAMP_RE
+
+WILDCARD = "<*>"
+_DIGIT_RE = re.compile(r"\d")
+
+
+@dataclass
+class LogTemplate:
+    """Кластер рядків з одним шаблоном"""
+
+    id: int
+    tokens: List[str]
+    count: int = 0
+    first_line: int = 0
+    last_line: int = 0
+    first_time: Optional[str] = None
+    last_time: Optional[str] = None
+    # Позиція <*> -> кілька прикладів значень
+    examples: Dict[int, List[str]] = field(default_factory=dict)
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    @property
+    def is_error(self) -> bool:
+        return bool(ERROR_RE.search(self.template))
+
+
+class LogTemplateMiner:
+    """
+    Drain: дерево фіксованої глибини (кількість токенів -> перші токени)
+    веде до невеликого списку кластерів, серед яких шукається найсхожіший
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        similarity: float = 0.4,
+        max_children: int = 100,
+        max_clusters: int = 1000,
+        max_examples: int = 3,
+    ):
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.max_examples = max_examples
+
+        self.lines = 0
+        self.evicted_lines = 0
+        self._tree: Dict = {}
+        # LRU: найдавніше оновлений кластер витісняється першим
+        self._clusters: "OrderedDict[int, LogTemplate]" = OrderedDict()
+        self._next_id = 0
+
+    def add(self, line: str) -> Optional[LogTemplate]:
+        """Додати рядок; повертає його кластер (None для порожнього рядка)"""
+        line = ANSI_RE.sub("", line).strip()
+        timestamp = TIMESTAMP_RE.match(line)
+        if timestamp:
+            line = line[timestamp.end():]
+        tokens = line.split()
+        if not tokens:
+            return None
+
+        self.lines += 1
+        time = timestamp.group(0).strip() if timestamp else None
+        leaf = self._leaf(tokens)
+        cluster = self._best_match(leaf, tokens)
+
+        if cluster is None:
+            cluster = LogTemplate(self._next_id, list(tokens), first_line=self.lines, first_time=time)
+            self._next_id += 1
+            leaf.append(cluster.id)
+            self._clusters[cluster.id] = cluster
+            if len(self._clusters) > self.max_clusters:
+                _, evicted = self._clusters.popitem(last=False)
+                self.evicted_lines += evicted.count
+        else:
+            self._merge(cluster, tokens)
+            self._clusters.move_to_end(cluster.id)
+
+        cluster.count += 1
+        cluster.last_line = self.lines
+        cluster.last_time = time or cluster.last_time
+        return cluster
+
+    def feed(self, lines: Iterable[str]) -> "LogTemplateMiner":
+        for line in lines:
+            self.add(line)
+        return self
+
+    @property
+    def templates(self) -> List[LogTemplate]:
+        return list(self._clusters.values())
+
+    def _leaf(self, tokens: List[str]) -> List[int]:
+        """Список id кластерів у листі дерева для цих токенів"""
+        node = self._tree.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            # Токени з цифрами - ймовірно змінні, не розгалужувати по них
+            key = WILDCARD if _DIGIT_RE.search(token) else token
+            if key not in node and len(node) >= self.max_children:
+                key = WILDCARD
+            node = node.setdefault(key, {})
+        return node.setdefault("", [])
+
+    def _best_match(self, leaf: List[int], tokens: List[str]) -> Optional[LogTemplate]:
+        best, best_score = None, (-1.0, -1)
+        # Витіснені LRU кластери прибираються з листа ліниво
+        leaf[:] = [cluster_id for cluster_id in leaf if cluster_id in self._clusters]
+        for cluster_id in leaf:
+            cluster = self._clusters[cluster_id]
+            same = sum(1 for a, b in zip(cluster.tokens, tokens) if a == b and a != WILDCARD)
+            # При однаковій схожості - загальніший шаблон (більше <*>)
+            score = (same / len(tokens), cluster.tokens.count(WILDCARD))
+            if score > best_score:
+                best, best_score = cluster, score
+        return best if best is not None and best_score[0] >= self.similarity else None
+
+    def _merge(self, cluster: LogTemplate, tokens: List[str]) -> None:
+        for position, (current, token) in enumerate(zip(cluster.tokens, tokens)):
+            if current == token:
+                continue
+            if current != WILDCARD:
+                # Перше розходження - значення з першого рядка теж приклад
+                cluster.tokens[position] = WILDCARD
+                cluster.examples[position] = [current]
+            examples = cluster.examples.setdefault(position, [])
+            if len(examples) < self.max_examples and token not in examples:
+                examples.append(token)
+
+    def summary(self, max_templates: int = 50) -> str:
+        """
+        Компактний опис для промпта: спершу шаблони з помилками, далі за кількістю
+
+        Returns:
+            Рядки "[×N] шаблон (рядки a-b, час; <*>=приклади)"
+        """
+        errors = sorted((t for t in self._clusters.values() if t.is_error), key=lambda t: -t.last_line)
+        others = sorted((t for t in self._clusters.values() if not t.is_error), key=lambda t: -t.count)
+        templates = errors + others
+        lines = [f"Шаблони логів: {len(templates)} з {self.lines} рядків"]
+        for template in templates[:max_templates]:
+            lines.append(f"[×{template.count}] {template.template}  ({self._describe(template)})")
+
+        hidden = templates[max_templates:]
+        if hidden:
+            lines.append(f"[... ще {len(hidden)} шаблонів, {sum(t.count for t in hidden)} рядків]")
+        if self.evicted_lines:
+            lines.append(f"[... {self.evicted_lines} рядків у витіснених рідкісних шаблонах]")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _describe(template: LogTemplate) -> str:
+        parts = [
+            f"рядок {template.first_line}" if template.count == 1
+            else f"рядки {template.first_line}-{template.last_line}"
+        ]
+        if template.first_time:
+            parts.append(
+                template.first_time if template.last_time == template.first_time
+                else f"{template.first_time} - {template.last_time}"
+            )
+        if template.examples:
+            parts.append("; ".join(
+                f"{WILDCARD}={','.join(values)}"
+                for position, values in sorted(template.examples.items())
+                if template.tokens[position] == WILDCARD
+            ))
+        return ", ".join(parts)
+
+
+def summarize_logs(lines: Iterable[str], max_templates: int = 50) -> str:
+    """Шаблони логів за один прохід (порожній рядок - логів немає)"""
+    miner = LogTemplateMiner().feed(lines)
+    return miner.summary(max_templates) if miner.lines else ""
@@ -4,10 +4,25 @@
 Динамічне перемикання мови + AWS EKS специфіка
 """
 
-from typing import Dict, Optional, List
+import sys
+from typing import Dict, Optional, List, Tuple
 from enum import Enum
 from dataclasses import dataclass
 
+from llm.cache import make_prefix_id
+from prompts.budget import (
+    CLUSTER_CONTEXT,
+    KUBECTL_EVIDENCE,
+    SPECIALIZED,
+    SYSTEM,
+    USER_MESSAGE,
+    PromptBudget,
+    PromptSection,
+    split_lines,
+    split_paragraphs,
+)
+from prompts.tokenizer import get_token_counter
+
 
 class Language(Enum):
     """Підтримувані мови"""
@@ -326,6 +341,31 @@ aws ec2 describe-flow-logs --filter "Name=resource-id,Values=<vpc-id>"
 # ДИНАМІЧНА МУЛЬТИМОВНА СИСТЕМА
 # ============================================================================
 
+@dataclass(frozen=True)
+class PromptParts:
+    """Промпт, розкладений від статичного до динамічного
+    
+    system - байт-у-байт однаковий для (мова, cloud, тип ресурсу), тому Ollama
+    перевикористовує KV cache цього префіксу; prompt - все, що змінюється
+    """
+    system: str
+    prompt: str
+    prefix_id: str = ""  # make_prefix_id(system) - частина cache key
+
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """Передобчислений system prompt для (мова, cloud, тип ресурсу)"""
+    language: Language
+    cloud_provider: CloudProvider
+    resource_type: Optional[str]
+    text: str  # base + cloud + спеціалізований (interned)
+    base: str  # base + cloud
+    specialized_paragraphs: Tuple[str, ...]
+    tokens: int
+    prefix_id: str
+
+
 class MultilingualPromptManager:
     """Управління багатомовними промптами"""
     
@@ -360,6 +400,61 @@ class MultilingualPromptManager:
                 Language.ENGLISH: ""  # TODO
             }
         }
+        
+        # Усі комбінації (мова, cloud, тип ресурсу) - скінченний набір,
+        # тож system prompts збираються один раз, а не на кожен запит
+        self._system_prompts: Dict[Tuple[Language, CloudProvider, bool], str] = {}
+        self._variants: Dict[Tuple[Language, CloudProvider, Optional[str]], PromptVariant] = {}
+        self._precompute_variants()
+    
+    def _compose_system_prompt(self, lang: Language, cloud_provider: CloudProvider, include_cloud: bool) -> str:
+        prompt = self.base_prompts[lang]
+        
+        if include_cloud:
+            cloud_prompt = self.cloud_prompts[cloud_provider][lang]
+            prompt = f"{prompt}\n\n{cloud_prompt}"
+        
+        return sys.intern(prompt)
+    
+    def _precompute_variants(self) -> None:
+        """Interned system prompts + token count та hash кожного варіанту"""
+        counter = get_token_counter()
+        
+        for lang in Language:
+            for cloud_provider in self.cloud_prompts:
+                for include_cloud in (True, False):
+                    self._system_prompts[(lang, cloud_provider, include_cloud)] = self._compose_system_prompt(
+                        lang, cloud_provider, include_cloud,
+                    )
+                
+                base = self._system_prompts[(lang, cloud_provider, True)].strip()
+                for resource_type in (None, *self.specialized_prompts):
+                    specialized = self.specialized_prompts[resource_type][lang] if resource_type else ""
+                    text = sys.intern(f"{base}\n\n{specialized}".strip() if specialized else base)
+                    self._variants[(lang, cloud_provider, resource_type)] = PromptVariant(
+                        language=lang,
+                        cloud_provider=cloud_provider,
+                        resource_type=resource_type,
+                        text=text,
+                        base=base,
+                        specialized_paragraphs=tuple(split_paragraphs(specialized)),
+                        tokens=counter.count_static(text),
+                        prefix_id=make_prefix_id(text),
+                    )
+    
+    def get_variant(
+        self,
+        resource_type: Optional[str] = None,
+        language: Optional[Language] = None
+    ) -> PromptVariant:
+        """Передобчислений варіант; тип без спеціалізованого промпта -> базовий"""
+        lang = language or self.language
+        if resource_type not in self.specialized_prompts:
+            resource_type = None
+        return self._variants[(lang, self.cloud_provider, resource_type)]
+    
+    def variants(self) -> List[PromptVariant]:
+        return list(self._variants.values())
     
     def get_system_prompt(
         self,
@@ -378,11 +473,9 @@ class MultilingualPromptManager:
         """
         lang = language or self.language
         
-        prompt = self.base_prompts[lang]
-        
-        if include_cloud:
-            cloud_prompt = self.cloud_prompts[self.cloud_provider][lang]
-            prompt = f"{prompt}\n\n{cloud_prompt}"
+        prompt = self._system_prompts.get((lang, self.cloud_provider, include_cloud))
+        if prompt is None:
+            prompt = self._compose_system_prompt(lang, self.cloud_provider, include_cloud)
         
         return prompt
     
@@ -404,7 +497,8 @@ class MultilingualPromptManager:
         user_message: str,
         resource_type: Optional[str] = None,
         language: Optional[Language] = None,
-        cluster_context: Optional[Dict] = None
+        cluster_context: Optional[Dict] = None,
+        kubectl_output: Optional[str] = None
     ) -> str:
         """
         Побудувати повний промпт з усіма компонентами
@@ -414,33 +508,21 @@ class MultilingualPromptManager:
             resource_type: Тип ресурсу (pod, service, node, etc.)
             language: Мова відповіді
             cluster_context: Контекст кластеру (cluster name, region, k8s_version, тощо)
+            kubectl_output: Вивід kubectl (вже стиснутий, див. prompts.compression)
         
         Returns:
             Повний промпт для LLM
         """
         lang = language or self.language
         
-        # Базовий system prompt
-        system_prompt = self.get_system_prompt(lang, include_cloud=True)
-        
-        # Спеціалізований промпт якщо є
-        if resource_type:
-            specialized = self.get_specialized_prompt(resource_type, lang)
-            if specialized:
-                system_prompt = f"{system_prompt}\n\n{specialized}"
+        # Базовий system prompt + спеціалізований промпт якщо є
+        system_prompt = self.get_static_prefix(resource_type, lang)
         
         # Контекст кластеру (опціонально)
-        cluster_info = ""
-        if cluster_context:
-            if lang == Language.UKRAINIAN:
-                cluster_info = f"""
-# Kubernetes Кластер Інформація:
-- Назва кластеру: {cluster_context.get('cluster_name', 'Unknown')}
-- AWS Region: {cluster_context.get('region', 'Unknown')}
-- Kubernetes версія: {cluster_context.get('k8s_version', 'Unknown')}
-- Node Type: {cluster_context.get('node_type', 'EC2')}
-- VPC ID: {cluster_context.get('vpc_id', 'Unknown')}
-"""
+        cluster_info = self._format_cluster_info(cluster_context, lang)
+        
+        evidence = (kubectl_output or "").strip()
+        kubectl_block = f"# Вивід kubectl:\n```\n{evidence}\n```" if evidence else ""
         
         # Фінальний промпт
         full_prompt = f"""
@@ -448,6 +530,8 @@ class MultilingualPromptManager:
 
 {cluster_info}
 
+{kubectl_block}
+
 # Запит користувача:
 {user_message}
 
@@ -456,6 +540,107 @@ class MultilingualPromptManager:
         
         return full_prompt.strip()
     
+    def get_static_prefix(
+        self,
+        resource_type: Optional[str] = None,
+        language: Optional[Language] = None
+    ) -> str:
+        """Base + cloud + спеціалізований промпт (передобчислений, не залежить від запиту)"""
+        return self.get_variant(resource_type, language).text
+    
+    def build_prompt_parts(
+        self,
+        user_message: str,
+        resource_type: Optional[str] = None,
+        language: Optional[Language] = None,
+        cluster_context: Optional[Dict] = None,
+        kubectl_output: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        model: Optional[str] = None
+    ) -> PromptParts:
+        """
+        Побудувати промпт зі стабільним префіксом
+        
+        Сегменти від найстатичнішого до найдинамічнішого: system (base, cloud,
+        спеціалізований) -> контекст кластеру -> kubectl вивід -> запит користувача.
+        
+        Args:
+            token_budget: Скільки токенів може зайняти system + prompt;
+                розподіляється між секціями через PromptBudget
+            model: Модель, чиїм tokenizer рахувати токени
+        
+        Returns:
+            PromptParts(system=..., prompt=...) для Ollama `system` + `prompt`
+        """
+        lang = language or self.language
+        variant = self.get_variant(resource_type, lang)
+        cluster_info = self._format_cluster_info(cluster_context, lang).strip()
+        instruction = "Відповідай українською мовою, структуровано, з конкретними kubectl та AWS командами."
+        evidence = (kubectl_output or "").strip()
+        
+        if token_budget is None:
+            segments = [
+                cluster_info,
+                f"# Вивід kubectl:\n```\n{evidence}\n```" if evidence else "",
+                f"# Запит користувача:\n{user_message.strip()}",
+                instruction,
+            ]
+            return PromptParts(
+                system=variant.text,
+                prompt="\n\n".join(segment for segment in segments if segment),
+                prefix_id=variant.prefix_id,
+            )
+        
+        # Секції з пріоритетами: при нестачі місця першими відкидаються
+        # рядки kubectl виводу (середина), потім абзаци спеціалізованого промпта
+        sections = [
+            PromptSection.build(SYSTEM, [variant.base]),
+            PromptSection.build(SPECIALIZED, list(variant.specialized_paragraphs), separator="\n\n"),
+            PromptSection.build(CLUSTER_CONTEXT, split_lines(cluster_info)),
+            PromptSection.build(
+                KUBECTL_EVIDENCE,
+                split_lines(evidence),
+                header="# Вивід kubectl:\n```",
+                footer="```",
+            ),
+            PromptSection.build(
+                USER_MESSAGE,
+                [f"# Запит користувача:\n{user_message.strip()}", instruction],
+                separator="\n\n",
+            ),
+        ]
+        allocation = PromptBudget(token_budget, get_token_counter(model)).fit(sections)
+        
+        if allocation.dropped(SPECIALIZED) == 0:
+            # Префікс не змінився - той самий рядок, що й для prefill/KV cache
+            system, prefix_id = variant.text, variant.prefix_id
+        else:
+            system = "\n\n".join(t for t in (allocation.text(SYSTEM), allocation.text(SPECIALIZED)) if t)
+            prefix_id = make_prefix_id(system)
+        
+        prompt = "\n\n".join(
+            text for text in (
+                allocation.text(CLUSTER_CONTEXT),
+                allocation.text(KUBECTL_EVIDENCE),
+                allocation.text(USER_MESSAGE),
+            ) if text
+        )
+        return PromptParts(system=system, prompt=prompt, prefix_id=prefix_id)
+    
+    def _format_cluster_info(self, cluster_context: Optional[Dict], lang: Language) -> str:
+        """Контекст кластеру (фіксований порядок полів)"""
+        if not cluster_context or lang != Language.UKRAINIAN:
+            return ""
+        
+        return f"""
+# Kubernetes Кластер Інформація:
+- Назва кластеру: {cluster_context.get('cluster_name', 'Unknown')}
+- AWS Region: {cluster_context.get('region', 'Unknown')}
+- Kubernetes версія: {cluster_context.get('k8s_version', 'Unknown')}
+- Node Type: {cluster_context.get('node_type', 'EC2')}
+- VPC ID: {cluster_context.get('vpc_id', 'Unknown')}
+"""
+    
     def translate_kubectl_output(self, output: str, to_language: Language) -> str:
         """
         Перекладати kubectl output якщо потрібно
@@ -4,9 +4,25 @@
 Детальна prompt engineering стратегія для різних сценаріїв
 """
 
+import sys
 from typing import Dict, List, Optional
 from enum import Enum
 
+from prompts.budget import (
+    CLUSTER_CONTEXT,
+    CONVERSATION_HISTORY,
+    FEW_SHOT,
+    KUBECTL_EVIDENCE,
+    SPECIALIZED,
+    SYSTEM,
+    USER_MESSAGE,
+    PromptBudget,
+    PromptSection,
+    split_lines,
+    split_paragraphs,
+)
+from prompts.tokenizer import get_token_counter
+
 
 class ProblemSeverity(Enum):
     """Рівні критичності проблем"""
@@ -281,7 +297,10 @@ def build_diagnostic_prompt(
     issue_description: str,
     namespace: str = "default",
     kubectl_output: Optional[str] = None,
-    cluster_context: Optional[Dict] = None
+    cluster_context: Optional[Dict] = None,
+    include_examples: bool = False,
+    token_budget: Optional[int] = None,
+    model: Optional[str] = None
 ) -> str:
     """
     Динамічна генерація промпта на основі контексту проблеми
@@ -293,6 +312,9 @@ def build_diagnostic_prompt(
         namespace: K8s namespace
         kubectl_output: Вивід kubectl команд
         cluster_context: Додатковий контекст (version, cloud provider, etc.)
+        include_examples: Додати FEW_SHOT_EXAMPLES (відкидаються першими)
+        token_budget: Ліміт токенів промпта (None - без обмеження)
+        model: Модель, чиїм tokenizer рахувати токени
     
     Returns:
         Повний промпт для LLM
@@ -316,45 +338,47 @@ def build_diagnostic_prompt(
     }[severity]
     
     # Cluster context
-    cluster_info = ""
+    cluster_lines = []
     if cluster_context:
-        cluster_info = f"""
-# Cluster Context:
-- Kubernetes Version: {cluster_context.get('k8s_version', 'Unknown')}
-- Cloud Provider: {cluster_context.get('cloud_provider', 'Unknown')}
-- Environment: {cluster_context.get('environment', 'Unknown')}
-- Region: {cluster_context.get('region', 'Unknown')}
-"""
-    
-    # kubectl output
-    kubectl_section = ""
-    if kubectl_output:
-        kubectl_section = f"""
-# Available kubectl Output:
-```
-{kubectl_output}
-```
-"""
+        cluster_lines = [
+            f"- Kubernetes Version: {cluster_context.get('k8s_version', 'Unknown')}",
+            f"- Cloud Provider: {cluster_context.get('cloud_provider', 'Unknown')}",
+            f"- Environment: {cluster_context.get('environment', 'Unknown')}",
+            f"- Region: {cluster_context.get('region', 'Unknown')}",
+        ]
     
-    # Фінальний промпт
-    prompt = f"""
-{severity_context}
-
-{cluster_info}
-
-# Issue Report:
+    issue_report = f"""# Issue Report:
 **Resource Type:** {resource_type.value}
 **Namespace:** {namespace}
-**Description:** {issue_description}
-
-{kubectl_section}
-
-{specialized_prompt}
-
-Now, analyze this issue and provide a structured response following the mandatory format.
-"""
+**Description:** {issue_description}"""
     
-    return prompt.strip()
+    # Few-shot: кожен приклад - одна одиниця, відкидається цілком
+    examples = [
+        f"User: {example['user_query']}\nAssistant:\n{example['assistant_response'].strip()}"
+        for example in FEW_SHOT_EXAMPLES
+    ] if include_examples else []
+    
+    # Порядок секцій - як у фінальному промпті
+    sections = [
+        PromptSection.build(SYSTEM, [severity_context]),
+        PromptSection.build(CLUSTER_CONTEXT, cluster_lines, header="# Cluster Context:"),
+        PromptSection.build(USER_MESSAGE, [issue_report]),
+        PromptSection.build(
+            KUBECTL_EVIDENCE,
+            split_lines(kubectl_output or ""),
+            header="# Available kubectl Output:\n```",
+            footer="```",
+        ),
+        PromptSection.build(SPECIALIZED, split_paragraphs(specialized_prompt), separator="\n\n"),
+        PromptSection.build(FEW_SHOT, examples, header="# Examples:", separator="\n\n"),
+        PromptSection.build(
+            USER_MESSAGE,
+            ["Now, analyze this issue and provide a structured response following the mandatory format."],
+        ),
+    ]
+    
+    budget = PromptBudget(token_budget if token_budget is not None else sys.maxsize, get_token_counter(model))
+    return budget.fit(sections).render()
 
 
 # ============================================================================
@@ -615,39 +639,91 @@ Do you want to:
 # PROMPT OPTIMIZATION UTILITIES
 # ============================================================================
 
-def optimize_prompt_length(prompt: str, max_tokens: int = 4000) -> str:
+def _split_markdown_sections(prompt: str) -> List[str]:
+    """Розбити промпт по заголовках '# ' (ігноруючи '#' всередині ``` блоків)"""
+    blocks: List[List[str]] = [[]]
+    in_fence = False
+    
+    for line in prompt.splitlines():
+        if line.strip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith("# ") and blocks[-1]:
+            blocks.append([])
+        blocks[-1].append(line)
+    
+    return ["\n".join(block).strip() for block in blocks if "\n".join(block).strip()]
+
+
+def _sections_for_block(block: str) -> List[PromptSection]:
+    """Секції бюджету за заголовком блоку"""
+    heading, _, body = block.partition("\n")
+    title = heading.lower()
+    
+    if not heading.startswith("# "):
+        # Преамбула (severity, роль) - завжди лишається
+        return [PromptSection.build(SYSTEM, [block], static=False)]
+    
+    if "kubectl" in title and "```" in body:
+        # Рядки всередині ``` - evidence, текст після блоку - окрема секція
+        _, _, fenced = body.partition("```")
+        fenced = fenced.partition("\n")[2]
+        output, _, rest = fenced.partition("```")
+        sections = [PromptSection.build(
+            KUBECTL_EVIDENCE,
+            split_lines(output),
+            header=f"{heading}\n```",
+            footer="```",
+        )]
+        if rest.strip():
+            sections.append(PromptSection.build(SPECIALIZED, split_paragraphs(rest), separator="\n\n", static=False))
+        return sections
+    
+    if "history" in title or "історія" in title:
+        return [PromptSection.build(CONVERSATION_HISTORY, split_lines(body), header=heading)]
+    
+    if "cluster" in title or "кластер" in title:
+        return [PromptSection.build(CLUSTER_CONTEXT, split_lines(body), header=heading)]
+    
+    if any(key in title for key in ("issue report", "question", "запит")):
+        return [PromptSection.build(USER_MESSAGE, [block])]
+    
+    if title.startswith("# common") or "example" in title:
+        return [PromptSection.build(FEW_SHOT, split_paragraphs(body), header=heading, separator="\n\n")]
+    
+    # Невідомий заголовок може бути частиною вводу користувача - не мемоізувати
+    return [PromptSection.build(SPECIALIZED, split_paragraphs(body), header=heading, separator="\n\n", static=False)]
+
+
+def optimize_prompt_length(prompt: str, max_tokens: int = 4000, model: Optional[str] = None) -> str:
     """
     Оптимізація довжини промпта для моделей з обмеженим context window
     
+    Промпт розбивається на секції за заголовками і проходить через PromptBudget:
+    першими відкидаються цілі приклади ("# Common ..."), потім рядки kubectl
+    виводу з середини, і тільки в крайньому разі обрізається сам текст.
+    
     Args:
         prompt: Оригінальний промпт
-        max_tokens: Максимальна кількість токенів (approx 1 token = 4 chars)
+        max_tokens: Максимальна кількість токенів (рахується tokenizer моделі)
+        model: Ollama модель (default - OLLAMA_MODEL)
     
     Returns:
         Оптимізований промпт
     """
-    max_chars = max_tokens * 4
+    counter = get_token_counter(model)
     
-    if len(prompt) <= max_chars:
+    if counter.count(prompt) <= max_tokens:
         return prompt
     
-    # Truncate kubectl output first
-    if "# Available kubectl Output:" in prompt:
-        parts = prompt.split("# Available kubectl Output:")
-        kubectl_section = parts[1].split("```")[1] if len(parts) > 1 else ""
-        
-        # Keep first and last 500 chars of kubectl output
-        if len(kubectl_section) > 1000:
-            truncated = kubectl_section[:500] + "\n\n... [truncated] ...\n\n" + kubectl_section[-500:]
-            prompt = parts[0] + f"# Available kubectl Output:\n```\n{truncated}\n```"
-    
-    # If still too long, truncate examples
-    if len(prompt) > max_chars:
-        if "# Common" in prompt:
-            # Remove detailed examples
-            prompt = prompt.split("# Common")[0]
+    sections = [
+        section
+        for block in _split_markdown_sections(prompt)
+        for section in _sections_for_block(block)
+    ]
+    allocation = PromptBudget(max_tokens, counter).fit(sections)
     
-    return prompt[:max_chars]
+    # Оцінка по одиницях може трохи розійтись з підрахунком цілого тексту
+    return counter.truncate(allocation.render(), max_tokens)
 
 
 def inject_context(prompt: str, context: Dict) -> str:
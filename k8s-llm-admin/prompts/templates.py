@@ -3,8 +3,16 @@ Jinja2 templates для динамічної генерації промптів
 Використовується для більш гнучкого template rendering
 """
 
-from jinja2 import Environment, BaseLoader, Template
-from typing import Dict, Any
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FunctionLoader, Template
+
+from config.settings import settings
+from utils.logger import logger
 
 
 # Template для базової діагностики
@@ -113,29 +121,124 @@ Analyze these resources holistically and identify cascading failures or root cau
 """
 
 
+BUILTIN_TEMPLATES = {
+    "diagnostic": DIAGNOSTIC_TEMPLATE,
+    "followup": FOLLOWUP_TEMPLATE,
+    "multi_resource": MULTI_RESOURCE_TEMPLATE,
+}
+
+class TemplateRegistry:
+    """Скомпільовані Jinja2 templates
+    
+    Вбудовані templates компілюються один раз при створенні, кастомні -
+    у bounded LRU за sha256 вмісту. Вбудовані завантажуються через loader
+    (а не ``from_string``), тож працює bytecode cache на диску: після
+    рестарту компіляція зводиться до завантаження готового bytecode.
+    Кастомні компілюються в overlay без bytecode cache - довільний
+    користувацький вміст не пишеться на диск.
+    """
+    
+    def __init__(
+        self,
+        templates: Optional[Dict[str, str]] = None,
+        cache_dir: Optional[Path] = None,
+        max_custom: int = 128,
+    ):
+        self._sources: Dict[str, str] = dict(BUILTIN_TEMPLATES if templates is None else templates)
+        bytecode_cache = None
+        if cache_dir is not None:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+        
+        # cache_size=0: кешування тут, у _compiled та _custom
+        self.env = Environment(
+            loader=FunctionLoader(self._sources.get),
+            bytecode_cache=bytecode_cache,
+            cache_size=0,
+        )
+        self.env.filters['truncate'] = lambda s, length: s[:length] + '...' if len(s) > length else s
+        self._custom_env = self.env.overlay(bytecode_cache=None)
+        
+        self._compiled: Dict[str, Template] = {name: self.env.get_template(name) for name in self._sources}
+        self.max_custom = max_custom
+        self._custom: "OrderedDict[str, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.custom_hits = 0
+        self.custom_misses = 0
+    
+    def get(self, name: str) -> Template:
+        """Вбудований template за назвою"""
+        return self._compiled[name]
+    
+    def custom(self, template_str: str) -> Template:
+        """Кастомний template (однаковий вміст компілюється один раз)"""
+        key = hashlib.sha256(template_str.encode()).hexdigest()
+        
+        with self._lock:
+            template = self._custom.get(key)
+            if template is not None:
+                self._custom.move_to_end(key)
+                self.custom_hits += 1
+                return template
+        
+        template = self._custom_env.from_string(template_str)
+        
+        with self._lock:
+            self.custom_misses += 1
+            self._custom[key] = template
+            if len(self._custom) > self.max_custom:
+                self._custom.popitem(last=False)
+        return template
+    
+    def render(self, name: str, context: Dict[str, Any]) -> str:
+        return self.get(name).render(**context)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "builtin": len(self._compiled),
+            "custom": len(self._custom),
+            "custom_hits": self.custom_hits,
+            "custom_misses": self.custom_misses,
+        }
+
+
+# Global registry instance
+_template_registry: Optional[TemplateRegistry] = None
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Get global template registry (bytecode cache у TEMPLATE_CACHE_DIR)"""
+    global _template_registry
+    
+    if _template_registry is None:
+        _template_registry = TemplateRegistry(
+            cache_dir=settings.TEMPLATE_CACHE_DIR,
+            max_custom=settings.TEMPLATE_CUSTOM_CACHE_SIZE,
+        )
+        logger.info(f"Jinja2 templates скомпільовано: {len(BUILTIN_TEMPLATES)}")
+    
+    return _template_registry
+
+
 class PromptTemplateManager:
     """Управління Jinja2 templates для промптів"""
     
-    def __init__(self):
-        self.env = Environment(loader=BaseLoader())
-        self.env.filters['truncate'] = lambda s, length: s[:length] + '...' if len(s) > length else s
+    def __init__(self, registry: Optional[TemplateRegistry] = None):
+        self.registry = registry or get_template_registry()
+        self.env = self.registry.env
     
     def render_diagnostic(self, context: Dict[str, Any]) -> str:
         """Рендер діагностичного промпта"""
-        template = self.env.from_string(DIAGNOSTIC_TEMPLATE)
-        return template.render(**context)
+        return self.registry.render("diagnostic", context)
     
     def render_followup(self, context: Dict[str, Any]) -> str:
         """Рендер follow-up промпта"""
-        template = self.env.from_string(FOLLOWUP_TEMPLATE)
-        return template.render(**context)
+        return self.registry.render("followup", context)
     
     def render_multi_resource(self, context: Dict[str, Any]) -> str:
         """Рендер multi-resource аналізу"""
-        template = self.env.from_string(MULTI_RESOURCE_TEMPLATE)
-        return template.render(**context)
+        return self.registry.render("multi_resource", context)
     
     def render_custom(self, template_str: str, context: Dict[str, Any]) -> str:
         """Рендер кастомного template"""
-        template = self.env.from_string(template_str)
-        return template.render(**context)
+        return self.registry.custom(template_str).render(**context)
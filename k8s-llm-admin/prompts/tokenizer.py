@@ -0,0 +1,195 @@
+"""
+Підрахунок токенів для бюджету промпта
+Локальний tokenizer на сімейство моделей (HF `tokenizers`, якщо є tokenizer.json),
+інакше консервативна оцінка з урахуванням кирилиці (1 токен != 4 символи)
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from utils.logger import logger
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # pragma: no cover - fallback на оцінку
+    Tokenizer = None
+
+
+# Ollama model name -> сімейство tokenizer (перший збіг)
+MODEL_FAMILIES = [
+    ("llama3", re.compile(r"^llama3")),
+    ("llama2", re.compile(r"^(llama2|codellama|llama:)")),
+    ("qwen2", re.compile(r"^qwen2")),
+    ("phi3", re.compile(r"^phi3")),
+    ("mistral", re.compile(r"^(mistral|mixtral)")),
+    ("gemma", re.compile(r"^gemma")),
+]
+
+# Не-gated репозиторії з tokenizer.json (для TOKENIZER_DOWNLOAD=true)
+HUB_TOKENIZERS = {
+    "llama3": "unsloth/Llama-3.2-1B-Instruct",
+    "qwen2": "Qwen/Qwen2.5-0.5B-Instruct",
+    "phi3": "microsoft/Phi-3-mini-4k-instruct",
+    "mistral": "mistralai/Mistral-7B-Instruct-v0.3",
+}
+
+# Символів на токен для fallback (з запасом, щоб не переповнити context window)
+_ESTIMATE_RE = re.compile(
+    r"(?P<latin>[A-Za-z]+)|(?P<digits>\d+)|(?P<cyrillic>[Ѐ-ӿ]+)|(?P<space>\s+)|(?P<other>.)",
+    re.DOTALL,
+)
+_CHARS_PER_TOKEN = {"latin": 3.5, "digits": 2.0, "cyrillic": 2.0, "space": 8.0, "other": 1.0}
+
+
+def model_family(model: str) -> str:
+    """'llama3.2:3b' -> 'llama3'"""
+    name = model.lower().rsplit("/", 1)[-1]
+    for family, pattern in MODEL_FAMILIES:
+        if pattern.match(name):
+            return family
+    return "default"
+
+
+def estimate_tokens(text: str) -> int:
+    """Консервативна оцінка без tokenizer (кирилиця ~2 символи на токен)"""
+    total = 0.0
+    for match in _ESTIMATE_RE.finditer(text):
+        kind = match.lastgroup
+        length = match.end() - match.start()
+        # Кожне слово/число - щонайменше один токен
+        total += length / _CHARS_PER_TOKEN[kind] if kind == "space" else max(1.0, length / _CHARS_PER_TOKEN[kind])
+    return math.ceil(total)
+
+
+class TokenCounter:
+    """Лічильник токенів одного сімейства моделей"""
+
+    def __init__(self, family: str, tokenizer: Optional["Tokenizer"] = None, max_static_entries: int = 1024):
+        self.family = family
+        self.tokenizer = tokenizer
+        # LRU: статичних сегментів небагато, але пам'ять не має рости з кожним запитом
+        self._static_counts: "OrderedDict[str, int]" = OrderedDict()
+        self.max_static_entries = max_static_entries
+        self._lock = threading.Lock()
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        return estimate_tokens(text)
+
+    def count_static(self, text: str) -> int:
+        """Мемоізований підрахунок для статичних сегментів (system prompt тощо)"""
+        with self._lock:
+            count = self._static_counts.get(text)
+            if count is not None:
+                self._static_counts.move_to_end(text)
+                return count
+        count = self.count(text)
+        with self._lock:
+            self._static_counts[text] = count
+            while len(self._static_counts) > self.max_static_entries:
+                self._static_counts.popitem(last=False)
+        return count
+
+    def truncate(self, text: str, max_tokens: int, marker: str = "\n... [truncated] ...\n") -> str:
+        """Обрізати до max_tokens, зберігши початок і кінець тексту"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+
+        budget = max_tokens - self.count(marker)
+        if budget <= 0:
+            return ""
+        head = self._prefix_within(text, budget // 2)
+        tail = self._suffix_within(text, budget - budget // 2)
+        return f"{head}{marker}{tail}"
+
+    def _prefix_within(self, text: str, max_tokens: int) -> str:
+        if self.tokenizer is not None:
+            encoding = self.tokenizer.encode(text, add_special_tokens=False)
+            if len(encoding.ids) <= max_tokens:
+                return text
+            return text[:encoding.offsets[max_tokens][0]] if max_tokens > 0 else ""
+        return text[:self._fit_chars(text, max_tokens, from_end=False)]
+
+    def _suffix_within(self, text: str, max_tokens: int) -> str:
+        if self.tokenizer is not None:
+            encoding = self.tokenizer.encode(text, add_special_tokens=False)
+            if len(encoding.ids) <= max_tokens:
+                return text
+            return text[encoding.offsets[len(encoding.ids) - max_tokens][0]:] if max_tokens > 0 else ""
+        chars = self._fit_chars(text, max_tokens, from_end=True)
+        return text[len(text) - chars:] if chars else ""
+
+    def _fit_chars(self, text: str, max_tokens: int, from_end: bool) -> int:
+        """Бінарний пошук найдовшого префіксу/суфіксу в межах max_tokens"""
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            piece = text[len(text) - mid:] if from_end else text[:mid]
+            if estimate_tokens(piece) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+
+def _load_tokenizer(family: str) -> Optional["Tokenizer"]:
+    """tokenizer.json з TOKENIZER_DIR/<family>/, або з HF Hub якщо дозволено"""
+    if Tokenizer is None or family == "default":
+        return None
+
+    path = Path(settings.TOKENIZER_DIR) / family / "tokenizer.json"
+    try:
+        if path.exists():
+            return Tokenizer.from_file(str(path))
+
+        if settings.TOKENIZER_DOWNLOAD and family in HUB_TOKENIZERS:
+            tokenizer = Tokenizer.from_pretrained(HUB_TOKENIZERS[family])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tokenizer.save(str(path))
+            return tokenizer
+    except Exception as e:
+        logger.warning(f"Tokenizer для {family} не завантажено: {e}")
+
+    return None
+
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """Кешований TokenCounter для сімейства моделі (default - OLLAMA_MODEL)"""
+    family = model_family(model or settings.OLLAMA_MODEL)
+
+    counter = _counters.get(family)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.get(family)
+            if counter is None:
+                tokenizer = _load_tokenizer(family)
+                if tokenizer is None:
+                    logger.info(f"Tokenizer для {family} недоступний - оцінка кількості токенів")
+                counter = TokenCounter(family, tokenizer)
+                _counters[family] = counter
+
+    return counter
+
+
+def count_tokens(texts: List[str], model: Optional[str] = None) -> int:
+    """Сума токенів кількох сегментів"""
+    counter = get_token_counter(model)
+    return sum(counter.count(text) for text in texts)
@@ -1,12 +1,23 @@
 """
 Валідація промптів перед відправкою до LLM
 Перевірка безпеки, довжини, форматування
+
+Усі patterns перевіряються за один прохід (PatternScanner): regex-альтернація
+з named groups + Aho-Corasick для літералів; є потоковий режим для chunks
 """
 
 import re
-from typing import List, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple, Optional
 from enum import Enum
 
+from utils.redaction import redact
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - fallback на regex-альтернацію
+    ahocorasick = None
+
 
 class ValidationError(Exception):
     """Помилка валідації промпта"""
@@ -20,6 +31,187 @@ class SecurityLevel(Enum):
     DESTRUCTIVE = "destructive"  # Видалення, scale to 0, etc.
 
 
+@dataclass
+class ScanResult:
+    """Знайдені patterns (у порядку появи в тексті, без повторів)"""
+
+    length: int = 0
+    blank: bool = True
+    forbidden: List[str] = field(default_factory=list)
+    destructive: List[str] = field(default_factory=list)
+    moderate: List[str] = field(default_factory=list)
+    injection: List[str] = field(default_factory=list)
+
+    @property
+    def security_level(self) -> SecurityLevel:
+        if self.destructive:
+            return SecurityLevel.DESTRUCTIVE
+        if self.moderate:
+            return SecurityLevel.MODERATE
+        return SecurityLevel.SAFE
+
+    def add(self, category: str, pattern: str) -> None:
+        found = getattr(self, category)
+        if pattern not in found:
+            found.append(pattern)
+
+
+class PatternScanner:
+    """
+    Однопрохідний сканер для набору regex patterns і літералів
+
+    Regex patterns об'єднуються в одну альтернацію з named groups
+    (категорія + індекс). З pyahocorasick один автомат за прохід знаходить
+    і літерали, і літеральні префікси patterns (`kubectl`, `rm`, ...);
+    regex перевіряється лише на цих позиціях. Без нього - пошук
+    альтернацією (з літералами) і lookahead на перші символи
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]], literals: Dict[str, List[str]]):
+        self._groups: Dict[str, Tuple[str, str]] = {}
+        for category, category_patterns in patterns.items():
+            for index, pattern in enumerate(category_patterns):
+                self._groups[f"{category}_{index}"] = (category, pattern)
+        self._literals = {
+            literal.lower(): category
+            for category, category_literals in literals.items()
+            for literal in category_literals
+        }
+        anchors = [self._literal_prefix(pattern) for _, pattern in self._groups.values()]
+
+        self._automaton = None
+        if ahocorasick is not None and all(anchors):
+            self._automaton = ahocorasick.Automaton()
+            for word in set(anchors) | set(self._literals):
+                self._automaton.add_word(word, (word, word in anchors, self._literals.get(word)))
+            self._automaton.make_automaton()
+            self._regex = re.compile(self._alternation(self._groups), re.IGNORECASE)
+            return
+
+        literal_groups = {}
+        for index, (literal, category) in enumerate(self._literals.items()):
+            name = f"{category}_literal_{index}"
+            self._groups[name] = (category, literal)
+            literal_groups[name] = (category, re.escape(literal))
+        sources = {**self._groups, **literal_groups}
+        body = self._alternation(sources)
+        # Lookahead лише якщо кожен pattern починається з літерала
+        first = {pattern[0] for _, pattern in sources.values() if pattern[:1].isalnum() or pattern[:1] == "-"}
+        if len(first) == len({pattern[:1] for _, pattern in sources.values()}):
+            body = f"(?=[{re.escape(''.join(sorted(first)))}])(?:{body})"
+        self._regex = re.compile(body, re.IGNORECASE)
+
+    @staticmethod
+    def _alternation(groups: Dict[str, Tuple[str, str]]) -> str:
+        return "|".join(f"(?P<{name}>{pattern})" for name, (_, pattern) in groups.items())
+
+    @staticmethod
+    def _literal_prefix(pattern: str) -> str:
+        """Літеральний початок pattern у нижньому регістрі (`kubectl\\s+...` -> `kubectl`)"""
+        if "|" in pattern:
+            return ""  # Альтернатива може починатися з будь-чого
+        match = re.match(r"[\w\-=:]+", pattern)
+        prefix = match.group(0) if match else ""
+        # Квантифікатор після останнього символу робить його необов'язковим
+        if prefix and pattern[len(prefix):len(prefix) + 1] in ("?", "*", "{"):
+            prefix = prefix[:-1]
+        return prefix.lower()
+
+    def scan(self, text: str, result: Optional[ScanResult] = None, stop: Optional[int] = None) -> ScanResult:
+        """
+        Додати збіги з `text` до `result`
+
+        Args:
+            stop: враховувати лише збіги, що починаються до цієї позиції
+                (regex бачить текст і після неї - для потокового режиму)
+        """
+        if result is None:
+            result = ScanResult()
+        if stop is None:
+            stop = len(text)
+        head = text[:stop]
+        result.length += len(head)
+        if head and not head.isspace():
+            result.blank = False
+
+        if self._automaton is not None:
+            self._scan_anchored(head.lower() + text[stop:].lower(), len(head.lower()), result)
+            return result
+
+        # Після збігу пошук продовжується з наступного символу: жадібне `.*`
+        # одного pattern не ховає інші, як при окремому re.search на кожен
+        position = 0
+        search = self._regex.search
+        while True:
+            match = search(text, position)
+            if match is None or match.start() >= stop:
+                break
+            result.add(*self._groups[match.lastgroup])
+            position = match.start() + 1
+        return result
+
+    def _scan_anchored(self, lowered: str, stop: int, result: ScanResult) -> None:
+        """Aho-Corasick по тексту, regex.match лише на позиціях префіксів"""
+        starts = set()
+        for end, (word, is_anchor, category) in self._automaton.iter(lowered):
+            start = end - len(word) + 1
+            if start >= stop:
+                continue
+            if is_anchor:
+                starts.add(start)
+            if category:
+                result.add(category, word)
+
+        match = self._regex.match
+        for start in sorted(starts):
+            found = match(lowered, start)
+            if found:
+                result.add(*self._groups[found.lastgroup])
+
+    def stream(self, max_carry: int = 65536) -> "StreamScanner":
+        return StreamScanner(self, max_carry)
+
+
+class StreamScanner:
+    """
+    Потокове сканування: feed(chunk) ... finish()
+
+    Між chunks переноситься незавершений рядок разом з останнім непорожнім;
+    збіги, що починаються до них, regex шукає з видимістю перенесеного
+    тексту. Тож збіг на межі chunk (у тому числі `\\s+` через перенос
+    рядка) не губиться і не рахується двічі. Рядок, довший за max_carry,
+    сканується частинами, і на межі частин збіг можна пропустити
+    """
+
+    def __init__(self, scanner: PatternScanner, max_carry: int = 65536):
+        self.scanner = scanner
+        self.max_carry = max_carry
+        self.result = ScanResult()
+        self._carry = ""
+
+    def feed(self, chunk: str) -> ScanResult:
+        buffer = self._carry + chunk
+        end = buffer.rfind("\n")
+        if end == -1:
+            cut = 0
+        else:
+            # Початок останнього непорожнього завершеного рядка
+            cut = buffer.rfind("\n", 0, len(buffer[:end].rstrip())) + 1
+        if len(buffer) - cut > self.max_carry:
+            cut = len(buffer) - self.max_carry
+
+        if cut:
+            self.scanner.scan(buffer, self.result, stop=cut)
+        self._carry = buffer[cut:]
+        return self.result
+
+    def finish(self) -> ScanResult:
+        if self._carry:
+            self.scanner.scan(self._carry, self.result)
+            self._carry = ""
+        return self.result
+
+
 class PromptValidator:
     """Валідація промптів на безпеку та коректність"""
     
@@ -42,8 +234,46 @@ class PromptValidator:
         r'--force.*--grace-period=0',
     ]
     
+    # Команди зміни стану
+    MODERATE_PATTERNS = [
+        r'kubectl\s+apply',
+        r'kubectl\s+patch',
+        r'kubectl\s+scale',
+        r'kubectl\s+rollout\s+restart',
+    ]
+    
+    # Prompt injection (літерали, без урахування регістру)
+    INJECTION_INDICATORS = [
+        "ignore previous instructions",
+        "disregard all prior",
+        "new instructions:",
+        "system: you are now",
+        "forget everything above",
+    ]
+    
     def __init__(self, max_prompt_length: int = 8000):
         self.max_length = max_prompt_length
+        # Порядок категорій важливий: на одній позиції destructive
+        # (`patch.*delete`) має перемогти moderate (`patch`)
+        self.scanner = PatternScanner(
+            {
+                "forbidden": self.FORBIDDEN_PATTERNS,
+                "destructive": self.DESTRUCTIVE_COMMANDS,
+                "moderate": self.MODERATE_PATTERNS,
+            },
+            {"injection": self.INJECTION_INDICATORS},
+        )
+    
+    def scan(self, prompt: str) -> ScanResult:
+        """Усі patterns за один прохід"""
+        return self.scanner.scan(prompt)
+    
+    def scan_chunks(self, chunks: Iterable[str]) -> ScanResult:
+        """Те саме для потокового вводу (великі kubectl dumps, логи)"""
+        stream = self.scanner.stream()
+        for chunk in chunks:
+            stream.feed(chunk)
+        return stream.finish()
     
     def validate_prompt(
         self, 
@@ -68,57 +298,42 @@ class PromptValidator:
         if not prompt.strip():
             return False, "Empty prompt"
         
-        # 3. Перевірка на заборонені patterns
-        for pattern in self.FORBIDDEN_PATTERNS:
-            if re.search(pattern, prompt, re.IGNORECASE):
-                return False, f"Forbidden pattern detected: {pattern}"
+        # 3-5. Заборонені patterns, деструктивні команди, injection - один прохід
+        return self.check(self.scan(prompt), allow_destructive)
+    
+    def validate_chunks(
+        self,
+        chunks: Iterable[str],
+        allow_destructive: bool = False
+    ) -> Tuple[bool, Optional[str]]:
+        """validate_prompt для потокового вводу"""
+        result = self.scan_chunks(chunks)
+        if result.length > self.max_length:
+            return False, f"Prompt too long: {result.length} > {self.max_length}"
+        if result.blank:
+            return False, "Empty prompt"
+        return self.check(result, allow_destructive)
+    
+    def check(self, result: ScanResult, allow_destructive: bool = False) -> Tuple[bool, Optional[str]]:
+        """Вердикт за результатом scan (без перевірки довжини)"""
+        if result.forbidden:
+            return False, f"Forbidden pattern detected: {result.forbidden[0]}"
         
-        # 4. Перевірка на деструктивні команди
-        if not allow_destructive:
-            for pattern in self.DESTRUCTIVE_COMMANDS:
-                if re.search(pattern, prompt, re.IGNORECASE):
-                    return False, f"Destructive command detected: {pattern}. Set allow_destructive=True if intentional."
+        if result.destructive and not allow_destructive:
+            return False, f"Destructive command detected: {result.destructive[0]}. Set allow_destructive=True if intentional."
         
-        # 5. Перевірка на injection attacks
-        if self._check_injection(prompt):
+        if result.injection:
             return False, "Potential injection attack detected"
         
         return True, None
     
     def _check_injection(self, prompt: str) -> bool:
         """Перевірка на prompt injection спроби"""
-        injection_indicators = [
-            "ignore previous instructions",
-            "disregard all prior",
-            "new instructions:",
-            "system: you are now",
-            "forget everything above",
-        ]
-        
-        prompt_lower = prompt.lower()
-        return any(indicator in prompt_lower for indicator in injection_indicators)
+        return bool(self.scan(prompt).injection)
     
     def classify_security_level(self, prompt: str) -> SecurityLevel:
         """Класифікація рівня безпеки операції"""
-        # Деструктивні операції
-        for pattern in self.DESTRUCTIVE_COMMANDS:
-            if re.search(pattern, prompt, re.IGNORECASE):
-                return SecurityLevel.DESTRUCTIVE
-        
-        # Команди зміни стану
-        moderate_patterns = [
-            r'kubectl\s+apply',
-            r'kubectl\s+patch',
-            r'kubectl\s+scale',
-            r'kubectl\s+rollout\s+restart',
-        ]
-        
-        for pattern in moderate_patterns:
-            if re.search(pattern, prompt, re.IGNORECASE):
-                return SecurityLevel.MODERATE
-        
-        # Безпечні операції (тільки читання)
-        return SecurityLevel.SAFE
+        return self.scan(prompt).security_level
     
     def extract_kubectl_commands(self, prompt: str) -> List[str]:
         """Витягти всі kubectl команди з промпта"""
@@ -128,23 +343,8 @@ class PromptValidator:
         return [cmd.strip() for cmd in commands]
     
     def sanitize_sensitive_data(self, prompt: str) -> str:
-        """Видалення чутливих даних з промпта перед логуванням"""
-        # Маскування секретів
-        prompt = re.sub(
-            r'(password|token|secret|key)[\s:=]+[^\s]+',
-            r'\1=***REDACTED***',
-            prompt,
-            flags=re.IGNORECASE
-        )
-        
-        # Маскування IP адрес
-        prompt = re.sub(
-            r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b',
-            'XXX.XXX.XXX.XXX',
-            prompt
-        )
-        
-        return prompt
+        """Видалення чутливих даних з промпта перед логуванням (секрети, ключі, IP)"""
+        return redact(prompt)
 
 
 # Глобальний validator instance
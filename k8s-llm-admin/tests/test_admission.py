@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from llm.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    RequestPriority,
+    priority_for,
+)
+from llm.ollama_client import OllamaClient
+from prompts.system_prompts import ProblemSeverity
+
+
+def test_priority_mapping():
+    """CRITICAL першим, interactive streams перед batch"""
+    assert priority_for(ProblemSeverity.CRITICAL, interactive=True) == RequestPriority.CRITICAL
+    assert priority_for(ProblemSeverity.LOW, interactive=True) == RequestPriority.INTERACTIVE
+    assert priority_for(ProblemSeverity.LOW) == RequestPriority.LOW
+    assert priority_for(None) == RequestPriority.MEDIUM
+
+
+@pytest.mark.asyncio
+async def test_critical_admitted_before_batch():
+    """Коли слот звільняється, його отримує CRITICAL, а не раніший LOW"""
+    controller = AdmissionController(max_concurrency=1, max_wait_seconds=5, initial_service_time=0.01)
+    order = []
+
+    async def run(name, priority):
+        async with controller.admit(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await controller.acquire(RequestPriority.MEDIUM)
+    low = asyncio.create_task(run("low", RequestPriority.LOW))
+    await asyncio.sleep(0)
+    critical = asyncio.create_task(run("critical", RequestPriority.CRITICAL))
+    await asyncio.sleep(0)
+
+    assert controller.stats()["queue_depth"] == 2
+    controller.release()
+    await asyncio.gather(low, critical)
+
+    assert order == ["critical", "low"]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_full_returns_429():
+    """Переповнена черга - 429 з Retry-After"""
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=1, initial_service_time=0.01)
+    await controller.acquire(RequestPriority.MEDIUM)
+    waiter = asyncio.create_task(controller.acquire(RequestPriority.MEDIUM))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire(RequestPriority.MEDIUM)
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+    waiter.cancel()
+
+
+@pytest.mark.asyncio
+async def test_deadline_shedding_returns_503():
+    """Якщо оцінка очікування більша за deadline - 503 одразу"""
+    controller = AdmissionController(max_concurrency=1, initial_service_time=20)
+    await controller.acquire(RequestPriority.MEDIUM)
+    ahead = asyncio.create_task(controller.acquire(RequestPriority.MEDIUM, max_wait=60))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire(RequestPriority.LOW, max_wait=5)
+
+    assert exc.value.status_code == 503
+    # залишок генерації в польоті (~20s) + ще одна хвиля для MEDIUM попереду
+    assert exc.value.retry_after == pytest.approx(40, abs=0.5)
+    assert controller.stats()["shed_deadline"] == 1
+    ahead.cancel()
+
+
+@pytest.mark.asyncio
+async def test_no_preshed_for_first_in_queue_or_critical():
+    """avg_service_time > max_wait: перший у черзі та CRITICAL чекають слот, а не 503"""
+    controller = AdmissionController(max_concurrency=1, max_wait_seconds=1, initial_service_time=10)
+    await controller.acquire(RequestPriority.MEDIUM)
+
+    first = asyncio.create_task(controller.acquire(RequestPriority.MEDIUM))
+    await asyncio.sleep(0)
+    critical = asyncio.create_task(controller.acquire(RequestPriority.CRITICAL))
+    await asyncio.sleep(0)
+    assert controller.stats()["queue_depth"] == 2
+
+    controller.release()
+    await critical
+    controller.release()
+    await first
+
+    assert controller.in_flight == 1
+    assert controller.stats()["shed_deadline"] == 0
+
+
+@pytest.mark.asyncio
+async def test_estimate_counts_elapsed_service_time():
+    """Оцінка - залишок генерації в польоті, а не повний avg_service_time"""
+    controller = AdmissionController(max_concurrency=1, initial_service_time=0.2)
+    await controller.acquire(RequestPriority.MEDIUM)
+    await asyncio.sleep(0.1)
+
+    assert controller.estimate_wait(0) < 0.15
+    assert controller.estimate_wait(1) == pytest.approx(controller.estimate_wait(0) + 0.2, abs=0.01)
+
+    await asyncio.sleep(0.15)
+    assert controller.estimate_wait(0) == 0.0
+    controller.release()
+    assert controller.estimate_wait(0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_capacity_follows_backend_limits():
+    """Ємність admission - сума AIMD лімітів: два backends по 3 -> 6 генерацій одночасно"""
+    active, peak = 0, 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    client = OllamaClient(
+        backend_urls=["http://a", "http://b"],
+        transport=httpx.MockTransport(handler),
+        initial_concurrency=3,
+    )
+    controller = AdmissionController(max_concurrency=0, capacity=client.pool.capacity)
+
+    async def run(i):
+        async with controller.admit(RequestPriority.MEDIUM):
+            await client.generate(prompt=f"q{i}")
+
+    await asyncio.gather(*(run(i) for i in range(12)))
+
+    assert peak >= 6
+    client.pool.backends[0].limiter.limit = 5
+    assert controller.max_concurrency == 8
+    assert AdmissionController(max_concurrency=4, capacity=client.pool.capacity).max_concurrency == 4
+    await client.aclose()
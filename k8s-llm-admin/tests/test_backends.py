@@ -0,0 +1,72 @@
+import httpx
+import pytest
+
+from llm.backends import BackendPool
+from llm.ollama_client import OllamaClient
+
+
+def make_pool(urls, **kwargs):
+    return BackendPool(urls, client_factory=lambda socket_path: httpx.AsyncClient(), **kwargs)
+
+
+def test_pick_least_outstanding():
+    """Запит іде на backend з найменшою кількістю активних запитів"""
+    pool = make_pool(["http://a", "http://b", "http://c"])
+    pool.backends[0].outstanding = 3
+    pool.backends[1].outstanding = 1
+    pool.backends[2].outstanding = 2
+
+    assert pool.pick().name == "http://b"
+
+
+def test_pick_prefers_loaded_model():
+    """Backend з уже завантаженою моделлю має пріоритет"""
+    pool = make_pool(["http://a", "http://b"])
+    pool.backends[1].outstanding = 2
+    pool.backends[1].loaded_models = {"llama3.2:3b"}
+
+    assert pool.pick("llama3.2:3b").name == "http://b"
+    assert pool.pick("phi3").name == "http://a"
+
+
+def test_pick_prefers_warm_prefix_with_free_slot():
+    """Backend, де prefix уже в KV cache, обирається поки в нього є вільний слот"""
+    pool = make_pool(["http://a", "http://b"])
+    pool.backends[1].outstanding = 1
+    pool.backends[1].remember_prefix("abc")
+
+    assert pool.pick(prefix="abc").name == "http://b"
+
+    pool.backends[1].limiter.in_flight = int(pool.backends[1].limiter.limit)
+    assert pool.pick(prefix="abc").name == "http://a"
+
+
+def test_unix_backend_url():
+    """'unix:' backend -> Unix socket transport"""
+    pool = make_pool(["unix:/run/ollama.sock"])
+
+    assert pool.primary.socket_path == "/run/ollama.sock"
+    assert pool.primary.base_url == "http://localhost"
+
+
+@pytest.mark.asyncio
+async def test_failed_backend_is_ejected_and_request_retried():
+    """Недоступний backend виключається, запит повторюється на іншому"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "down":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"response": "ok"})
+
+    client = OllamaClient(
+        backend_urls=["http://down", "http://up"],
+        transport=httpx.MockTransport(handler),
+        eject_after_failures=1,
+    )
+    response = await client.generate(prompt="ping")
+    stats = {b["name"]: b for b in client.stats()}
+    await client.aclose()
+
+    assert response.text == "ok"
+    assert stats["http://down"]["healthy"] is False
+    assert stats["http://up"]["outstanding"] == 0
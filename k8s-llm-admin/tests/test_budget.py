@@ -0,0 +1,105 @@
+from prompts.budget import (
+    FEW_SHOT,
+    KUBECTL_EVIDENCE,
+    SPECIALIZED,
+    SYSTEM,
+    USER_MESSAGE,
+    PromptBudget,
+    PromptSection,
+    fit_messages,
+)
+from prompts.system_prompts import optimize_prompt_length
+from prompts.tokenizer import TokenCounter, get_token_counter
+
+counter = TokenCounter("default")
+LOG_LINES = [f"2024-05-01T10:00:{i:02d}Z error: connection refused to db-{i}" for i in range(60)]
+
+
+def test_required_sections_kept_and_low_priority_dropped_first():
+    """system та питання лишаються, few-shot відкидається раніше за evidence"""
+    sections = [
+        PromptSection.build(SYSTEM, ["You are an SRE."]),
+        PromptSection.build(FEW_SHOT, ["Example: " + "x " * 200]),
+        PromptSection.build(KUBECTL_EVIDENCE, LOG_LINES[:5]),
+        PromptSection.build(USER_MESSAGE, ["Why is my pod crashing?"]),
+    ]
+    allocation = PromptBudget(300, counter).allocate(sections)
+
+    assert allocation.text(SYSTEM) == "You are an SRE."
+    assert allocation.text(USER_MESSAGE) == "Why is my pod crashing?"
+    assert allocation.dropped(FEW_SHOT) == 1
+    assert allocation.dropped(KUBECTL_EVIDENCE) == 0
+    assert allocation.used <= 300
+
+
+def test_evidence_trimmed_by_whole_lines_keeping_head_and_tail():
+    sections = [
+        PromptSection.build(KUBECTL_EVIDENCE, LOG_LINES, header="```", footer="```"),
+        PromptSection.build(USER_MESSAGE, ["Why?"]),
+    ]
+    allocation = PromptBudget(300, counter).fit(sections)
+    lines = allocation.text(KUBECTL_EVIDENCE).splitlines()
+
+    assert counter.count(allocation.render()) <= 300
+    assert lines[0] == "```" and lines[-1] == "```"
+    assert lines[1] == LOG_LINES[0] and lines[-2] == LOG_LINES[-1]
+    assert any("пропущено" in line for line in lines)
+    # Жодного обрізаного посередині рядка
+    assert all(line in LOG_LINES or line.startswith(("[...", "```")) for line in lines)
+
+
+def test_min_share_reserved_for_evidence():
+    """Спеціалізований промпт (priority 1) не забирає весь бюджет у evidence"""
+    sections = [
+        PromptSection.build(SPECIALIZED, [f"Checklist item {i}: " + "check " * 10 for i in range(50)]),
+        PromptSection.build(KUBECTL_EVIDENCE, LOG_LINES),
+        PromptSection.build(USER_MESSAGE, ["Why?"]),
+    ]
+    allocation = PromptBudget(1000, counter).allocate(sections)
+
+    assert allocation.stats()[KUBECTL_EVIDENCE]["tokens"] >= 0.15 * 1000 - 20
+
+
+def test_fit_messages_drops_oldest_history():
+    messages = [{"role": "user", "content": f"question {i} " + "detail " * 30} for i in range(20)]
+
+    kept = fit_messages("You are an SRE.", messages, 300, counter)
+
+    assert kept[-1] is messages[-1]
+    assert len(kept) < len(messages)
+    assert kept == messages[len(messages) - len(kept):]
+
+
+def test_optimize_prompt_length_drops_examples_not_question():
+    prompt = "\n".join([
+        "You are an SRE.",
+        "# Issue Report:",
+        "**Description:** pod crashes",
+        "# Available kubectl Output:",
+        "```",
+        *LOG_LINES,
+        "```",
+        "# Common Pod Issues Checklist:",
+        *[f"{i}. Common issue number {i} explained in detail\n" for i in range(40)],
+    ])
+
+    optimized = optimize_prompt_length(prompt, max_tokens=500, model="test")
+
+    assert counter.count(optimized) <= 500
+    assert "**Description:** pod crashes" in optimized
+    assert LOG_LINES[-1] in optimized
+
+
+def test_user_headed_blocks_not_memoized():
+    """Блок з невідомим заголовком (ввід користувача) не потрапляє в мемо static"""
+    memo = TokenCounter("default", max_static_entries=4)
+    for i in range(10):
+        memo.count_static(f"static segment {i}")
+    assert len(memo._static_counts) == 4
+    assert memo.count_static("static segment 9") == counter.count("static segment 9")
+
+    model_counter = get_token_counter("memo-test")
+    before = len(model_counter._static_counts)
+    for i in range(20):
+        optimize_prompt_length(f"You are an SRE.\n# My notes {i}\nuser text {i}", max_tokens=500, model="memo-test")
+    assert len(model_counter._static_counts) == before
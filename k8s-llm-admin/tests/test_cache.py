@@ -0,0 +1,49 @@
+import time
+
+from llm.cache import LRUTTLCache, make_cache_key
+
+
+def test_cache_key_normalizes_whitespace():
+    """Ключ не залежить від зайвих пробілів, але залежить від моделі та options"""
+    a = make_cache_key("Pod  в\nCrashLoopBackOff ", "llama3.2:3b", {"temperature": 0.7})
+    b = make_cache_key("Pod в CrashLoopBackOff", "llama3.2:3b", {"temperature": 0.7})
+    c = make_cache_key("Pod в CrashLoopBackOff", "phi3", {"temperature": 0.7})
+    d = make_cache_key("Pod в CrashLoopBackOff", "llama3.2:3b", {"temperature": 0.1})
+
+    assert a == b
+    assert len({a, c, d}) == 3
+
+
+def test_lru_eviction_by_entries():
+    """Найстаріший запис витісняється першим"""
+    cache = LRUTTLCache(max_entries=2, max_bytes=1000, ttl_seconds=60)
+    cache.set("a", 1, 1)
+    cache.set("b", 2, 1)
+    assert cache.get("a") == 1  # "a" тепер найсвіжіший
+    cache.set("c", 3, 1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats.evictions == 1
+
+
+def test_eviction_by_bytes():
+    """Ліміт за байтами"""
+    cache = LRUTTLCache(max_entries=100, max_bytes=10, ttl_seconds=60)
+    cache.set("a", "x", 6)
+    cache.set("b", "y", 6)
+
+    assert len(cache) == 1
+    assert cache.stats.bytes == 6
+    assert cache.get("b") == "y"
+
+
+def test_ttl_expiration():
+    """Прострочені записи не повертаються"""
+    cache = LRUTTLCache(max_entries=10, max_bytes=1000, ttl_seconds=0.01)
+    cache.set("a", 1, 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert cache.stats.misses == 1
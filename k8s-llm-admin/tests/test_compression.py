@@ -0,0 +1,84 @@
+import pytest
+
+from config.settings import settings
+from llm.prompt_manager import DiagnosticRequest, PromptOrchestrator
+from prompts.compression import OutputCompressor
+from prompts.multilang_prompts import Language
+from prompts.tokenizer import TokenCounter
+
+compressor = OutputCompressor()
+counter = TokenCounter("default")
+
+
+def test_strips_ansi_and_timestamps_and_collapses_repeats():
+    raw = "\n".join(
+        [f"\x1b[33m2024-05-01T10:00:{i:02d}.5Z\x1b[0m WARN retrying request {i}" for i in range(40)]
+        + ["E0501 10:00:41.123456       1 main.go:42] connection refused"]
+    )
+
+    result = compressor.compress(raw).splitlines()
+
+    assert result == ["WARN retrying request 0 [×40]", "E main.go:42] connection refused"]
+
+
+def test_collapses_repeated_block():
+    raw = "\n".join(["GET /health 200", "GET /ready 200"] * 10 + ["shutting down"])
+
+    result = compressor.compress(raw).splitlines()
+
+    assert result == ["GET /health 200", "GET /ready 200", "[... 2 рядки вище повторено ×10]", "shutting down"]
+
+
+def test_folds_java_and_python_stack_traces():
+    java = ["java.lang.IllegalStateException: boom"] + [f"\tat com.acme.Svc.step{i}(Svc.java:{i})" for i in range(30)]
+    python = ["Traceback (most recent call last):"] + [
+        line for i in range(10) for line in (f'  File "/app/m{i}.py", line {i}, in f{i}', f"    call_{i}()")
+    ] + ["KeyError: 'DATABASE_URL'"]
+
+    result = compressor.compress("\n".join(java + python)).splitlines()
+
+    # Java: верхні frames (місце виключення), Python: останні (most recent call last)
+    assert "\tat com.acme.Svc.step0(Svc.java:0)" in result
+    assert "\tat com.acme.Svc.step29(Svc.java:29)" not in result
+    assert '  File "/app/m9.py", line 9, in f9' in result
+    assert "    call_9()" in result
+    assert '  File "/app/m0.py", line 0, in f0' not in result
+    assert "KeyError: 'DATABASE_URL'" in result
+    assert sum("frames]" in line for line in result) == 2
+
+
+def test_fit_keeps_errors_with_context_within_budget():
+    lines = ["$ kubectl logs api"] + [f"INFO handled {word} request" for word in _words(3000)]
+    lines.insert(2000, "ERROR upstream timed out after 30s")
+    raw = "\n".join(lines)
+
+    result = compressor.compress(raw, max_tokens=800, model="test")
+    kept = result.splitlines()
+
+    assert counter.count(result) <= 800
+    assert kept[0] == "$ kubectl logs api"
+    error = kept.index("ERROR upstream timed out after 30s")
+    assert kept[error - 1] == lines[1999] and kept[error + 1] == lines[2001]
+    assert kept[-1] == lines[-1]
+    assert any(line.startswith("[... пропущено") for line in kept)
+
+
+@pytest.mark.parametrize("stable_prefix", [True, False])
+def test_kubectl_output_reaches_prompt_compressed(monkeypatch, stable_prefix):
+    """kubectl_output з запиту потрапляє в промпт в обох режимах, вже стиснутим"""
+    monkeypatch.setattr(settings, "PROMPT_STABLE_PREFIX", stable_prefix)
+    raw = "\n".join(["2024-05-01T10:00:00Z Back-off restarting failed container api"] * 500)
+
+    parts = PromptOrchestrator().build_prompt(
+        DiagnosticRequest(user_message="Чому под падає?", resource_type="pod", kubectl_output=raw),
+        Language.UKRAINIAN,
+    )
+
+    assert "Back-off restarting failed container api [×500]" in parts.prompt
+    assert "2024-05-01T10:00:00Z" not in parts.prompt
+
+
+def _words(count):
+    """Унікальні рядки без чисел (інакше згорнуться як повтори)"""
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    return [alphabet[i % 26] + alphabet[i // 26 % 26] + alphabet[i // 676 % 26] for i in range(count)]
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from llm.concurrency import AIMDLimiter, NS
+
+FAST = {"load_duration": 0, "prompt_eval_duration": int(0.1 * NS), "eval_duration": int(1 * NS), "eval_count": 100}
+
+
+def test_additive_increase_when_saturated_and_stable():
+    """Стабільна латентність + ліміт використовується -> ліміт росте"""
+    limiter = AIMDLimiter(initial_limit=2, max_limit=8)
+    limiter.in_flight = 2
+
+    for _ in range(10):
+        limiter.observe(ttft=0.1, stats=FAST)
+
+    assert limiter.limit > 2
+    assert limiter.decreases == 0
+
+
+def test_no_increase_when_limit_unused():
+    """Без навантаження ліміт не "роздувається\""""
+    limiter = AIMDLimiter(initial_limit=2)
+    limiter.observe(ttft=0.1, stats=FAST)
+
+    assert limiter.limit == 2
+
+
+def test_multiplicative_decrease_on_queue_delay():
+    """TTFT набагато більший за prompt_eval -> запити чекають в Ollama -> ліміт падає"""
+    limiter = AIMDLimiter(initial_limit=8, backoff=0.5, queue_delay_threshold=0.5)
+    limiter.observe(ttft=3.0, stats=FAST)
+
+    assert limiter.limit == 4
+    assert limiter.last_queue_delay == pytest.approx(2.9)
+
+
+def test_decrease_on_token_latency_gradient():
+    """Токени генеруються вдвічі повільніше за baseline -> ліміт падає"""
+    limiter = AIMDLimiter(initial_limit=8, backoff=0.5, gradient_tolerance=0.6)
+    limiter.observe(ttft=0.1, stats=FAST)
+    slow = dict(FAST, eval_duration=int(5 * NS))
+    for _ in range(5):
+        limiter.observe(ttft=0.1, stats=slow)
+
+    assert limiter.gradient < 0.6
+    assert limiter.limit < 8
+
+
+@pytest.mark.asyncio
+async def test_acquire_blocks_at_limit():
+    """Запит понад ліміт чекає на release"""
+    limiter = AIMDLimiter(initial_limit=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await limiter.release()
+    await asyncio.wait_for(waiter, 1)
+    assert limiter.in_flight == 1
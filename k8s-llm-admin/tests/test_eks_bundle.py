@@ -0,0 +1,122 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# eks_integration.py лежить поруч із пакетом
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from eks_integration import EKSManager  # noqa: E402
+from utils.process import process_runner  # noqa: E402
+
+RESPONSES = {
+    "describe-cluster": {"cluster": {"name": "prod", "version": "1.29", "endpoint": "e", "arn": "a", "status": "ACTIVE"}},
+    "list-nodegroups": {"nodegroups": ["ng-a", "ng-b", "ng-c"]},
+    "get nodes": {"items": [{}, {}]},
+    "get pods": {"items": [{"status": {"phase": "Running"}}, {"status": {"phase": "Pending"}}]},
+    "get events": {"items": []},
+    "get svc": "kind: Service",
+}
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """process_runner.run з відповідями за командою; hang - чекає до deadline"""
+    calls, failures, hangs = [], {}, set()
+
+    async def run(command, timeout=None, slot_timeout=None):
+        line = " ".join(command)
+        calls.append(line)
+        if any(marker in line for marker in hangs):
+            try:
+                await asyncio.wait_for(asyncio.sleep(30), timeout)
+            except asyncio.TimeoutError:
+                return {"success": False, "error": "Command timeout", "command": line}
+        for marker, stderr in failures.items():
+            if marker in line:
+                return {"success": False, "stdout": "", "stderr": stderr, "returncode": 254, "command": line}
+        if "describe-nodegroup" in line:
+            name = command[command.index("--nodegroup-name") + 1]
+            data = {"nodegroup": {"nodegroupName": name, "scalingConfig": {"desiredSize": 3}, "status": "ACTIVE"}}
+        else:
+            data = next(value for marker, value in RESPONSES.items() if marker in line)
+        return {"success": True, "stdout": json.dumps(data), "stderr": "", "returncode": 0, "command": line}
+
+    monkeypatch.setattr(process_runner, "run", run)
+    return calls, failures, hangs
+
+
+@pytest.mark.asyncio
+async def test_timed_out_step_reported_as_missing(aws):
+    _, _, hangs = aws
+    hangs.add("get pods")
+
+    start = time.monotonic()
+    bundle = await EKSManager("prod").aget_eks_diagnostic_bundle(step_timeout=0.2)
+
+    assert time.monotonic() - start < 2
+    assert bundle["missing"] == {"k8s.pods": "Command timeout"}
+    assert bundle["cluster"]["version"] == "1.29"
+    assert [ng["name"] for ng in bundle["nodegroups"]] == ["ng-a", "ng-b", "ng-c"]
+    assert bundle["k8s"] == {"nodes_count": 2}
+
+
+@pytest.mark.asyncio
+async def test_failed_list_nodegroups_skips_describes(aws):
+    calls, failures, _ = aws
+    failures["list-nodegroups"] = "An error occurred (AccessDeniedException)\n"
+
+    bundle = await EKSManager("prod").aget_eks_diagnostic_bundle()
+
+    assert bundle["missing"] == {"nodegroups": "An error occurred (AccessDeniedException)"}
+    assert bundle["nodegroups"] == []
+    assert not any("describe-nodegroup" in call for call in calls)
+    assert bundle["k8s"]["pods"] == {"total": 2, "by_status": {"Running": 1, "Pending": 1}}
+
+
+@pytest.mark.asyncio
+async def test_failed_describe_nodegroup_drops_only_that_group(aws):
+    _, failures, _ = aws
+    failures["--nodegroup-name ng-b"] = "An error occurred (ResourceNotFoundException)\n"
+
+    bundle = await EKSManager("prod").aget_eks_diagnostic_bundle()
+
+    assert [ng["name"] for ng in bundle["nodegroups"]] == ["ng-a", "ng-c"]
+    assert bundle["missing"] == {"nodegroups/ng-b": "An error occurred (ResourceNotFoundException)"}
+
+
+@pytest.mark.asyncio
+async def test_async_diagnose_does_not_block_loop(aws, monkeypatch):
+    calls, failures, _ = aws
+    failures["aws-load-balancer-controller"] = "NotFound\n"
+
+    def blocking(*args, **kwargs):
+        raise AssertionError("subprocess.run у async шляху")
+
+    monkeypatch.setattr("eks_integration.subprocess.run", blocking)
+
+    report = await EKSManager("prod").adiagnose_loadbalancer_pending("web", namespace="eks-diag")
+
+    assert report["checks"][0]["status"] == "missing"
+    assert report["service_yaml"] == '"kind: Service"'
+    assert any("get svc web" in call for call in calls)
+
+
+def test_sync_bundle_outside_loop(aws):
+    bundle = EKSManager("prod").get_eks_diagnostic_bundle()
+
+    assert bundle["missing"] == {}
+    assert bundle["k8s"]["nodes_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_bundle_inside_running_loop_raises(aws):
+    calls, _, _ = aws
+
+    with pytest.raises(RuntimeError, match="aget_eks_diagnostic_bundle"):
+        EKSManager("prod").get_eks_diagnostic_bundle()
+
+    assert calls == []
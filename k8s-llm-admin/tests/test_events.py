@@ -0,0 +1,70 @@
+from jinja2 import Environment
+
+from k8s.events import attach_events, compact_events, format_event_summary, message_template
+from prompts.templates import MULTI_RESOURCE_TEMPLATE
+
+
+def _event(name, reason, message, count=1, first="2024-05-01T10:00:00Z", last="2024-05-01T10:00:00Z",
+           kind="Pod", type="Warning"):
+    return {
+        "involvedObject": {"kind": kind, "name": name, "namespace": "prod"},
+        "reason": reason,
+        "message": message,
+        "count": count,
+        "type": type,
+        "firstTimestamp": first,
+        "lastTimestamp": last,
+    }
+
+
+EVENTS = [
+    _event("api-7d9f8b6c4-x2k4l", "BackOff", "Back-off restarting failed container api", 40,
+           "2024-05-01T10:00:00Z", "2024-05-01T10:20:00Z"),
+    _event("api-7d9f8b6c4-x2k4l", "BackOff", "Back-off restarting failed container api", 60,
+           "2024-05-01T10:20:00Z", "2024-05-01T10:45:00Z"),
+    _event("web-0", "FailedScheduling", "0/5 nodes are available: 3 Insufficient cpu.", 3),
+    _event("web-0", "FailedScheduling", "0/6 nodes are available: 4 Insufficient cpu.", 2,
+           last="2024-05-01T10:05:00Z"),
+    _event("api-7d9f8b6c4-x2k4l", "Pulled", "Container image \"api:1.2\" already present", 100, type="Normal"),
+]
+
+
+def test_groups_by_object_reason_and_template():
+    groups = compact_events(EVENTS)
+
+    assert [(g.name, g.reason, g.count) for g in groups] == [
+        ("api-7d9f8b6c4-x2k4l", "BackOff", 100),
+        ("web-0", "FailedScheduling", 5),
+        ("api-7d9f8b6c4-x2k4l", "Pulled", 100),
+    ]
+    backoff = groups[0]
+    assert (backoff.first_timestamp, backoff.last_timestamp) == ("2024-05-01T10:00:00Z", "2024-05-01T10:45:00Z")
+    assert backoff.events == 2
+    # Останнє повідомлення - як приклад
+    assert groups[1].message == "0/6 nodes are available: 4 Insufficient cpu."
+
+
+def test_message_template_masks_pod_suffixes_and_numbers():
+    assert message_template("Created pod: api-7d9f8b6c4-x2k4l") == "Created pod: api-<*>-<*>"
+    assert message_template("Pulling image \"kube-proxy:v1.29\"") == "Pulling image \"kube-proxy:v<*>\""
+
+
+def test_summary_is_ranked_and_compact():
+    summary = format_event_summary(compact_events(EVENTS * 200), max_groups=2)
+    lines = summary.splitlines()
+
+    assert lines[0] == "Events: 3 груп, 41000 подій"
+    assert lines[1].startswith("[Warning ×20000] Pod/api-7d9f8b6c4-x2k4l BackOff:")
+    assert lines[-1] == "[... ще 1 груп, 20000 подій]"
+
+
+def test_attach_events_feeds_multi_resource_template():
+    resources = attach_events(
+        [{"type": "Pod", "name": "web-0", "status": "Pending", "last_update": "10:05"}],
+        compact_events(EVENTS),
+    )
+
+    rendered = Environment().from_string(MULTI_RESOURCE_TEMPLATE).render(resources=resources, system_symptoms="")
+
+    assert "Warning FailedScheduling (×5): 0/6 nodes are available" in rendered
+    assert "2024-05-01T10:00:00Z - 2024-05-01T10:05:00Z" in rendered
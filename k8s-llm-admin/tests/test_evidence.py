@@ -0,0 +1,40 @@
+import pytest
+
+from k8s.evidence import EvidenceCollector
+
+
+class RecordingKubectl:
+    """KubectlWrapper, що запам'ятовує виклики"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def adescribe(self, resource, name, namespace=None):
+        self.calls.append("describe")
+        return f"Name: {name}"
+
+    async def aget(self, resource, name=None, namespace=None, label_selector=None, field_selector=None):
+        self.calls.append("events")
+        return {"items": []}
+
+    async def alogs(self, pod_name, namespace=None, tail=100, summarize=False, **kwargs):
+        self.calls.append("logs")
+        return "ERROR connection refused"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("resource_type, logs", [
+    ("pod", True),
+    ("pods", True),
+    ("po", True),
+    ("Pod", True),
+    (None, True),
+    ("deployment", False),
+    ("svc", False),
+])
+async def test_logs_collected_for_any_pod_alias(resource_type, logs):
+    kubectl = RecordingKubectl()
+    output = await EvidenceCollector(kubectl, log_tail=100, summarize_logs=False).collect(resource_type, "api-0")
+
+    assert ("logs" in kubectl.calls) is logs
+    assert ("ERROR connection refused" in output) is logs
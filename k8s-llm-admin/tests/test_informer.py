@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+from benchmarks.fake_kube import FakeKubeServer, make_pod, write_kubeconfig
+from config.settings import settings
+from k8s import informer as informer_module
+from k8s.informer import ClusterState, ObjectStore
+from k8s.native_client import NativeKubeWrapper
+
+
+def pod(name, namespace="shop", node="node-1", rv="1", owner=None, **labels):
+    metadata = {"name": name, "namespace": namespace, "resourceVersion": rv, "labels": labels}
+    if owner:
+        metadata["ownerReferences"] = [{"kind": "ReplicaSet", "name": owner}]
+    return {"metadata": metadata, "spec": {"nodeName": node}, "status": {"phase": "Running"}}
+
+
+def names(items):
+    return [item["metadata"]["name"] for item in items]
+
+
+def eventually(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.02)
+
+
+def test_store_indexes_and_selectors():
+    store = ObjectStore()
+    store.replace([
+        pod("api-0", app="api", tier="web", owner="api-6d4"),
+        pod("api-1", node="node-2", app="api", owner="api-6d4"),
+        pod("db-0", node="node-2", app="db"),
+        pod("api-0", namespace="staging", app="api"),
+    ], "10")
+
+    assert names(store.by_index("node", "node-2")) == ["api-1", "db-0"]
+    assert names(store.by_index("owner", "ReplicaSet/api-6d4")) == ["api-0", "api-1"]
+    assert names(store.list("shop", "app=api")) == ["api-0", "api-1"]
+    assert names(store.list("shop", "app=api,!tier")) == ["api-1"]
+    assert names(store.list("shop", "app!=api")) == ["db-0"]
+    assert names(store.list("shop", field_selector="spec.nodeName=node-2,metadata.name!=db-0")) == ["api-1"]
+    assert len(store.list(label_selector="app=api")) == 3
+    with pytest.raises(ValueError):
+        store.list("shop", "app in (api,db)")
+
+
+def test_store_apply_by_resource_version():
+    store = ObjectStore()
+    store.replace([pod("api-0", rv="5", app="api")], "5")
+
+    assert store.apply("MODIFIED", pod("api-0", rv="4", app="old")) is False
+    assert store.apply("MODIFIED", pod("api-0", rv="6", app="new")) is True
+    assert names(store.by_index("label", "app=new")) == ["api-0"]
+    assert store.by_index("label", "app=api") == []
+
+    store.apply("DELETED", pod("api-0", rv="7"))
+    assert store.get("shop", "api-0") is None
+    assert store.resource_version == "7"
+    assert store.list("shop") == []
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    fake = FakeKubeServer()
+    fake.add("pods", make_pod("api-0", "shop"))
+    fake.add("nodes", {"metadata": {"name": "node-1"}, "status": {"conditions": [{"type": "Ready", "status": "True"}]}})
+    kubeconfig = str(write_kubeconfig(tmp_path / "kubeconfig", fake.start(), namespace="shop"))
+
+    state = ClusterState(["pods", "nodes", "events"], kubeconfig=kubeconfig, watch_timeout=1)
+    state.start()
+    assert state.wait_for_sync(5)
+    yield fake, state, kubeconfig
+    state.stop()
+    fake.stop()
+
+
+def test_watch_keeps_store_current(cluster):
+    fake, state, _ = cluster
+    pods = state.store("pods")
+
+    fake.add("pods", make_pod("api-1", "shop", phase="Pending"))
+    eventually(lambda: pods.get("shop", "api-1") is not None)
+    assert pods.get("shop", "api-1")["kind"] == "Pod"
+    assert "managedFields" not in pods.get("shop", "api-1")["metadata"]
+
+    fake.delete("pods", "shop", "api-0")
+    eventually(lambda: pods.get("shop", "api-0") is None)
+    assert state.summary()["pods"]["by_phase"] == {"Pending": 1}
+    assert state.summary()["nodes"] == {"total": 1, "ready": 1, "not_ready": 0}
+    assert state.informers["pods"].lists == 1
+
+
+def test_expired_resource_version_relists(cluster):
+    fake, state, _ = cluster
+    informer = state.informers["pods"]
+
+    # resourceVersion informer pods відстає від compaction; api-2 без події watch
+    fake.add("services", {"metadata": {"name": "api", "namespace": "shop"}})
+    fake.compact()
+    fake.objects[("pods", "shop", "api-2")] = make_pod("api-2", "shop")
+    eventually(lambda: informer.lists == 2)
+    assert informer.store.get("shop", "api-2") is not None
+
+
+def test_wrapper_reads_from_store(cluster, monkeypatch):
+    fake, state, kubeconfig = cluster
+    monkeypatch.setattr(settings, "K8S_INFORMERS", True)
+    monkeypatch.setattr(informer_module, "_cluster_state", state)
+    wrapper = NativeKubeWrapper(kubeconfig)
+
+    requests = fake.requests
+    assert wrapper.get("pods", "api-0")["metadata"]["name"] == "api-0"
+    assert names(wrapper.get("po", label_selector="app=api")["items"]) == ["api-0"]
+    assert wrapper.get("events", field_selector="involvedObject.name=api-0")["items"] == []
+    assert fake.requests == requests
+
+    # Kind без informer - через API
+    assert wrapper.get("services")["kind"] == "ServiceList"
+    assert fake.requests == requests + 1
@@ -1,21 +1,35 @@
+import asyncio
+import json
+
+import httpx
 import pytest
+import pytest_asyncio
 
-from llm.ollama_client import get_ollama_client
+from llm.ollama_client import OllamaClient
+from config.settings import settings
 
 
-@pytest.fixture
-def ollama_client():
-    return get_ollama_client()
+@pytest_asyncio.fixture
+async def ollama_client():
+    client = OllamaClient(
+        base_url=settings.OLLAMA_BASE_URL,
+        model=settings.OLLAMA_MODEL,
+        timeout=settings.OLLAMA_TIMEOUT,
+    )
+    yield client
+    await client.aclose()
 
 
-def test_ollama_health(ollama_client):
+@pytest.mark.asyncio
+async def test_ollama_health(ollama_client):
     """Тест підключення до Ollama"""
-    assert ollama_client.health_check() is True
+    assert await ollama_client.health_check() is True
 
 
-def test_llm_generation(ollama_client):
+@pytest.mark.asyncio
+async def test_llm_generation(ollama_client):
     """Тест генерації"""
-    response = ollama_client.generate(
+    response = await ollama_client.generate(
         prompt="What is Kubernetes?",
         max_tokens=50,
     )
@@ -25,9 +39,69 @@ def test_llm_generation(ollama_client):
     assert response.tokens_generated > 0
 
 
-def test_list_models(ollama_client):
+@pytest.mark.asyncio
+async def test_list_models(ollama_client):
     """Тест списку моделей"""
-    models = ollama_client.list_models()
+    models = await ollama_client.list_models()
     assert isinstance(models, list)
     assert len(models) > 0
 
+
+@pytest.mark.asyncio
+async def test_concurrent_generations_do_not_block():
+    """Паралельні генерації виконуються одночасно (mock Ollama)"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"response": "ok", "eval_count": 1, "prompt_eval_count": 3})
+
+    client = OllamaClient(
+        base_url="http://ollama",
+        transport=httpx.MockTransport(handler),
+        initial_concurrency=10,
+    )
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    responses = await asyncio.gather(*(client.generate(prompt=f"q{i}") for i in range(10)))
+    elapsed = loop.time() - start
+    await client.aclose()
+
+    assert all(r.text == "ok" for r in responses)
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_chunks():
+    """Streaming повертає токени до done"""
+    lines = [{"response": "Hel"}, {"response": "lo"}, {"response": "", "done": True}]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+
+    client = OllamaClient(
+        base_url="http://ollama",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)),
+    )
+    stream = await client.generate(prompt="hi", stream=True)
+    chunks = [chunk async for chunk in stream]
+    await client.aclose()
+
+    assert "".join(chunks) == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_reuses_connection(tmp_path):
+    """Unix socket transport + keep-alive: одне з'єднання на багато запитів"""
+    from benchmarks.fake_ollama import FakeOllamaServer
+
+    server = FakeOllamaServer()
+    socket_path = await server.start_unix(str(tmp_path / "ollama.sock"))
+    client = OllamaClient(base_url="http://localhost", socket_path=socket_path)
+
+    for _ in range(5):
+        response = await client.generate(prompt="ping")
+        assert response.text == "ok"
+
+    await client.aclose()
+    await server.stop()
+
+    assert server.requests == 5
+    assert server.connections == 1
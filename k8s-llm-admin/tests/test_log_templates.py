@@ -0,0 +1,66 @@
+import sys
+
+from k8s.kubectl_wrapper import KubectlWrapper
+from prompts.log_templates import WILDCARD, LogTemplateMiner
+
+
+def _request_lines(count):
+    return [
+        f"2024-05-01T10:00:{i % 60:02d}Z INFO GET /api/orders/{i * 7} 200 {i % 90}ms"
+        for i in range(count)
+    ]
+
+
+def test_clusters_lines_into_templates_with_counts_and_examples():
+    lines = _request_lines(1000)
+    lines.insert(500, "2024-05-01T10:08:20Z ERROR failed to connect to redis:6379: connection refused")
+
+    miner = LogTemplateMiner().feed(lines)
+    templates = {t.template: t for t in miner.templates}
+
+    assert miner.lines == 1001
+    assert len(templates) == 2
+    request = templates[f"INFO GET {WILDCARD} 200 {WILDCARD}"]
+    assert request.count == 1000
+    assert (request.first_line, request.last_line) == (1, 1001)
+    assert request.first_time == "2024-05-01T10:00:00Z"
+    assert request.examples[2][:2] == ["/api/orders/0", "/api/orders/7"]
+    assert len(request.examples[2]) == 3
+
+
+def test_summary_puts_errors_first_and_is_compact():
+    lines = _request_lines(5000) + ["ERROR out of memory: killing process 42"]
+
+    summary = LogTemplateMiner().feed(lines).summary()
+    rows = summary.splitlines()
+
+    assert rows[0] == "Шаблони логів: 2 з 5001 рядків"
+    assert rows[1].startswith("[×1] ERROR out of memory")
+    assert rows[2].startswith(f"[×5000] INFO GET {WILDCARD} 200")
+    assert len(summary) < 1000
+
+
+def test_memory_bounded_by_max_clusters():
+    """Кожен рядок - окремий шаблон; старі витісняються, рахунок рядків зберігається"""
+    words = ["alpha", "beta", "gamma", "delta", "omega", "sigma"]
+    lines = [f"{a} {b} {c}" for a in words for b in words for c in words]
+
+    miner = LogTemplateMiner(max_clusters=10, similarity=0.9).feed(lines)
+
+    assert len(miner.templates) == 10
+    assert miner.evicted_lines + sum(t.count for t in miner.templates) == len(lines)
+    assert "витіснених" in miner.summary()
+
+
+def test_kubectl_logs_summarize_streams_through_miner(monkeypatch):
+    """logs(summarize=True) читає stdout потоком і повертає шаблони"""
+    script = "for i in range(3000): print(f'INFO heartbeat {i} ok')"
+    wrapper = KubectlWrapper()
+    monkeypatch.setattr(wrapper, "_build_command", lambda command: [sys.executable, "-c", script])
+
+    summary = wrapper.logs("api-0", summarize=True)
+
+    assert summary.splitlines() == [
+        "Шаблони логів: 1 з 3000 рядків",
+        f"[×3000] INFO heartbeat {WILDCARD} ok  (рядки 1-3000, {WILDCARD}=0,1,2)",
+    ]
@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.fake_kube import FakeKubeServer, make_pod, write_kubeconfig
+from config.settings import settings
+from k8s.kubectl_wrapper import KubectlWrapper, create_kubectl_wrapper
+from k8s.native_client import NativeKubeWrapper
+from k8s.resources import resolve_resource
+
+
+@pytest.fixture
+def fake():
+    server = FakeKubeServer()
+    server.url = server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def wrapper(fake, tmp_path):
+    fake.add("pods", make_pod("api-0", "shop"))
+    fake.add("pods", make_pod("api-1", "shop", phase="Pending"))
+    fake.add("pods", make_pod("web-0", "shop"))
+    return NativeKubeWrapper(str(write_kubeconfig(tmp_path / "kubeconfig", fake.url, namespace="shop")))
+
+
+def test_resource_aliases():
+    assert resolve_resource("po").plural == "pods"
+    assert resolve_resource("deployments.apps").api_version == "apps/v1"
+    assert resolve_resource("node").path(namespace="shop") == "/api/v1/nodes"
+    assert resolve_resource("certificates.cert-manager.io") is None
+
+
+def test_get_object_and_list(wrapper):
+    pod = wrapper.get("pod", "api-0")
+    assert pod["metadata"]["name"] == "api-0"
+
+    pods = wrapper.get("pods", label_selector="app=api")
+    assert [p["metadata"]["name"] for p in pods["items"]] == ["api-0", "api-1"]
+    # Як kubectl get -o json: у елементів є apiVersion/kind
+    assert {(p["apiVersion"], p["kind"]) for p in pods["items"]} == {("v1", "Pod")}
+
+
+def test_single_pooled_connection(wrapper, fake, monkeypatch):
+    monkeypatch.setattr(settings, "K8S_READ_CACHE", False)
+    for _ in range(20):
+        assert wrapper.get("pods", "api-0", namespace="shop")
+    wrapper.logs("api-0")
+
+    assert fake.requests == 21
+    assert fake.connections == 1
+
+
+def test_not_found_is_empty(wrapper):
+    assert wrapper.get("pods", "missing") == {}
+    assert wrapper.describe("pods", "missing") == ""
+    assert wrapper.logs("missing") == ""
+
+
+def test_describe_drops_managed_fields(wrapper):
+    text = wrapper.describe("pods", "api-1")
+    assert "phase: Pending" in text
+    assert "managedFields" not in text
+
+
+def test_logs_tail_and_summarize(wrapper, fake):
+    fake.logs[("shop", "api-0")] = "".join(f"GET /orders/{i} 200\n" for i in range(50)) + "password=hunter2\n"
+
+    assert wrapper.logs("api-0", tail=2) == "GET /orders/49 200\npassword=hunter2\n"
+    summary = wrapper.logs("api-0", tail=1000, summarize=True)
+    assert "hunter2" not in summary
+    assert "[×50] GET <*> 200" in summary
+
+
+def test_backend_switch():
+    assert type(create_kubectl_wrapper(backend="kubectl")) is KubectlWrapper
+    assert isinstance(create_kubectl_wrapper(backend="native"), NativeKubeWrapper)
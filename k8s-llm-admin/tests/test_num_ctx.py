@@ -0,0 +1,41 @@
+import json
+
+import httpx
+import pytest
+
+from llm.ollama_client import OllamaClient
+
+
+def test_num_ctx_rounds_up_to_bucket_and_caps():
+    client = OllamaClient(context_window=8192, num_ctx_buckets=[2048, 4096, 16384])
+
+    # Bucket-и понад context_window відкидаються, cap стає останнім
+    assert client.num_ctx_buckets == [2048, 4096, 8192]
+    assert client.num_ctx_for(prompt_tokens=100, max_tokens=500) == 2048
+    assert client.num_ctx_for(prompt_tokens=3000, max_tokens=500) == 4096
+    assert client.num_ctx_for(prompt_tokens=5000, max_tokens=2000) == 8192
+    assert client.num_ctx_for(prompt_tokens=50000, max_tokens=2000) == 8192
+
+
+@pytest.mark.asyncio
+async def test_num_ctx_sent_per_request():
+    """Коротке питання - малий num_ctx, великий evidence dump - більший"""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "ok", "message": {"content": "ok"}})
+
+    client = OllamaClient(
+        transport=httpx.MockTransport(handler),
+        context_window=16384,
+        num_ctx_buckets=[2048, 4096, 8192],
+    )
+    await client.generate(prompt="Why is my pod pending?", max_tokens=500)
+    await client.generate(prompt="error: connection refused\n" * 2000, max_tokens=500)
+    await client.chat([{"role": "user", "content": "hi"}], max_tokens=500)
+    await client.aclose()
+
+    assert payloads[0]["options"]["num_ctx"] == 2048
+    assert payloads[1]["options"]["num_ctx"] > 4096
+    assert payloads[2]["options"]["num_ctx"] == 2048
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from llm.admission import AdmissionController
+from llm.ollama_client import OllamaClient
+from llm.prompt_manager import DiagnosticRequest, PromptOrchestrator
+from prompts.multilang_prompts import Language
+
+
+class SlowEvidence:
+    """kubectl, що відповідає із затримкою"""
+
+    async def collect(self, resource_type, name, namespace="default"):
+        await asyncio.sleep(0.05)
+        return f"Name: {name}\nState: CrashLoopBackOff"
+
+
+@pytest.mark.asyncio
+async def test_prefill_overlaps_evidence_collection():
+    """Prefill system prompt іде до LLM ще до того, як kubectl повернув дані"""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    orchestrator = PromptOrchestrator()
+    orchestrator.llm_client = OllamaClient(transport=httpx.MockTransport(handler))
+    orchestrator.evidence = SlowEvidence()
+
+    response = await orchestrator.diagnose(DiagnosticRequest(
+        user_message="Чому под prefill-test-api перезапускається?",
+        resource_type="pod",
+        resource_name="prefill-test-api",
+        language=Language.UKRAINIAN,
+    ))
+    await orchestrator.llm_client.aclose()
+
+    prefill, diagnosis = payloads
+    assert prefill["prompt"] == "" and prefill["options"]["num_predict"] == 1
+    assert prefill["system"] == diagnosis["system"]
+    assert "State: CrashLoopBackOff" in diagnosis["prompt"]
+    assert response.text == "ok"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_prefill_and_diagnose_share_num_ctx():
+    """Один bucket на warm-up, prefill і діагноз - runner не перезавантажується"""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    orchestrator = PromptOrchestrator()
+    orchestrator.llm_client = OllamaClient(
+        transport=httpx.MockTransport(handler),
+        context_window=8192,
+        num_ctx_buckets=[2048, 4096, 8192],
+    )
+    orchestrator.evidence = SlowEvidence()
+
+    await orchestrator.llm_client.warm_up()
+    await orchestrator.diagnose(DiagnosticRequest(
+        user_message="Чому под num-ctx-test-api перезапускається?",
+        resource_type="pod",
+        resource_name="num-ctx-test-api",
+        language=Language.UKRAINIAN,
+    ))
+    await orchestrator.llm_client.aclose()
+
+    warm_up, prefill, diagnosis = payloads
+    assert prefill["options"]["num_predict"] == 1
+    assert warm_up["options"]["num_ctx"] == prefill["options"]["num_ctx"] == diagnosis["options"]["num_ctx"] == 8192
+
+
+@pytest.mark.asyncio
+async def test_prefill_skipped_without_free_admission_slot():
+    """Prefill займає слот admission, а без вільного слоту не запускається"""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    orchestrator = PromptOrchestrator()
+    orchestrator.llm_client = OllamaClient(transport=httpx.MockTransport(handler))
+    orchestrator.admission = AdmissionController(max_concurrency=1)
+
+    orchestrator.start_prefill("system prompt A")
+    assert orchestrator.admission.in_flight == 1
+    orchestrator.start_prefill("system prompt B")
+    await asyncio.gather(*orchestrator._prefills.values())
+    await orchestrator.llm_client.aclose()
+
+    assert [p["system"] for p in payloads] == ["system prompt A"]
+    assert orchestrator.admission.in_flight == 0
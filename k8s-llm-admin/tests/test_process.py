@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from k8s.kubectl_wrapper import KubectlWrapper
+from utils.process import ProcessRunner
+
+
+def python(script):
+    return [sys.executable, "-c", script]
+
+
+@pytest.mark.asyncio
+async def test_global_limit_bounds_parallel_processes():
+    runner = ProcessRunner(max_concurrency=2, timeout=10)
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, runner.running)
+            await asyncio.sleep(0.01)
+
+    watcher = asyncio.create_task(watch())
+    results = await asyncio.gather(*(runner.run(python("import time; time.sleep(0.2); print('ok')")) for _ in range(5)))
+    watcher.cancel()
+
+    assert [r["stdout"] for r in results] == ["ok\n"] * 5
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_kills_process():
+    runner = ProcessRunner(timeout=0.3)
+
+    start = time.monotonic()
+    result = await runner.run(python("import time; time.sleep(30)"))
+
+    assert result == {"success": False, "error": "Command timeout", "command": result["command"]}
+    assert time.monotonic() - start < 5
+    assert runner.running == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_kills_process(tmp_path):
+    runner = ProcessRunner(timeout=30)
+    pid_file = tmp_path / "pid"
+    script = f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(30)"
+
+    task = asyncio.create_task(runner.run(python(script)))
+    while not pid_file.exists() or not pid_file.read_text():
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+    assert runner.running == 0
+
+
+@pytest.mark.asyncio
+async def test_async_logs_summarize_and_get(monkeypatch):
+    wrapper = KubectlWrapper()
+    scripts = {
+        "logs": "for i in range(3000): print(f'INFO heartbeat {i} token=abc{i}')",
+        "get": "print('{\"kind\": \"Pod\"}')",
+    }
+    monkeypatch.setattr(wrapper, "_build_command", lambda command: python(scripts[command[0]] if command else ""))
+
+    summary, pod = await asyncio.gather(wrapper.alogs("api-0", summarize=True), wrapper.aget("pods", "api-0"))
+
+    assert summary.startswith("Шаблони логів: 1 з 3000 рядків")
+    assert "abc" not in summary
+    assert pod == {"kind": "Pod"}
+
+
+@pytest.mark.asyncio
+async def test_slot_timeout_starts_deadline_after_slot():
+    """З slot_timeout очікування слоту не з'їдає deadline виконання"""
+    runner = ProcessRunner(max_concurrency=1)
+    command = python("import time; time.sleep(0.3); print('ok')")
+
+    shared = await asyncio.gather(*(runner.run(command, timeout=0.5) for _ in range(2)))
+    separate = await asyncio.gather(*(runner.run(command, timeout=0.5, slot_timeout=5) for _ in range(2)))
+
+    assert [r.get("error") for r in shared] == [None, "Command timeout"]
+    assert [r["stdout"] for r in separate] == ["ok\n", "ok\n"]
+
+
+@pytest.mark.asyncio
+async def test_limit_shared_across_event_loops():
+    """asyncio.run в іншому потоці не обходить глобальний ліміт"""
+    runner = ProcessRunner(max_concurrency=1, timeout=10)
+    command = python("import time; time.sleep(0.3)")
+
+    def in_thread():
+        return asyncio.run(runner.run(command))
+
+    start = time.monotonic()
+    results = await asyncio.gather(
+        runner.run(command),
+        asyncio.to_thread(in_thread),
+        asyncio.to_thread(in_thread),
+    )
+
+    assert all(r["success"] for r in results)
+    assert time.monotonic() - start >= 0.9
+    assert runner._slots.in_use == 0
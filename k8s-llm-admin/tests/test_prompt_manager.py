@@ -0,0 +1,41 @@
+import pytest
+
+from llm.admission import AdmissionController, RequestPriority
+from llm.prompt_manager import PromptOrchestrator
+from prompts.multilang_prompts import PromptParts
+from utils.logger import logger
+
+
+class FailingClient:
+    """LLM client, що завжди падає"""
+
+    model = "test"
+
+    async def generate(self, **kwargs):
+        raise RuntimeError("ollama down")
+
+
+@pytest.mark.asyncio
+async def test_generate_error_logged_and_reraised():
+    """Помилка LLM логується, пробрасується далі і не лишає зайнятий слот"""
+    messages = []
+    sink = logger.add(messages.append, level="ERROR", format="{message}")
+
+    orchestrator = PromptOrchestrator()
+    orchestrator.llm_client = FailingClient()
+    orchestrator.admission = AdmissionController(max_concurrency=1)
+
+    try:
+        with pytest.raises(RuntimeError, match="ollama down"):
+            await orchestrator._generate(
+                PromptParts(system="system", prompt="prompt"),
+                {"temperature": 0.7, "max_tokens": 16},
+                "generate-error-key",
+                RequestPriority.MEDIUM,
+            )
+    finally:
+        logger.remove(sink)
+
+    assert [str(m).strip() for m in messages] == ["Помилка LLM генерації: ollama down"]
+    assert orchestrator.admission.in_flight == 0
+    assert orchestrator.cache.get("generate-error-key") is None
@@ -43,3 +43,43 @@ def test_get_system_prompt():
     assert "AWS EKS" in prompt
     assert len(prompt) > 1000
 
+
+
+def test_prompt_parts_static_prefix_is_stable():
+    """system однаковий байт-у-байт, усе динамічне - тільки в prompt"""
+    first = prompt_manager.build_prompt_parts(
+        user_message="Под payments-api падає після деплою",
+        resource_type="pod",
+        language=Language.UKRAINIAN,
+        cluster_context={"cluster_name": "prod-eu-1", "region": "eu-west-1"},
+    )
+    second = prompt_manager.build_prompt_parts(
+        user_message="Под не може витягнути image",
+        resource_type="pod",
+        language=Language.UKRAINIAN,
+        cluster_context={"cluster_name": "staging"},
+    )
+
+    assert first.system == second.system
+    assert "Pod-Specific" in first.system
+    assert "prod-eu-1" not in first.system and "payments-api" not in first.system
+    assert first.prompt.index("prod-eu-1") < first.prompt.index("payments-api")
+
+
+def test_prompt_variants_precomputed_with_hash():
+    """Усі (мова, cloud, тип) зібрані заздалегідь; hash - prefix ID та частина cache key"""
+    from llm.cache import make_prefix_id
+
+    variants = prompt_manager.variants()
+    assert len(variants) == len(Language) * len(prompt_manager.cloud_prompts) * (len(prompt_manager.specialized_prompts) + 1)
+
+    variant = prompt_manager.get_variant("pod", Language.UKRAINIAN)
+    assert variant.prefix_id == make_prefix_id(variant.text)
+    assert variant.tokens > 0
+    # Той самий об'єкт на кожен запит, тип без спеціалізованого промпта -> базовий варіант
+    assert prompt_manager.get_static_prefix("pod", Language.UKRAINIAN) is variant.text
+    assert prompt_manager.get_variant("deployment", Language.UKRAINIAN).resource_type is None
+
+    parts = prompt_manager.build_prompt_parts("Чому под падає?", "pod", Language.UKRAINIAN, token_budget=6000)
+    assert parts.system is variant.text
+    assert parts.prefix_id == variant.prefix_id
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+
+from benchmarks.fake_kube import FakeKubeServer, make_pod, write_kubeconfig
+from config.settings import settings
+from k8s import informer as informer_module
+from k8s.informer import ClusterState
+from k8s.kubectl_wrapper import KubectlWrapper
+from k8s.native_client import NativeKubeWrapper
+from k8s.read_cache import ReadCache, normalize_selector, read_cache
+
+
+def test_ttl_per_kind_and_expiry(monkeypatch):
+    cache = ReadCache(kind_ttls={"nodes": 60, "events": 1}, not_found_ttl=1)
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+
+    cache.put("nodes", "n", "nodes")
+    cache.put("events", "e", "events")
+    cache.put("missing", "", "pods", found=False)
+    clock[0] += 1.5
+
+    assert cache.get("nodes") == "n"
+    assert cache.get("events") is None
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["not_found"] == 1
+
+
+def test_stale_entry_revalidated_by_resource_version(monkeypatch):
+    cache = ReadCache(default_ttl=1)
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+
+    cache.put("pod", "v1", "pods", version="7")
+    clock[0] += 2
+    assert cache.get("pod") is None
+    assert cache.get("pod", lambda: "8") is None
+    assert cache.get("pod", lambda: "7") == "v1"
+    # Revalidation продовжує TTL
+    assert cache.get("pod") == "v1"
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_selector_normalization():
+    assert normalize_selector(" b=2, a=1") == normalize_selector("a=1,b=2") == "a=1,b=2"
+    assert normalize_selector("") is None
+
+
+@pytest.fixture
+def counting_wrapper(monkeypatch, tmp_path):
+    """KubectlWrapper, що рахує запуски kubectl; NotFound для pod missing"""
+    read_cache.clear()
+    calls = tmp_path / "calls"
+    script = (
+        "import sys; open(%r, 'a').write('x'); args = sys.argv[1:]\n"
+        "if 'missing' in args: sys.stderr.write('Error from server (NotFound): pods \"missing\" not found'); sys.exit(1)\n"
+        "if 'broken' in args: sys.stderr.write('connection refused'); sys.exit(1)\n"
+        "print('{\"kind\": \"PodList\", \"items\": []}')\n"
+    ) % str(calls)
+    wrapper = KubectlWrapper(kubeconfig=str(tmp_path / "kubeconfig"))
+    monkeypatch.setattr(wrapper, "_build_command", lambda command: ["python3", "-c", script, *command])
+    yield wrapper, lambda: len(calls.read_text()) if calls.exists() else 0
+    read_cache.clear()
+
+
+def test_wrapper_reads_through_cache(counting_wrapper):
+    wrapper, calls = counting_wrapper
+
+    assert wrapper.get("pods", label_selector="b=2,a=1")["kind"] == "PodList"
+    assert wrapper.get("po", label_selector="a=1, b=2")["kind"] == "PodList"
+    assert calls() == 1
+
+    # NotFound кешується коротко, інші помилки - ні
+    assert wrapper.get("pods", "missing") == {}
+    assert wrapper.get("pods", "missing") == {}
+    assert wrapper.get("pods", "broken") == {}
+    assert wrapper.get("pods", "broken") == {}
+    assert calls() == 4
+
+
+@pytest.mark.asyncio
+async def test_async_reads_share_cache(counting_wrapper):
+    wrapper, calls = counting_wrapper
+
+    assert (await wrapper.aget("pods"))["kind"] == "PodList"
+    assert wrapper.get("pods")["kind"] == "PodList"
+    assert calls() == 1
+
+
+def test_native_get_revalidated_by_informer(tmp_path, monkeypatch):
+    read_cache.clear()
+    fake = FakeKubeServer()
+    fake.add("pods", make_pod("api-0", "shop"))
+    fake.add("services", {"metadata": {"name": "api", "namespace": "shop"}})
+    kubeconfig = str(write_kubeconfig(tmp_path / "kubeconfig", fake.start(), namespace="shop"))
+    state = ClusterState(["pods"], kubeconfig=kubeconfig, watch_timeout=1)
+    state.start()
+    assert state.wait_for_sync(5)
+    monkeypatch.setattr(settings, "K8S_INFORMERS", True)
+    monkeypatch.setattr(informer_module, "_cluster_state", state)
+    monkeypatch.setattr(read_cache, "kind_ttls", {"services": 0})
+    try:
+        wrapper = NativeKubeWrapper(kubeconfig)
+        requests = fake.requests
+        # services без informer: TTL 0 -> кожен виклик іде в API
+        wrapper.get("services", "api")
+        wrapper.get("services", "api")
+        assert fake.requests == requests + 2
+    finally:
+        state.stop()
+        fake.stop()
+        read_cache.clear()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from llm.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_execution():
+    """Одночасні виклики з однаковим ключем - одне виконання"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "diagnosis"
+
+    results = await asyncio.gather(*(flight.do("key", generate) for _ in range(5)))
+
+    assert results == ["diagnosis"] * 5
+    assert calls == 1
+    assert flight.coalesced == 4
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_late_stream_subscriber_gets_replay():
+    """Пізній підписник спочатку отримує вже згенеровані токени"""
+    flight = SingleFlight()
+    first_tokens_sent = asyncio.Event()
+    release = asyncio.Event()
+    upstream_calls = 0
+
+    async def upstream():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        yield "a"
+        yield "b"
+        first_tokens_sent.set()
+        await release.wait()
+        yield "c"
+
+    async def collect(stream):
+        return [chunk async for chunk in stream]
+
+    early = asyncio.create_task(collect(flight.stream("key", upstream)))
+    await first_tokens_sent.wait()
+    late = asyncio.create_task(collect(flight.stream("key", upstream)))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await early == ["a", "b", "c"]
+    assert await late == ["a", "b", "c"]
+    assert upstream_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_error_propagates_to_subscribers():
+    """Помилка upstream доходить до всіх підписників"""
+    flight = SingleFlight()
+
+    async def upstream():
+        yield "a"
+        raise RuntimeError("ollama down")
+
+    with pytest.raises(RuntimeError):
+        async for _ in flight.stream("key", upstream):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_releases_key_immediately():
+    """Останній підписник пішов - ключ вільний одразу, новий запит стартує свій stream"""
+    flight = SingleFlight()
+    upstream_calls = 0
+
+    async def upstream():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        yield "a"
+        await asyncio.sleep(10)
+        yield "b"
+
+    first = flight.stream("key", upstream)
+    assert await first.__anext__() == "a"
+    stale = flight.stream("key", upstream)
+    await first.aclose()
+
+    assert flight.in_flight == 0
+    fresh = flight.stream("key", upstream)
+    assert await fresh.__anext__() == "a"
+    assert upstream_calls == 2
+    await fresh.aclose()
+
+    with pytest.raises(RuntimeError, match="stream abandoned"):
+        async for _ in stale:
+            pass
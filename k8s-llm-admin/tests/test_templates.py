@@ -0,0 +1,48 @@
+from prompts.templates import PromptTemplateManager, TemplateRegistry
+
+
+def test_builtin_templates_compiled_once():
+    registry = TemplateRegistry()
+    manager = PromptTemplateManager(registry)
+
+    assert registry.get("diagnostic") is registry.get("diagnostic")
+    rendered = manager.render_diagnostic({"severity": "critical", "resource_type": "pod", "namespace": "prod"})
+    assert "CRITICAL INCIDENT" in rendered
+    assert "**Namespace:** prod" in rendered
+
+
+def test_custom_templates_lru_by_content():
+    registry = TemplateRegistry(max_custom=2)
+    manager = PromptTemplateManager(registry)
+
+    assert manager.render_custom("Hello {{ name }}", {"name": "pod"}) == "Hello pod"
+    assert manager.render_custom("Hello {{ name }}", {"name": "node"}) == "Hello node"
+    assert registry.stats()["custom_hits"] == 1
+
+    manager.render_custom("A {{ x }}", {"x": 1})
+    manager.render_custom("B {{ x }}", {"x": 2})
+    # "Hello" витіснено - компілюється знову
+    manager.render_custom("Hello {{ name }}", {"name": "pod"})
+    assert registry.stats() == {"builtin": 3, "custom": 2, "custom_hits": 1, "custom_misses": 4}
+
+
+def test_bytecode_cache_persists_on_disk(tmp_path, monkeypatch):
+    TemplateRegistry(cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 3
+
+    # Другий "процес" бере bytecode з диску замість компіляції
+    compiled = []
+    monkeypatch.setattr("jinja2.environment.Environment.compile", lambda *args, **kwargs: compiled.append(args))
+    registry = TemplateRegistry(cache_dir=tmp_path)
+
+    assert compiled == []
+    assert "Multi-Resource Analysis" in registry.render("multi_resource", {"resources": []})
+
+
+def test_custom_templates_skip_bytecode_cache(tmp_path):
+    registry = TemplateRegistry(cache_dir=tmp_path)
+    before = sorted(tmp_path.iterdir())
+
+    assert registry.custom("Pod {{ name | truncate(3) }}").render(name="payments") == "Pod pay..."
+    assert sorted(tmp_path.iterdir()) == before
+    assert set(registry._sources) == {"diagnostic", "followup", "multi_resource"}
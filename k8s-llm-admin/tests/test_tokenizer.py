@@ -0,0 +1,77 @@
+import pytest
+
+from config.settings import settings
+from prompts import tokenizer as tokenizer_module
+from prompts.multilang_prompts import Language, prompt_manager
+from prompts.tokenizer import TokenCounter, estimate_tokens, get_token_counter, model_family
+
+
+def test_model_family():
+    assert model_family("llama3.2:3b") == "llama3"
+    assert model_family("qwen2.5:7b") == "qwen2"
+    assert model_family("library/mistral:latest") == "mistral"
+    assert model_family("unknown-model") == "default"
+
+
+def test_estimate_counts_cyrillic_denser_than_four_chars():
+    """Кирилиця: старе 1 токен = 4 символи суттєво недораховувало"""
+    text = "Под не запускається через помилку доступу до registry " * 20
+
+    assert estimate_tokens(text) > len(text) / 4 * 1.5
+    assert estimate_tokens("") == 0
+
+
+def test_truncate_keeps_head_and_tail_within_budget():
+    counter = TokenCounter("default")
+    text = "\n".join(f"line {i}: Back-off restarting failed container" for i in range(500))
+
+    truncated = counter.truncate(text, 200)
+
+    assert counter.count(truncated) <= 200
+    assert truncated.startswith("line 0:")
+    assert truncated.endswith("line 499: Back-off restarting failed container")
+
+
+def test_local_tokenizer_json_is_used(tmp_path, monkeypatch):
+    """tokenizer.json з TOKENIZER_DIR/<family>/ - точний підрахунок"""
+    tokenizers = pytest.importorskip("tokenizers")
+
+    tok = tokenizers.Tokenizer(tokenizers.models.WordLevel(unk_token="[UNK]"))
+    tok.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tok.train_from_iterator(
+        ["pod crash loop back off"],
+        tokenizers.trainers.WordLevelTrainer(special_tokens=["[UNK]"]),
+    )
+    (tmp_path / "phi3").mkdir()
+    tok.save(str(tmp_path / "phi3" / "tokenizer.json"))
+
+    monkeypatch.setattr(settings, "TOKENIZER_DIR", tmp_path)
+    monkeypatch.setattr(tokenizer_module, "_counters", {})
+
+    counter = get_token_counter("phi3:mini")
+    assert counter.exact
+    assert counter.count("pod crash loop") == 3
+    assert counter.count_static("pod crash loop back off") == 5
+
+    truncated = counter.truncate("loop back off pod crash loop back off", 4, marker=" ")
+    assert counter.count(truncated) == 4
+    assert truncated.startswith("loop back") and truncated.endswith("back off")
+
+
+def test_prompt_parts_fit_token_budget():
+    """system + prompt не перевищують бюджет, питання користувача зберігається"""
+    counter = get_token_counter()
+    system = prompt_manager.get_static_prefix("pod", Language.UKRAINIAN)
+    budget = counter.count(system) + 400
+
+    parts = prompt_manager.build_prompt_parts(
+        user_message="Чому под перезапускається?",
+        resource_type="pod",
+        language=Language.UKRAINIAN,
+        kubectl_output="\n".join(f"Warning BackOff pod/api-{i} Back-off restarting" for i in range(2000)),
+        token_budget=budget,
+    )
+
+    assert counter.count(parts.system) + counter.count(parts.prompt) <= budget
+    assert "Чому под перезапускається?" in parts.prompt
+    assert "пропущено" in parts.prompt
@@ -0,0 +1,58 @@
+import json
+
+import httpx
+import pytest
+
+from llm.concurrency import NS
+from llm.ollama_client import OllamaClient
+from llm.warmup import ColdLoadStats, ModelWarmer
+
+
+def test_cold_load_stats():
+    """Короткий load_duration не рахується, cold load - рахується і будить keeper"""
+    stats = ColdLoadStats(threshold_seconds=1.0)
+
+    assert stats.record("llama3.2:3b", "http://a", 0.01) is False
+    assert stats.record("llama3.2:3b", "http://a", 4.0) is True
+    assert stats.detected.is_set()
+    assert stats.as_dict()["llama3.2:3b"]["count"] == 1
+    assert stats.as_dict()["llama3.2:3b"]["max_seconds"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_sent_and_cold_load_recorded():
+    """keep_alive у кожному запиті, load_duration з відповіді -> cold_loads"""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "ok", "load_duration": int(5 * NS)})
+
+    client = OllamaClient(transport=httpx.MockTransport(handler), keep_alive="1h")
+    response = await client.generate(prompt="ping")
+    await client.aclose()
+
+    assert payloads[0]["keep_alive"] == "1h"
+    assert response.load_duration == 5.0
+    assert client.cold_loads.as_dict()[client.model]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_all_preloads_every_backend():
+    """Preload: порожній prompt для кожної моделі на кожному backend"""
+    warmed = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        warmed.append((request.url.host, payload["model"], payload["prompt"]))
+        return httpx.Response(200, json={"done": True, "load_duration": int(2 * NS)})
+
+    client = OllamaClient(backend_urls=["http://a", "http://b"], transport=httpx.MockTransport(handler))
+    warmer = ModelWarmer(client, models=["llama3.2:3b"])
+    await warmer.warm_all()
+    await client.aclose()
+
+    assert sorted(warmed) == [("a", "llama3.2:3b", ""), ("b", "llama3.2:3b", "")]
+    assert warmer.stats()["warmups"] == 2
+    # Прогрів сам по собі не є cold load для користувача
+    assert warmer.stats()["cold_loads"] == {}
@@ -2,10 +2,20 @@
 import sys
 from loguru import logger
 from config.settings import settings
+from utils.redaction import get_redactor
 
 # Видалити default handler
 logger.remove()
 
+# Маскування секретів до форматування - діє на всі sinks
+if settings.REDACT_LOGS:
+    _redactor = get_redactor()
+
+    def _redact_record(record):
+        record["message"] = _redactor.redact(record["message"])
+
+    logger.configure(patcher=_redact_record)
+
 # Console handler (з кольорами)
 logger.add(
     sys.stdout,
@@ -0,0 +1,206 @@
+"""
+Асинхронний запуск CLI (kubectl, aws) через asyncio.create_subprocess_exec
+
+Один глобальний ліміт паралельних процесів, deadline на виклик (очікування
+слоту + виконання, або окремо - slot_timeout), при timeout або скасуванні
+задачі процес вбивається
+"""
+
+import asyncio
+import codecs
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from utils.logger import logger
+
+
+def process_result(
+    command: List[str],
+    stdout: str = "",
+    stderr: str = "",
+    returncode: Optional[int] = None,
+    error: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Result dict як у KubectlWrapper.run"""
+    if error is not None:
+        return {"success": False, "error": error, "command": " ".join(command)}
+    return {
+        "success": returncode == 0,
+        "stdout": stdout,
+        "stderr": stderr,
+        "returncode": returncode,
+        "command": " ".join(command),
+    }
+
+
+class ProcessSlots:
+    """
+    Лічильник слотів на весь процес, спільний для всіх event loops
+
+    asyncio.Semaphore прив'язаний до одного loop; тут чекаючі - futures
+    свого loop, а слот передається через call_soon_threadsafe. Слот,
+    переданий уже скасованому чекаючому, повертається далі
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except BaseException:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                # Слот уже отримано, але задачу скасовано - віддати далі
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self.in_use -= 1
+                return
+            loop, future = self._waiters.popleft()
+        # in_use не змінюється: слот переходить до чекаючого
+        loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ProcessRunner:
+    """Паралельні subprocess з глобальним лімітом (на всі event loops процесу)"""
+
+    def __init__(self, max_concurrency: int = 8, timeout: float = 30):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.running = 0
+        self._slots = ProcessSlots(max_concurrency)
+
+    @asynccontextmanager
+    async def _process(self, command: List[str], slot_deadline: float) -> AsyncIterator[asyncio.subprocess.Process]:
+        """Слот + процес; процес, що ще працює на виході (timeout, cancel), вбивається"""
+        loop = asyncio.get_running_loop()
+        slots = self._slots
+        await asyncio.wait_for(slots.acquire(), max(0.0, slot_deadline - loop.time()))
+        self.running += 1
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            yield process
+        finally:
+            if process is not None and process.returncode is None:
+                process.kill()
+                await asyncio.shield(process.wait())
+            self.running -= 1
+            slots.release()
+
+    async def run(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        slot_timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Виконати команду і дочекатися виводу
+
+        Args:
+            command: Команда
+            timeout: Deadline виклику (default - self.timeout)
+            slot_timeout: Окремий ліміт очікування слоту; тоді timeout
+                рахується від старту процесу, а не від виклику
+
+        Returns:
+            Result dict (success, stdout, stderr, returncode, command)
+            або (success=False, error) при timeout чи помилці запуску
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.timeout if timeout is None else timeout
+        start = loop.time()
+        slot_deadline = start + (timeout if slot_timeout is None else slot_timeout)
+        try:
+            async with self._process(command, slot_deadline) as process:
+                deadline = (start if slot_timeout is None else loop.time()) + timeout
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), max(0.0, deadline - loop.time()),
+                )
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout: {' '.join(command)}")
+            return process_result(command, error="Command timeout")
+        except OSError as e:
+            logger.error(f"Помилка запуску {command[0]}: {e}")
+            return process_result(command, error=str(e))
+
+        return process_result(
+            command,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+            process.returncode,
+        )
+
+    async def stream(self, command: List[str], timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        stdout по мірі надходження (chunks тексту, не рядки)
+
+        Після deadline процес вбивається, і ітерація просто завершується
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            async with self._process(command, deadline) as process:
+                # stderr вичитується у фоні - процес не заблокується на повному pipe
+                stderr = asyncio.ensure_future(process.stderr.read())
+                try:
+                    while True:
+                        chunk = await asyncio.wait_for(
+                            process.stdout.read(65536), max(0.0, deadline - loop.time()),
+                        )
+                        if not chunk:
+                            break
+                        yield decoder.decode(chunk)
+                    await asyncio.wait_for(process.wait(), max(0.0, deadline - loop.time()))
+                finally:
+                    stderr.cancel()
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout (stream): {' '.join(command)}")
+            return
+        except OSError as e:
+            logger.error(f"Помилка запуску {command[0]}: {e}")
+            return
+
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+        if process.returncode:
+            logger.warning(f"Exit code {process.returncode}: {' '.join(command)}")
+
+
+# Глобальний ліміт на всі kubectl / aws процеси
+process_runner = ProcessRunner(
+    max_concurrency=settings.K8S_MAX_PROCESSES,
+    timeout=settings.K8S_TIMEOUT,
+)
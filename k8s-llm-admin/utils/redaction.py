@@ -0,0 +1,292 @@
+"""
+Маскування чутливих даних (tokens, паролі, AWS ключі, Bearer, IP, сертифікати kubeconfig)
+
+Triggers усіх правил - одна regex-альтернація, тож текст проходиться
+один раз. Redactor.stream() обробляє вхід chunks: між ними
+переноситься незавершений рядок (і незакритий PEM блок), тому секрет на
+межі chunks маскується так само, як у цілому тексті
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+REDACTED = "***REDACTED***"
+
+
+@dataclass(frozen=True)
+class RedactionRule:
+    """
+    Правило маскування
+
+    pattern перевіряється лише там, де знайдено trigger - літерал (без урахування
+    регістру), з якого починається збіг, або regex фрагмент, що починається
+    з літерала. Тоді re пропускає решту тексту швидким пошуком за першим символом.
+    Trigger лише звужує пошук: регістр у збігу визначає pattern
+    """
+
+    name: str
+    pattern: str
+    triggers: Tuple[str, ...] = ()
+    trigger_patterns: Tuple[str, ...] = ()
+    replacement: str = REDACTED  # Шаблон для Match.expand
+
+
+def _char_pattern(char: str, fold: bool) -> str:
+    """Символ trie; fold - обидва регістри, `[kK]`"""
+    upper = char.upper()
+    return f"[{char}{upper}]" if fold and len(upper) == 1 and upper != char else re.escape(char)
+
+
+def _trie_pattern(words: Iterable[str], fold: bool = False) -> str:
+    """
+    Альтернація літералів (у нижньому регістрі) як trie: на кожній позиції -
+    одна перевірка на перший символ
+    """
+    tree: dict = {}
+    for word in words:
+        node = tree
+        word = word.lower()
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        # Коротший trigger достатній - довші продовження не потрібні
+        if "" in node:
+            return ""
+        branches = [_char_pattern(char, fold) + emit(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return "|".join(_char_pattern(char, fold) + emit(child) for char, child in sorted(tree.items()))
+
+
+# Порядок важливий: на одній позиції перемагає перше правило
+DEFAULT_RULES = [
+    # PEM блок цілком (у kubeconfig, secrets, логах cert-manager)
+    RedactionRule(
+        "pem",
+        r"(?P<begin>-----BEGIN [A-Z0-9 ]+-----)(?s:.)*?(?P<end>-----END [A-Z0-9 ]+-----)",
+        ("-----BEGIN ",),
+        replacement=rf"\g<begin>\n{REDACTED}\n\g<end>",
+    ),
+    # kubeconfig: base64 сертифікати і ключі клієнта
+    RedactionRule(
+        "kubeconfig",
+        r"(?P<key>(?i:certificate-authority|client-certificate|client-key)-data[\"']?[ \t]*[:=][ \t]*[\"']?)"
+        r"[A-Za-z0-9+/=]+",
+        ("certificate-authority-data", "client-certificate-data", "client-key-data"),
+        replacement=rf"\g<key>{REDACTED}",
+    ),
+    RedactionRule("bearer", r"(?i:bearer)[ \t]+[A-Za-z0-9\-._~+/]+=*", ("bearer",), replacement=f"Bearer {REDACTED}"),
+    # JWT (service account tokens) без ключа поруч
+    RedactionRule("jwt", r"\beyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]*", ("eyJ",)),
+    # AWS access key id
+    RedactionRule(
+        "aws_key",
+        r"\b(?:AKIA|ASIA|AGPA|AIDA|AROA)[0-9A-Z]{16}\b",
+        ("AKIA", "ASIA", "AGPA", "AIDA", "AROA"),
+    ),
+    # key=value / key: value для паролів, tokens, секретів і будь-яких *key
+    # (X-Api-Key, stripe_key, aws_secret_access_key): збіг починається з `key`,
+    # префікс лишається як є. Пароль - також через пробіл (`password hunter2`)
+    RedactionRule(
+        "secret",
+        r"(?P<key>(?i:passw(?:or)?d[\"']?(?:[ \t]*[:=][ \t]*|[ \t]+)|(?:token|secret|key)[\"']?[ \t]*[:=][ \t]*)[\"']?)"
+        r"[^\s\"',;]+",
+        ("passw", "token", "secret", "key"),
+        replacement=rf"\g<key>{REDACTED}",
+    ),
+    RedactionRule(
+        "ip",
+        r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b",
+        # Окремий фрагмент на кожну цифру: з `\d` на початку re не має швидкого пошуку
+        trigger_patterns=tuple(rf"{digit}\d{{0,2}}\.\d{{1,3}}\.\d{{1,3}}\.\d" for digit in "0123456789"),
+        replacement="XXX.XXX.XXX.XXX",
+    ),
+]
+
+_PEM_END = "-----END "
+# Маркери як у pattern "pem"
+_PEM_BEGIN_RE = re.compile(r"-----BEGIN [A-Z0-9 ]+-----")
+_PEM_END_RE = re.compile(r"-----END [A-Z0-9 ]+-----")
+_PEM_MARKER_MAX = 128
+
+
+class Redactor:
+    """
+    Маскування за набором правил за один прохід
+
+    Triggers усіх правил - одна альтернація (trie); на кожній знайденій позиції
+    правила перевіряються по черзі (як альтернація з усіх patterns, але
+    без спроби кожного pattern на кожному символі)
+    """
+
+    def __init__(self, rules: Optional[List[RedactionRule]] = None, max_carry: int = 1 << 20):
+        self.rules = list(rules or DEFAULT_RULES)
+        self.max_carry = max_carry
+        self._patterns = [(re.compile(rule.pattern), rule.replacement) for rule in self.rules]
+        words = [trigger for rule in self.rules for trigger in rule.triggers]
+        patterns = [pattern for rule in self.rules for pattern in rule.trigger_patterns]
+        # Triggers шукаються в text.lower(): re.IGNORECASE чи `[kK]` вимикають
+        # швидкий пошук re. Якщо lower() змінює довжину (İ), позиції не збігаються -
+        # тоді пошук в оригінальному тексті з `[kK]`
+        self._triggers = re.compile("|".join(filter(None, [_trie_pattern(words), *patterns])))
+        self._folded_triggers = re.compile("|".join(filter(None, [_trie_pattern(words, fold=True), *patterns])))
+
+    def _matches(self, text: str, limit: Optional[int] = None) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, заміна) для збігів, що починаються до limit"""
+        if limit is None:
+            limit = len(text)
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            search, haystack = self._triggers.search, lowered
+        else:
+            search, haystack = self._folded_triggers.search, text
+        position = 0
+        while True:
+            trigger = search(haystack, position)
+            if trigger is None or trigger.start() >= limit:
+                return
+            start = trigger.start()
+            for pattern, replacement in self._patterns:
+                match = pattern.match(text, start)
+                if match:
+                    yield start, match.end(), match.expand(replacement)
+                    position = max(match.end(), start + 1)
+                    break
+            else:
+                position = start + 1
+
+    def redact(self, text: str) -> str:
+        """Замаскувати цілий текст"""
+        return self.redact_prefix(text, len(text))[0] if text else text
+
+    def redact_prefix(self, text: str, limit: int) -> Tuple[str, int]:
+        """
+        Замаскувати text до позиції limit
+
+        Returns:
+            (замаскований текст, скільки символів text оброблено) - збіг,
+            що починається до limit, обробляється повністю
+        """
+        parts, position = [], 0
+        for start, end, replacement in self._matches(text, limit):
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+        end = max(position, limit)
+        parts.append(text[position:end])
+        return "".join(parts), end
+
+    def stream(self) -> "RedactionStream":
+        return RedactionStream(self)
+
+    def redact_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Потокове маскування: chunks на вході -> замасковані chunks на виході"""
+        stream = self.stream()
+        for chunk in chunks:
+            output = stream.feed(chunk)
+            if output:
+                yield output
+        tail = stream.finish()
+        if tail:
+            yield tail
+
+
+class RedactionStream:
+    """
+    feed(chunk) -> готовий замаскований текст, finish() -> залишок
+
+    Правила не перетинають рядки (крім PEM), тож назад тримається лише
+    незавершений рядок і кожен PEM блок, що не закінчився до межі (END і
+    наступний BEGIN можуть бути в одному рядку). Якщо буфер перевищує
+    max_carry, тіло незакритого PEM блоку відкидається до кінця блоку, а
+    задовгий рядок маскується частинами з хвостом max_carry / 2 (збіги коротші)
+    """
+
+    def __init__(self, redactor: Redactor):
+        self.redactor = redactor
+        self._carry = ""
+        self._in_pem = False
+
+    @staticmethod
+    def _pem_blocks(buffer: str) -> List[Tuple[int, int, Optional[int]]]:
+        """
+        PEM блоки буфера як їх знайде pattern "pem": (begin, кінець заголовка,
+        кінець блоку або None - ще не закритий). BEGIN всередині блоку - тіло
+        """
+        blocks, position = [], 0
+        while True:
+            begin = _PEM_BEGIN_RE.search(buffer, position)
+            if begin is None:
+                return blocks
+            end = _PEM_END_RE.search(buffer, begin.end())
+            blocks.append((begin.start(), begin.end(), end.end() if end else None))
+            if end is None:
+                return blocks
+            position = end.end()
+
+    def feed(self, chunk: str) -> str:
+        buffer = self._carry + chunk
+
+        if self._in_pem:
+            # Тіло PEM вже замасковане - пропускати до кінця блоку (повного маркера END)
+            end = _PEM_END_RE.search(buffer)
+            if end is None:
+                # Хвіст, з якого ще може початися маркер
+                partial = buffer.rfind(_PEM_END)
+                keep = partial if partial != -1 and len(buffer) - partial <= _PEM_MARKER_MAX else len(buffer) - len(_PEM_END)
+                self._carry = buffer[max(0, keep):]
+                return ""
+            self._in_pem = False
+            buffer = buffer[end.start():]
+
+        blocks = self._pem_blocks(buffer)
+        # Межа - початок рядка, яку не перетинає жоден блок (незакритий - до кінця буфера)
+        cut = buffer.rfind("\n") + 1
+        moved = True
+        while moved:
+            moved = False
+            for begin, _, end in blocks:
+                if begin < cut and (end is None or end > cut):
+                    cut = buffer.rfind("\n", 0, begin) + 1
+                    moved = True
+
+        if len(buffer) - cut > self.redactor.max_carry:
+            unclosed = blocks[-1] if blocks and blocks[-1][2] is None else None
+            if unclosed is not None:
+                # Заголовок лишається, тіло блоку відкидається до `-----END`
+                begin, header_end, _ = unclosed
+                self._in_pem = True
+                self._carry = ""
+                return self.redactor.redact(buffer[:begin]) + buffer[begin:header_end] + f"\n{REDACTED}\n"
+            # Задовгий рядок: маскувати до межі, тримаючи хвіст для збігів на ній
+            # (блоки, що починаються до межі, закриті - маскуються цілком)
+            text, cut = self.redactor.redact_prefix(buffer, len(buffer) - self.redactor.max_carry // 2)
+            self._carry = buffer[cut:]
+            return text
+
+        self._carry = buffer[cut:]
+        return self.redactor.redact(buffer[:cut])
+
+    def finish(self) -> str:
+        carry, self._carry = self._carry, ""
+        if self._in_pem:
+            self._in_pem = False
+            return ""
+        return self.redactor.redact(carry)
+
+
+_redactor: Optional[Redactor] = None
+
+
+def get_redactor() -> Redactor:
+    global _redactor
+    if _redactor is None:
+        _redactor = Redactor()
+    return _redactor
+
+
+def redact(text: str) -> str:
+    return get_redactor().redact(text)